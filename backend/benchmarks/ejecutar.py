@@ -0,0 +1,211 @@
+# backend/benchmarks/ejecutar.py
+# Mide tiempo y memoria pico del pipeline y de los endpoints con CSV sintéticos de varios tamaños.
+#
+# Uso (desde backend/):
+#   python -m benchmarks.ejecutar --tamanos 1000 10000 100000 --salida data/benchmark.json
+#   python -m benchmarks.ejecutar --tamanos 1000 10000 --linea-base data/benchmark.json --tolerancia 0.2
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+DIRECTORIO_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if DIRECTORIO_BACKEND not in sys.path:
+    sys.path.insert(0, DIRECTORIO_BACKEND)
+
+import mineria
+from etapas import Etapas, trazar_memoria
+from benchmarks.generador import generar_csv
+
+TAMANOS_DEFECTO = [1_000, 10_000, 100_000]
+# Consultas por carrera y endpoint para los percentiles
+REPETICIONES_CONSULTAS = 20
+# Carreras (las de más ofertas) que se consultan en los endpoints de estadísticas
+CARRERAS_CONSULTADAS = 3
+# Por debajo de estos valores una diferencia contra la línea base es ruido
+UMBRAL_SEGUNDOS = 0.01
+UMBRAL_BYTES = 1024 * 1024
+
+def medir_mineria(csv_path, memoria=False):
+    """
+    Ejecuta procesar_datos_computrabajo y toma sus spans por etapa
+    (resumen["etapas"]) más el total. Con `memoria` corre bajo tracemalloc,
+    así los spans traen el pico de bytes asignados de cada etapa.
+    """
+    etapas = Etapas()
+    with trazar_memoria(memoria), etapas.medir("total"):
+        df_final, resumen, *_ = mineria.procesar_datos_computrabajo(csv_path, trabajadores=1)
+    spans = resumen["etapas"] + etapas.resumen()
+
+    resultado = {
+        "filas": {"originales": resumen["originales"], "finales": resumen["finales"]},
+        "segundos": {span["etapa"]: span["segundos"] for span in spans},
+        "cpu_segundos": {span["etapa"]: span["cpu_segundos"] for span in spans},
+    }
+    if memoria:
+        resultado["pico_bytes"] = {span["etapa"]: span["bytes_asignados"] for span in spans}
+    return resultado, resumen
+
+def _percentiles(tiempos):
+    tiempos = np.asarray(tiempos)
+    return {
+        "media": float(tiempos.mean()),
+        "p50": float(np.percentile(tiempos, 50)),
+        "p95": float(np.percentile(tiempos, 95)),
+    }
+
+async def _medir_endpoints(main, csv_path, carreras, repeticiones, memoria):
+    import httpx
+
+    async def subir(cliente):
+        with open(csv_path, "rb") as f:
+            respuesta = await cliente.post("/proceso-csv", files={"file": ("benchmark.csv", f, "text/csv")})
+        respuesta.raise_for_status()
+        if "resumen" not in respuesta.json():
+            raise RuntimeError(respuesta.json().get("error", "Error en /proceso-csv"))
+
+    resultados = {}
+    transporte = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://benchmark", timeout=None) as cliente:
+        inicio = time.perf_counter()
+        await subir(cliente)
+        resultados["/proceso-csv"] = {"segundos": time.perf_counter() - inicio}
+        if memoria:
+            # Segunda carga (reemplaza la misma data) solo para medir el pico
+            etapas = Etapas()
+            with trazar_memoria(True), etapas.medir("/proceso-csv"):
+                await subir(cliente)
+            resultados["/proceso-csv"]["pico_bytes"] = etapas.spans[0]["bytes_asignados"]
+
+        for ruta in ("/estadisticas/habilidades", "/estadisticas/salarios"):
+            sin_cache, con_cache = [], []
+            for _ in range(repeticiones):
+                for carrera in carreras:
+                    main.cache_estadisticas.invalidar()
+                    inicio = time.perf_counter()
+                    respuesta = await cliente.get(ruta, params={"carrera": carrera})
+                    sin_cache.append(time.perf_counter() - inicio)
+                    respuesta.raise_for_status()
+                    inicio = time.perf_counter()
+                    await cliente.get(ruta, params={"carrera": carrera})
+                    con_cache.append(time.perf_counter() - inicio)
+            resultados[ruta] = {"sin_cache": _percentiles(sin_cache), "con_cache": _percentiles(con_cache)}
+    return resultados
+
+def _maquina():
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+def ejecutar(tamanos, semilla=0, memoria=True, consultas=True, repeticiones=REPETICIONES_CONSULTAS):
+    """
+    Corre las mediciones en un directorio temporal (CSV, data/ y una base
+    SQLite propia) y devuelve el resultado listo para guardar como JSON.
+    """
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="habilis_benchmark_") as directorio:
+        os.chdir(directorio)
+        os.makedirs("data", exist_ok=True)
+        # La base se define antes de importar main (database crea el engine al importarse)
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directorio, 'benchmark.db')}"
+        try:
+            main = None
+            if consultas:
+                import main
+            resultados = {}
+            for filas in tamanos:
+                print(f"⏱️  {filas} filas...")
+                csv_path = generar_csv(os.path.join(directorio, f"computrabajo_{filas}.csv"), filas, semilla)
+                mineria_medida, resumen = medir_mineria(csv_path)
+                if memoria:
+                    mineria_medida["pico_bytes"] = medir_mineria(csv_path, memoria=True)[0]["pico_bytes"]
+                resultado = {"tamano_csv_bytes": os.path.getsize(csv_path), "mineria": mineria_medida}
+                if main is not None:
+                    carreras = list(resumen["carreras"])[:CARRERAS_CONSULTADAS]
+                    resultado["endpoints"] = asyncio.run(_medir_endpoints(main, csv_path, carreras, repeticiones, memoria))
+                resultados[str(filas)] = resultado
+                os.remove(csv_path)
+            if main is not None:
+                # Las métricas por consulta se escriben en segundo plano con rutas relativas
+                main.registro_metricas.vaciar()
+                main.engine.dispose()
+        finally:
+            os.chdir(directorio_original)
+
+    return {
+        "fecha": datetime.now(timezone.utc).isoformat(),
+        "semilla": semilla,
+        "maquina": _maquina(),
+        "resultados": resultados,
+    }
+
+def _aplanar(datos, prefijo=""):
+    """{'a': {'b': 1}} -> {'a.b': 1}"""
+    planos = {}
+    for clave, valor in datos.items():
+        ruta = f"{prefijo}.{clave}" if prefijo else clave
+        if isinstance(valor, dict):
+            planos.update(_aplanar(valor, ruta))
+        elif isinstance(valor, (int, float)):
+            planos[ruta] = valor
+    return planos
+
+def comparar(actual, linea_base, tolerancia=0.2):
+    """
+    Compara tiempos (segundos, media, p50, p95) y memoria (pico_bytes) con
+    la línea base. Devuelve las mediciones que empeoraron más que
+    `tolerancia` (0.2 = 20 %): [(medición, base, actual, razón)].
+    """
+    base = _aplanar(linea_base["resultados"])
+    regresiones = []
+    for medicion, valor in _aplanar(actual["resultados"]).items():
+        partes = medicion.split(".")
+        if medicion not in base or not ({"segundos", "cpu_segundos", "pico_bytes"} & set(partes) or partes[-1] in ("media", "p50", "p95")):
+            continue
+        umbral = UMBRAL_BYTES if "pico_bytes" in partes else UMBRAL_SEGUNDOS
+        if max(valor, base[medicion]) < umbral:
+            continue
+        razon = valor / base[medicion] if base[medicion] else float("inf")
+        if razon > 1 + tolerancia:
+            regresiones.append((medicion, base[medicion], valor, razon))
+    return regresiones
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de minería y de los endpoints")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS_DEFECTO, help="Filas de cada CSV (1000 a 1000000)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default="data/benchmark.json")
+    parser.add_argument("--linea-base", help="JSON de una corrida anterior contra el cual comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES_CONSULTAS)
+    parser.add_argument("--sin-memoria", action="store_true", help="No medir memoria pico (evita la pasada con tracemalloc)")
+    parser.add_argument("--sin-consultas", action="store_true", help="Medir solo el pipeline, sin los endpoints")
+    args = parser.parse_args()
+
+    resultado = ejecutar(args.tamanos, args.semilla, not args.sin_memoria, not args.sin_consultas, args.repeticiones)
+    os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"✅ Resultados guardados en {args.salida}")
+
+    if args.linea_base:
+        with open(args.linea_base, encoding="utf-8") as f:
+            linea_base = json.load(f)
+        regresiones = comparar(resultado, linea_base, args.tolerancia)
+        for medicion, antes, ahora, razon in regresiones:
+            print(f"⚠️  {medicion}: {antes:.4g} -> {ahora:.4g} (x{razon:.2f})")
+        if regresiones:
+            sys.exit(1)
+        print("✅ Sin regresiones respecto a la línea base")
@@ -0,0 +1,169 @@
+# backend/benchmarks/generador.py
+# Genera exportaciones sintéticas de Computrabajo (CSV separado por ';') con semilla fija
+
+import argparse
+import json
+from itertools import compress
+import numpy as np
+import pandas as pd
+from mineria import HARD_SKILLS, SOFT_SKILLS
+
+# Perfil de cada tipo de oferta: títulos, frases de descripción y habilidades típicas (probabilidad alta)
+PERFILES = {
+    'Ingeniería de Sistemas': {
+        'titulos': ['Desarrollador Backend', 'Ingeniero de Sistemas', 'Analista de Datos', 'Data Engineer',
+                    'Ingeniero de Software', 'DevOps Engineer', 'Analista Programador'],
+        'frases': ['Buscamos profesional de ingeniería de sistemas o informática para el área de TI',
+                   'Se requiere ingeniero para el equipo de desarrollo de software',
+                   'Importante empresa busca data engineer para proyectos de ciencia de datos'],
+        'habilidades': ['python', 'java', 'sql', 'javascript', 'git', 'docker', 'aws', 'linux', 'react', 'postgresql',
+                        'trabajo en equipo', 'proactividad'],
+    },
+    'Ingeniería Civil': {
+        'titulos': ['Ingeniero Civil', 'Residente de Obra', 'Supervisor de Obra', 'Ingeniero de Estructuras'],
+        'frases': ['Empresa constructora requiere ingeniero civil para obra en Lima',
+                   'Se busca ingeniería civil con experiencia en estructuras y planos'],
+        'habilidades': ['autocad', 'excel', 'project', 'office', 'liderazgo', 'responsabilidad'],
+    },
+    'Ingeniería Industrial': {
+        'titulos': ['Ingeniero Industrial', 'Analista de Procesos', 'Jefe de Producción', 'Analista de Logística'],
+        'frases': ['Buscamos ingeniero industrial para mejora de procesos y producción',
+                   'Área de logística requiere profesional de ingeniería industrial'],
+        'habilidades': ['excel', 'power bi', 'sap', 'Mejora_procesos', 'gestión_proyectos', 'comunicación'],
+    },
+    'Ingeniería de Minas': {
+        'titulos': ['Ingeniero de Minas', 'Supervisor de Mina', 'Ingeniero de Voladura'],
+        'frases': ['Unidad minera requiere ingeniero de minas para operaciones',
+                   'Empresa de minería busca supervisor con experiencia en voladura'],
+        'habilidades': ['autocad', 'excel', 'seguridad', 'liderazgo', 'compromiso'],
+    },
+    'Ingeniería Ambiental': {
+        'titulos': ['Ingeniero Ambiental', 'Especialista en Medio Ambiente', 'Supervisor Ambiental'],
+        'frases': ['Se requiere ingeniero ambiental para gestión de residuos',
+                   'Consultora busca especialista en impacto ambiental'],
+        'habilidades': ['excel', 'office', 'seguridad', 'responsabilidad', 'comunicación'],
+    },
+    'Ingeniería Agrónoma': {
+        'titulos': ['Ingeniero Agrónomo', 'Supervisor de Cultivos', 'Jefe de Fundo'],
+        'frases': ['Empresa agroindustrial requiere ingeniero agrónomo para manejo de cultivos',
+                   'Se busca profesional de agronomía para campo agrícola'],
+        'habilidades': ['excel', 'office', 'liderazgo', 'trabajo en equipo'],
+    },
+    # Pasa el filtro de ingeniería pero no se clasifica en ninguna carrera
+    'Sin clasificar': {
+        'titulos': ['Ingeniero de Proyectos', 'Ingeniero Comercial', 'Ingeniero de Ventas'],
+        'frases': ['Ingeniero para cartera de clientes corporativos', 'Se requiere ingeniero para ventas técnicas'],
+        'habilidades': ['excel', 'orientación al cliente', 'comunicación'],
+    },
+    # No pasa el filtro de ingeniería
+    'No ingeniería': {
+        'titulos': ['Vendedor', 'Asistente Administrativo', 'Cajero', 'Auxiliar Contable', 'Recepcionista'],
+        'frases': ['Tienda por departamento busca personal para atención al público',
+                   'Se requiere asistente para labores de oficina'],
+        'habilidades': ['excel', 'office', 'orientación al cliente', 'comunicación'],
+    },
+}
+
+MEZCLA_CARRERAS = {
+    'Ingeniería de Sistemas': 0.35, 'Ingeniería Civil': 0.15, 'Ingeniería Industrial': 0.15,
+    'Ingeniería de Minas': 0.08, 'Ingeniería Ambiental': 0.05, 'Ingeniería Agrónoma': 0.04,
+    'Sin clasificar': 0.05, 'No ingeniería': 0.13,
+}
+
+# Probabilidad de que una oferta pida una habilidad típica de su perfil y cualquier otra
+PROB_TIPICA = 0.45
+PROB_OTRA = 0.02
+
+RELLENO = [
+    'Ofrecemos línea de carrera y capacitación constante.', 'Horario de lunes a viernes.',
+    'Beneficios de ley desde el primer día.', 'Trabajo en un ambiente dinámico y colaborativo.',
+    'Disponibilidad para viajar ocasionalmente.', 'Seguro EPS y bonos por desempeño.',
+    'Incorporación inmediata.', 'Se valorará experiencia previa en el rubro.',
+]
+REGIONES = ['Lima', 'Arequipa', 'La Libertad', 'Piura', 'Cusco', 'Junín']
+
+def _probabilidades(perfil, habilidades, mezcla_habilidades):
+    probabilidades = np.array([
+        PROB_TIPICA if h in perfil['habilidades'] else PROB_OTRA for h in habilidades
+    ])
+    for habilidad, probabilidad in (mezcla_habilidades or {}).items():
+        probabilidades[habilidades.index(habilidad)] = probabilidad
+    return probabilidades
+
+def _salarios(rng, n):
+    montos = rng.integers(1025, 15000, n) * 1.0
+    texto = [f"S/ {int(m):,}".replace(',', '.') + ",00" for m in montos]
+    formato = rng.integers(0, 4, n)
+    return [t + " (Mensual)" if f == 0 else t if f == 1 else "A convenir" if f == 2 else None
+            for t, f in zip(texto, formato)]
+
+def generar_bloque(rng, filas, mezcla_carreras=None, mezcla_habilidades=None, frases_relleno=3):
+    """DataFrame de `filas` ofertas crudas con las columnas de la exportación de Computrabajo"""
+    mezcla = mezcla_carreras or MEZCLA_CARRERAS
+    nombres = list(mezcla)
+    pesos = np.array([mezcla[n] for n in nombres], dtype=float)
+    tipos = rng.choice(len(nombres), filas, p=pesos / pesos.sum())
+
+    duras, blandas = HARD_SKILLS, SOFT_SKILLS
+    habilidades = duras + blandas
+    titulos = np.empty(filas, dtype=object)
+    descripciones = np.empty(filas, dtype=object)
+    requerimientos = np.empty(filas, dtype=object)
+
+    for i, nombre in enumerate(nombres):
+        indices = np.flatnonzero(tipos == i)
+        if not len(indices):
+            continue
+        perfil = PERFILES[nombre]
+        k = len(indices)
+        pide = rng.random((k, len(habilidades))) < _probabilidades(perfil, habilidades, mezcla_habilidades)
+        titulos[indices] = rng.choice(perfil['titulos'], k)
+        frases = rng.choice(perfil['frases'], k)
+        relleno = rng.choice(RELLENO, (k, frases_relleno))
+        descripciones[indices] = [
+            f"{frase}.\nExperiencia en {', '.join(compress(duras, fila[:len(duras)])) or 'el puesto'}. {' '.join(extra)}"
+            for frase, fila, extra in zip(frases, pide, relleno)
+        ]
+        requerimientos[indices] = [
+            '; '.join(compress(blandas, fila[len(duras):])) or 'Disponibilidad inmediata'
+            for fila in pide
+        ]
+
+    empresas = np.array([f"Empresa {i} S.A.C." for i in range(max(10, filas // 20))] + [None], dtype=object)
+    return pd.DataFrame({
+        'Título': titulos,
+        'Subtítulo': rng.choice(np.array(REGIONES + [None], dtype=object), filas),
+        'Empresa': rng.choice(empresas, filas),
+        'Calificación': np.round(rng.uniform(3.0, 5.0, filas), 1),
+        'URL_Empresa': 'https://pe.computrabajo.com',
+        'Región': rng.choice(REGIONES, filas),
+        'Salario': _salarios(rng, filas),
+        'Descripción': descripciones,
+        'Requerimientos': requerimientos,
+        'Contrato': rng.choice(['Indefinido', 'Plazo fijo', 'Por obra'], filas),
+        'Jornada': rng.choice(['Tiempo completo', 'Medio tiempo'], filas),
+        'Tipo_Asistencia': rng.choice(np.array(['Presencial', 'Remoto', 'Híbrido', None], dtype=object), filas),
+        'Acerca_de_Empresa': 'Empresa líder en su rubro.',
+    })
+
+def generar_csv(ruta, filas, semilla=0, mezcla_carreras=None, mezcla_habilidades=None, filas_por_bloque=100_000):
+    """Escribe el CSV por bloques (la memoria no depende de `filas`); devuelve la ruta"""
+    rng = np.random.default_rng(semilla)
+    escritas = 0
+    while escritas < filas:
+        n = min(filas_por_bloque, filas - escritas)
+        bloque = generar_bloque(rng, n, mezcla_carreras, mezcla_habilidades)
+        bloque.to_csv(ruta, sep=';', index=False, mode='w' if escritas == 0 else 'a', header=escritas == 0)
+        escritas += n
+    return ruta
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un CSV sintético de Computrabajo")
+    parser.add_argument("salida")
+    parser.add_argument("--filas", type=int, default=10_000)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--mezcla-carreras", type=json.loads, default=None, help='JSON {"Ingeniería Civil": 0.5, ...}')
+    parser.add_argument("--mezcla-habilidades", type=json.loads, default=None, help='JSON {"python": 0.8, ...}')
+    args = parser.parse_args()
+    generar_csv(args.salida, args.filas, args.semilla, args.mezcla_carreras, args.mezcla_habilidades)
+    print(f"✅ {args.filas} filas escritas en {args.salida}")
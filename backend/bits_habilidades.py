@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from taxonomia import TAXONOMIA
+
+# Orden de los bits: el de las habilidades en la taxonomía (bit 0 = primera columna)
+COLUMNAS_BITS = list(TAXONOMIA.columnas())
+
+def empaquetar(df: pd.DataFrame) -> np.ndarray:
+    """Una máscara uint64 por fila con un bit por habilidad; las columnas que falten cuentan como 0"""
+    matriz = np.zeros((len(df), 64), dtype=np.uint8)
+    for bit, columna in enumerate(COLUMNAS_BITS):
+        if columna in df.columns:
+            matriz[:, bit] = df[columna].fillna(0).to_numpy(dtype=np.uint8)
+    # 64 bits por fila -> 8 bytes en orden little-endian -> un uint64
+    return np.packbits(matriz, axis=1, bitorder="little").view("<u8").ravel().astype(np.uint64)
+
+def mascara(habilidades) -> int:
+    """Máscara con los bits de las columnas dadas; ValueError si alguna no existe"""
+    desconocidas = [h for h in habilidades if h not in COLUMNAS_BITS]
+    if desconocidas:
+        raise ValueError(f"Habilidades desconocidas: {', '.join(desconocidas)}")
+    valor = 0
+    for habilidad in habilidades:
+        valor |= 1 << COLUMNAS_BITS.index(habilidad)
+    return valor
+
+def frecuencias(bits: np.ndarray) -> np.ndarray:
+    """Ofertas que piden cada habilidad (en el orden de COLUMNAS_BITS), en una pasada sobre los bytes"""
+    if len(bits) == 0:
+        return np.zeros(len(COLUMNAS_BITS), dtype=np.int64)
+    por_bit = np.unpackbits(np.ascontiguousarray(bits, dtype="<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    return por_bit[:, :len(COLUMNAS_BITS)].sum(axis=0, dtype=np.int64)
+
+def contar_con_todas(bits: np.ndarray, valor_mascara: int) -> int:
+    """Ofertas que piden todas las habilidades de la máscara"""
+    m = np.uint64(valor_mascara)
+    return int(np.count_nonzero((bits & m) == m))
@@ -0,0 +1,364 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+# Segundos entre escrituras de la marca de uso (LRU) de BackendSQLite; los aciertos solo leen
+CACHE_SQLITE_INTERVALO_USOS = float(os.getenv("CACHE_SQLITE_INTERVALO_USOS", "5"))
+
+class BackendMemoria:
+    """
+    Almacenamiento LRU con expiración (TTL) en la memoria del proceso.
+
+    El TTL es igual para todas las entradas, así que el orden de inserción es
+    el orden de expiración: purgar solo revisa el inicio de una cola (O(1)
+    amortizado), sin recorrer toda la caché. No es seguro entre hilos por sí
+    mismo; CacheEstadisticas lo protege con su lock.
+    """
+
+    compartido = False
+
+    def __init__(self, max_entradas=256, ttl_segundos=300):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._entradas = OrderedDict()      # clave -> valor, en orden de uso (LRU)
+        self._expiraciones = OrderedDict()  # clave -> instante de expiración, en orden de inserción
+        self._version = 0
+        self.desalojos = 0
+        self.expirados = 0
+
+    def _purgar_expirados(self, ahora):
+        while self._expiraciones:
+            clave, expira = next(iter(self._expiraciones.items()))
+            if expira > ahora:
+                break
+            del self._expiraciones[clave]
+            del self._entradas[clave]
+            self.expirados += 1
+
+    def get(self, clave):
+        self._purgar_expirados(time.monotonic())
+        if clave not in self._entradas:
+            return None
+        self._entradas.move_to_end(clave)
+        return self._entradas[clave]
+
+    def set(self, clave, valor):
+        ahora = time.monotonic()
+        self._purgar_expirados(ahora)
+        self._entradas[clave] = valor
+        self._entradas.move_to_end(clave)
+        self._expiraciones.pop(clave, None)
+        self._expiraciones[clave] = ahora + self.ttl_segundos
+        while len(self._entradas) > self.max_entradas:
+            antigua, _ = self._entradas.popitem(last=False)
+            del self._expiraciones[antigua]
+            self.desalojos += 1
+
+    def version(self):
+        return self._version
+
+    def invalidar(self):
+        self._entradas.clear()
+        self._expiraciones.clear()
+        self._version += 1
+
+    def claves(self):
+        self._purgar_expirados(time.monotonic())
+        return list(self._entradas.keys())
+
+class BackendSQLite:
+    """
+    Almacenamiento compartido en un archivo SQLite local, para que todos los
+    workers de uvicorn de un mismo host reutilicen las estadísticas que
+    calculó cualquiera de ellos.
+
+    Los valores se guardan como JSON compacto comprimido con zlib. La
+    expiración y el LRU se resuelven con índices sobre `expira` y `usado`,
+    y la invalidación incrementa una versión guardada en el mismo archivo,
+    de modo que un dataset nuevo cargado por un worker invalida a todos.
+
+    Un acierto no escribe: la marca `usado` se acumula en memoria y se
+    vuelca como mucho cada `intervalo_usos` segundos (y siempre antes de
+    desalojar en set), así las lecturas de varios workers no se turnan en
+    el escritor del WAL. Si el archivo está bloqueado más que el timeout,
+    get cuenta como fallo y set no guarda, en vez de fallar la solicitud.
+    """
+
+    compartido = True
+
+    def __init__(self, ruta, max_entradas=256, ttl_segundos=300, intervalo_usos=CACHE_SQLITE_INTERVALO_USOS):
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self.intervalo_usos = intervalo_usos
+        self.desalojos = 0
+        self.expirados = 0
+        self._local = threading.local()
+        self._usos = {}  # clave -> último acierto aún no escrito
+        self._ultimo_volcado = time.monotonic()
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with self._conexion() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    clave TEXT PRIMARY KEY, valor BLOB NOT NULL, expira REAL NOT NULL, usado REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_cache_expira ON cache (expira);
+                CREATE INDEX IF NOT EXISTS ix_cache_usado ON cache (usado);
+                CREATE TABLE IF NOT EXISTS cache_version (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL);
+                INSERT OR IGNORE INTO cache_version (id, version) VALUES (1, 0);
+            """)
+
+    def _conexion(self):
+        # sqlite3 no comparte conexiones entre hilos: una por hilo
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.ruta, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _serializar(valor):
+        return zlib.compress(json.dumps(valor, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 1)
+
+    @staticmethod
+    def _deserializar(datos):
+        return json.loads(zlib.decompress(datos))
+
+    def _volcar_usos(self, conn):
+        if self._usos:
+            usos, self._usos = self._usos, {}
+            conn.executemany("UPDATE cache SET usado = ? WHERE clave = ?", [(usado, clave) for clave, usado in usos.items()])
+        self._ultimo_volcado = time.monotonic()
+
+    def get(self, clave):
+        ahora = time.time()
+        try:
+            conn = self._conexion()
+            fila = conn.execute("SELECT valor FROM cache WHERE clave = ? AND expira > ?", (clave, ahora)).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        if fila is None:
+            return None
+        self._usos[clave] = ahora
+        if time.monotonic() - self._ultimo_volcado >= self.intervalo_usos:
+            try:
+                self._volcar_usos(conn)
+            except sqlite3.OperationalError:
+                pass  # la marca de uso es aproximada; se reintenta en el próximo volcado
+        return self._deserializar(fila[0])
+
+    def set(self, clave, valor):
+        ahora = time.time()
+        try:
+            conn = self._conexion()
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:
+            return
+        try:
+            self._volcar_usos(conn)
+            self.expirados += conn.execute("DELETE FROM cache WHERE expira <= ?", (ahora,)).rowcount
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (clave, valor, expira, usado) VALUES (?, ?, ?, ?)",
+                (clave, self._serializar(valor), ahora + self.ttl_segundos, ahora)
+            )
+            exceso = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entradas
+            if exceso > 0:
+                self.desalojos += conn.execute(
+                    "DELETE FROM cache WHERE clave IN (SELECT clave FROM cache ORDER BY usado LIMIT ?)", (exceso,)
+                ).rowcount
+            conn.execute("COMMIT")
+        except sqlite3.OperationalError:
+            conn.execute("ROLLBACK")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def version(self):
+        return self._conexion().execute("SELECT version FROM cache_version WHERE id = 1").fetchone()[0]
+
+    def invalidar(self):
+        conn = self._conexion()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM cache")
+        conn.execute("UPDATE cache_version SET version = version + 1 WHERE id = 1")
+        conn.execute("COMMIT")
+        self._usos.clear()
+
+    def claves(self):
+        filas = self._conexion().execute("SELECT clave FROM cache WHERE expira > ? ORDER BY usado", (time.time(),))
+        return [clave for clave, in filas]
+
+def crear_backend(nombre, max_entradas=256, ttl_segundos=300, ruta_sqlite="data/cache_estadisticas.sqlite3"):
+    """Backend de caché según configuración: 'memoria' (por proceso) o 'sqlite' (compartido por los workers)"""
+    if nombre == "memoria":
+        return BackendMemoria(max_entradas, ttl_segundos)
+    if nombre == "sqlite":
+        return BackendSQLite(ruta_sqlite, max_entradas, ttl_segundos)
+    raise ValueError(f"Backend de caché desconocido: {nombre}")
+
+class _Vuelo:
+    """Cálculo en curso de una clave, compartido por las solicitudes que llegan mientras tanto"""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.esperas = []  # (loop, futuro) de las esperas async
+        self.valor = None
+        self.error = None
+
+def _resolver(futuro):
+    if not futuro.done():
+        futuro.set_result(None)
+
+class CacheEstadisticas:
+    """
+    Caché de estadísticas sobre un backend intercambiable (ver crear_backend).
+
+    - Single-flight: si varias solicitudes fallan a la vez sobre la misma
+      clave, solo una calcula y las demás esperan su resultado (dentro del
+      proceso; entre workers lo evita el backend compartido).
+    - invalidar() vacía la caché y descarta los cálculos que empezaron antes,
+      para no guardar resultados de un dataset reemplazado.
+    """
+
+    def __init__(self, max_entradas=256, ttl_segundos=300, backend=None):
+        self.backend = backend or BackendMemoria(max_entradas, ttl_segundos)
+        self._en_vuelo = {}
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.compartidos = 0
+
+    def get(self, clave):
+        with self._lock:
+            valor = self.backend.get(clave)
+            if valor is None:
+                self.fallos += 1
+            else:
+                self.aciertos += 1
+            return valor
+
+    def set(self, clave, valor):
+        with self._lock:
+            self.backend.set(clave, valor)
+
+    def _reservar(self, clave):
+        """(valor en caché, vuelo, es_lider, versión); quien no es líder espera el vuelo de otro"""
+        with self._lock:
+            valor = self.backend.get(clave)
+            if valor is not None:
+                self.aciertos += 1
+                return valor, None, False, None
+            vuelo = self._en_vuelo.get(clave)
+            if vuelo is None:
+                vuelo = self._en_vuelo[clave] = _Vuelo()
+                self.fallos += 1
+                return None, vuelo, True, self.backend.version()
+            self.compartidos += 1
+            return None, vuelo, False, None
+
+    def _terminar(self, clave, vuelo, version):
+        with self._lock:
+            if self._en_vuelo.get(clave) is vuelo:
+                del self._en_vuelo[clave]
+            if vuelo.error is None and vuelo.valor is not None and version == self.backend.version():
+                self.backend.set(clave, vuelo.valor)
+            vuelo.evento.set()
+            esperas, vuelo.esperas = vuelo.esperas, []
+        for loop, futuro in esperas:
+            loop.call_soon_threadsafe(_resolver, futuro)
+
+    @staticmethod
+    def _resultado(vuelo):
+        if vuelo.error is not None:
+            raise vuelo.error
+        return vuelo.valor, vuelo.valor is not None
+
+    def obtener_o_calcular(self, clave, calcular):
+        """
+        Devuelve (valor, desde_cache). Si `calcular` devuelve None el
+        resultado no se guarda (p. ej. una carrera sin ofertas).
+        """
+        valor, vuelo, lider, version = self._reservar(clave)
+        if vuelo is None:
+            return valor, True
+        if not lider:
+            vuelo.evento.wait()
+            return self._resultado(vuelo)
+
+        try:
+            vuelo.valor = calcular()
+        except Exception as e:
+            vuelo.error = e
+            raise
+        finally:
+            self._terminar(clave, vuelo, version)
+        return vuelo.valor, False
+
+    async def obtener_o_calcular_async(self, clave, calcular):
+        """
+        Igual que obtener_o_calcular, para endpoints async: `calcular` es una
+        corrutina y quien espera el cálculo de otra solicitud no ocupa un hilo.
+        Comparte los vuelos con la versión síncrona. Con un backend compartido
+        (archivo SQLite) las lecturas y escrituras del backend van a un hilo,
+        para no detener el event loop si el archivo está ocupado.
+        """
+        fuera_del_loop = self.backend.compartido
+        if fuera_del_loop:
+            valor, vuelo, lider, version = await asyncio.to_thread(self._reservar, clave)
+        else:
+            valor, vuelo, lider, version = self._reservar(clave)
+        if vuelo is None:
+            return valor, True
+        if not lider:
+            loop = asyncio.get_running_loop()
+            futuro = loop.create_future()
+            with self._lock:
+                pendiente = not vuelo.evento.is_set()
+                if pendiente:
+                    vuelo.esperas.append((loop, futuro))
+            if pendiente:
+                await futuro
+            return self._resultado(vuelo)
+
+        try:
+            vuelo.valor = await calcular()
+        except Exception as e:
+            vuelo.error = e
+            raise
+        finally:
+            if fuera_del_loop:
+                await asyncio.to_thread(self._terminar, clave, vuelo, version)
+            else:
+                self._terminar(clave, vuelo, version)
+        return vuelo.valor, False
+
+    def invalidar(self):
+        with self._lock:
+            self.backend.invalidar()
+            self._en_vuelo.clear()
+
+    def claves(self):
+        with self._lock:
+            return self.backend.claves()
+
+    def estado(self):
+        with self._lock:
+            return {
+                "backend": "sqlite" if self.backend.compartido else "memoria",
+                "entradas_activas": len(self.backend.claves()),
+                "max_entradas": self.backend.max_entradas,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.backend.desalojos,
+                "expirados": self.backend.expirados,
+                "compartidos": self.compartidos,
+            }
@@ -1,10 +1,21 @@
+import glob
 import json
+import numpy as np
 from datetime import datetime
+from itertools import chain
+from operator import itemgetter
+
+try:
+    import orjson  # decodifica el registro de métricas ~3 veces más rápido; sin él se usa json
+    _cargar_json = orjson.loads
+except ImportError:
+    _cargar_json = json.loads
 
 # CONSTANTES BASADAS EN ESPECIFICACIONES TÉCNICAS
 TDP_CPU_PROMEDIO = 65  # Watts - TDP típico de CPU servidor Intel Xeon/AMD EPYC
 CONSUMO_RAM_POR_GB = 3  # Watts por GB - Valor estándar industria DDR4
 RAM_TOTAL_GB = 16  # Ajustar según tu servidor
+FACTOR_EMISION_KG_KWH = 0.5  # kg CO2 por kWh, promedio mundial
 
 def calcular_energia_por_consulta(metricas):
     """
@@ -70,7 +81,7 @@ def calcular_energia_por_consulta(metricas):
     
     # PASO 5: Calcular emisiones de CO2
     # Factor de emisión promedio: 0.5 kg CO2 por kWh
-    co2_kg = (energia_wh / 1000) * 0.5  # Convertir Wh a kWh
+    co2_kg = (energia_wh / 1000) * FACTOR_EMISION_KG_KWH  # Convertir Wh a kWh
     
     # PASO 6: Calcular equivalencia comprensible
     # Un LED de 10W en 1 minuto consume: 10W × (1/60)h = 0.167 Wh
@@ -83,34 +94,115 @@ def calcular_energia_por_consulta(metricas):
         "equivalente": f"Encender un LED 10W por {round(minutos_led, 1)} minutos"
     }
 
-def analizar_archivo_metricas():
+def calcular_energia_lote(cpu_percent, ram_mb, tiempo_seg):
+    """
+    Versión vectorizada de calcular_energia_por_consulta: recibe columnas
+    (listas o arreglos NumPy) de CPU %, RAM en MB y duración en segundos y
+    devuelve arreglos de energía (Wh), potencia (W) y CO2 (g), con el mismo
+    redondeo por consulta.
+    """
+    cpu_percent = np.asarray(cpu_percent, dtype=np.float64)
+    ram_mb = np.asarray(ram_mb, dtype=np.float64)
+    tiempo_seg = np.asarray(tiempo_seg, dtype=np.float64)
+
+    potencia_total_w = (cpu_percent / 100) * TDP_CPU_PROMEDIO + (ram_mb / 1024) * CONSUMO_RAM_POR_GB
+    energia_wh = (potencia_total_w * tiempo_seg) / 3600
+    co2_kg = (energia_wh / 1000) * FACTOR_EMISION_KG_KWH
+
+    return {
+        "energia_wh": np.round(energia_wh, 6),
+        "potencia_promedio_w": np.round(potencia_total_w, 2),
+        "co2_gramos": np.round(co2_kg * 1000, 4)
+    }
+
+_COLUMNAS_ENERGIA = itemgetter("cpu_promedio_percent", "ram_promedio_mb", "tiempo_total_seg")
+
+class AgregadorEnergia:
+    """
+    Totales de consultas, CPU, RAM, tiempo, energía y CO2 acumulados por
+    lotes, sin guardar los registros: sirve para recorrer historiales de
+    métricas de cualquier tamaño en memoria constante.
+    """
+
+    CAMPOS = ("total_consultas", "suma_cpu", "suma_ram", "suma_tiempo", "energia_total_wh", "co2_total_gramos")
+
+    def __init__(self, **totales):
+        for campo in self.CAMPOS:
+            setattr(self, campo, totales.get(campo, 0))
+
+    def agregar_lote(self, cpu_percent, ram_mb, tiempo_seg):
+        """Acumula un lote de columnas y devuelve la energía por consulta (ver calcular_energia_lote)"""
+        energia = calcular_energia_lote(cpu_percent, ram_mb, tiempo_seg)
+        self.total_consultas += len(energia["energia_wh"])
+        self.suma_cpu += float(np.sum(cpu_percent))
+        self.suma_ram += float(np.sum(ram_mb))
+        self.suma_tiempo += float(np.sum(tiempo_seg))
+        self.energia_total_wh += float(energia["energia_wh"].sum())
+        self.co2_total_gramos += float(energia["co2_gramos"].sum())
+        return energia
+
+    def agregar_registros(self, registros):
+        """Acumula registros con las claves de MonitorRecursos.finalizar_monitoreo"""
+        columnas = np.fromiter(
+            chain.from_iterable(map(_COLUMNAS_ENERGIA, registros)), dtype=np.float64, count=3 * len(registros)
+        ).reshape(-1, 3)
+        return self.agregar_lote(columnas[:, 0], columnas[:, 1], columnas[:, 2])
+
+    def consumir_archivo(self, ruta, bytes_por_bloque=4 * 1024 * 1024):
+        """Acumula un archivo JSON Lines leyéndolo por bloques"""
+        with open(ruta, "rb") as f:
+            while True:
+                lineas = f.readlines(bytes_por_bloque)
+                if not lineas:
+                    break
+                self.agregar_registros([_cargar_json(l) for l in lineas if l.strip()])
+        return self
+
+    def como_dict(self):
+        return {campo: getattr(self, campo) for campo in self.CAMPOS}
+
+    def estadisticas(self):
+        """Promedios y totales con el formato de /obtener-metricas/; {} si no hay consultas"""
+        total = self.total_consultas
+        if not total:
+            return {}
+        return {
+            "total_consultas": total,
+            "cpu_promedio": round(self.suma_cpu / total, 2),
+            "ram_promedio": round(self.suma_ram / total, 2),
+            "tiempo_promedio": round(self.suma_tiempo / total, 4),
+            "energia_total_wh": round(self.energia_total_wh, 4),
+            "co2_total_gramos": round(self.co2_total_gramos, 2),
+            "energia_promedio_wh": round(self.energia_total_wh / total, 6)
+        }
+
+def analizar_archivo_metricas(ruta="data/metricas_recursos.json"):
     """
     Lee todas las métricas guardadas y genera reporte total
-    
+
     PROCESO:
-    1. Lee archivo JSON línea por línea
-    2. Calcula energía para cada consulta
-    3. Suma totales
+    1. Lee el archivo activo y los rotados por bloques de líneas
+    2. Calcula energía de cada bloque en una sola operación vectorizada
+    3. Acumula totales sin guardar los registros en memoria
     4. Calcula promedios
     """
-    with open("data/metricas_recursos.json", "r") as f:
-        lineas = f.readlines()
-    
-    metricas_list = [json.loads(l) for l in lineas]
-    
-    total_energia = 0
-    total_co2 = 0
-    
-    for m in metricas_list:
-        calculo = calcular_energia_por_consulta(m)
-        total_energia += calculo["energia_wh"]
-        total_co2 += calculo["co2_gramos"]
-    
+    agregador = AgregadorEnergia()
+    rotados = sorted(glob.glob(f"{glob.escape(ruta[:-len('.json')])}_[0-9]*.json"))
+    for archivo in rotados + [ruta]:
+        try:
+            agregador.consumir_archivo(archivo)
+        except FileNotFoundError:
+            continue
+
+    if not agregador.total_consultas:
+        print("No hay métricas registradas")
+        return
+
     print(f"=== REPORTE CONSUMO ENERGÉTICO ===")
-    print(f"Total consultas: {len(metricas_list)}")
-    print(f"Energía total: {round(total_energia, 4)} Wh")
-    print(f"CO2 total: {round(total_co2, 2)} gramos")
-    print(f"Promedio por consulta: {round(total_energia/len(metricas_list), 6)} Wh")
+    print(f"Total consultas: {agregador.total_consultas}")
+    print(f"Energía total: {round(agregador.energia_total_wh, 4)} Wh")
+    print(f"CO2 total: {round(agregador.co2_total_gramos, 2)} gramos")
+    print(f"Promedio por consulta: {round(agregador.energia_total_wh/agregador.total_consultas, 6)} Wh")
 
 if __name__ == "__main__":
     analizar_archivo_metricas()
@@ -0,0 +1,361 @@
+import io
+import os
+import uuid
+import pandas as pd
+from sqlalchemy import MetaData, bindparam, func, inspect, select, update
+from sqlalchemy.sql.elements import conv
+from database import engine as engine_por_defecto
+from models.habilidad import Habilidad
+from models.resumen_carrera import ResumenCarrera
+from models.oferta_descartada import OfertaDescartada
+from consultas import clave_carrera
+from bits_habilidades import COLUMNAS_BITS, empaquetar
+
+# Filas por lote en el executemany (motores sin COPY)
+TAMANO_LOTE = int(os.getenv("CARGA_TAMANO_LOTE", "10000"))
+# Hashes por sentencia en los IN (...) de la carga incremental
+TAMANO_LOTE_HASHES = 500
+
+# Funciones que se llaman cada vez que se publica un dataset nuevo (p. ej. invalidar cachés)
+_al_publicar = []
+
+def registrar_al_publicar(funcion):
+    _al_publicar.append(funcion)
+    return funcion
+
+def _copiar_tabla(tabla, nombre):
+    """Copia la definición de `tabla` con otro nombre; los índices con nombre explícito también se renombran"""
+    copia = tabla.to_metadata(MetaData(), name=nombre)
+    for indice in copia.indexes:
+        # Los nombres generados por convención (conv) ya se derivan del nuevo nombre de tabla
+        if isinstance(indice.name, str) and not isinstance(indice.name, conv) and tabla.name in indice.name:
+            indice.name = indice.name.replace(tabla.name, nombre, 1)
+    return copia
+
+def calcular_resumen_carreras(df: pd.DataFrame) -> pd.DataFrame:
+    """Suma de cada columna hard_*/soft_* y total de ofertas, por carrera"""
+    habilidades = [c for c in df.columns if c.startswith("hard_") or c.startswith("soft_")]
+    resumen = df[habilidades].astype(int).groupby(df["career"]).sum()
+    resumen["total_ofertas"] = df.groupby("career").size()
+    return resumen
+
+def _resumen_desde_tabla(conn, tabla):
+    """El mismo resumen que calcular_resumen_carreras, agregado en SQL sobre la tabla completa"""
+    consulta = select(
+        tabla.c.career, func.count().label("total_ofertas"),
+        *[func.sum(tabla.c[col]).label(col) for col in COLUMNAS_BITS]
+    ).where(tabla.c.career.isnot(None)).group_by(tabla.c.career)
+    resumen = pd.DataFrame(conn.execute(consulta).all(), columns=["career", "total_ofertas"] + COLUMNAS_BITS)
+    return resumen.set_index("career").fillna(0) if not resumen.empty else None
+
+def _lotes(valores, tamano=TAMANO_LOTE_HASHES):
+    valores = list(valores)
+    for inicio in range(0, len(valores), tamano):
+        yield valores[inicio:inicio + tamano]
+
+def _rellenar_salario_numerico(conn, tabla):
+    filas = conn.execute(select(tabla.c.id, tabla.c.salary).where(tabla.c.salary.isnot(None))).all()
+    if not filas:
+        return
+    salarios = pd.DataFrame(filas, columns=["id", "salary"])
+    salarios["salario_numerico"] = convertir_salario(salarios["salary"])
+    salarios = salarios.dropna(subset=["salario_numerico"])
+    if salarios.empty:
+        return
+    conn.execute(
+        update(tabla).where(tabla.c.id == bindparam("_id")).values(salario_numerico=bindparam("_salario")),
+        [{"_id": int(i), "_salario": float(s)} for i, s in zip(salarios["id"], salarios["salario_numerico"])]
+    )
+
+def asegurar_esquema(engine=None):
+    """
+    create_all solo crea tablas que no existen: agrega a las tablas ya
+    creadas las columnas e índices nuevos de los modelos y calcula las
+    columnas derivadas (career_clave, salario_numerico, habilidades_bits)
+    en las filas cargadas antes de que existieran.
+    """
+    engine = engine or engine_por_defecto
+    inspector = inspect(engine)
+    for tabla in (Habilidad.__table__, ResumenCarrera.__table__):
+        if not inspector.has_table(tabla.name):
+            continue
+        existentes = {c["name"] for c in inspector.get_columns(tabla.name)}
+        indexados = {tuple(i["column_names"]) for i in inspector.get_indexes(tabla.name)}
+        agregadas = [c for c in tabla.columns if c.name not in existentes]
+        with engine.begin() as conn:
+            for columna in agregadas:
+                tipo = columna.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f'ALTER TABLE "{tabla.name}" ADD COLUMN "{columna.name}" {tipo}')
+            for indice in tabla.indexes:
+                if tuple(c.name for c in indice.columns) not in indexados:
+                    indice.create(conn)
+
+            if "salario_numerico" in {c.name for c in agregadas}:
+                _rellenar_salario_numerico(conn, tabla)
+            if {c.name for c in agregadas} & {"habilidades_bits", *COLUMNAS_BITS}:
+                # También si la taxonomía sumó habilidades: los bits siguen el orden actual.
+                # Un solo UPDATE: suma de cada columna 0/1 por su potencia de 2
+                bits = sum(func.coalesce(tabla.c[col], 0) * (1 << i) for i, col in enumerate(COLUMNAS_BITS))
+                conn.execute(update(tabla).values(habilidades_bits=bits))
+
+            pendientes = conn.execute(
+                select(tabla.c.career).where(tabla.c.career_clave.is_(None), tabla.c.career.isnot(None)).distinct()
+            ).scalars().all()
+            for carrera in pendientes:
+                conn.execute(
+                    update(tabla).where(tabla.c.career == carrera, tabla.c.career_clave.is_(None))
+                    .values(career_clave=clave_carrera(carrera))
+                )
+
+def convertir_salario(salarios: pd.Series) -> pd.Series:
+    """Salario de texto ("S/ 2.500,00") a número; NaN si no se puede interpretar"""
+    texto = (
+        salarios.astype(str).str.strip().str.lower()
+        .str.replace("s/", "", regex=False)
+        .str.replace(".", "", regex=False)
+        .str.replace(",", ".", regex=False)
+    )
+    return pd.to_numeric(texto, errors="coerce").where(salarios.notna())
+
+class CargadorHabilidades:
+    """
+    Carga un dataset completo de habilidades en una tabla de staging y la
+    publica con un intercambio atómico de tablas.
+
+    Los bloques se escriben en lotes grandes (COPY en PostgreSQL, executemany
+    en el resto) sobre una tabla nueva que nadie consulta; al publicar, la
+    tabla viva se renombra, la de staging toma su lugar y la anterior se
+    elimina, todo en una sola transacción. Los lectores ven el dataset
+    anterior completo o el nuevo completo, nunca uno vacío o parcial.
+
+    Mientras se cargan los bloques se acumula el resumen por carrera
+    (resumen_carreras), que se reemplaza en la misma transacción. Con
+    `instantanea` (un EscritorColumnar) cada bloque se escribe también en la
+    instantánea columnar, que se publica junto con la tabla.
+
+    Uso:
+        with CargadorHabilidades() as cargador:
+            cargador.agregar(df_bloque)
+            ...
+            cargador.publicar()
+    """
+
+    def __init__(self, engine=None, tamano_lote=TAMANO_LOTE, instantanea=None):
+        self.engine = engine or engine_por_defecto
+        self.instantanea = instantanea
+        self.tamano_lote = tamano_lote
+        self.tabla_viva = Habilidad.__table__
+        self.tabla = _copiar_tabla(self.tabla_viva, f"{self.tabla_viva.name}_carga_{uuid.uuid4().hex[:8]}")
+        self.columnas = [c.name for c in self.tabla.columns if not c.primary_key]
+        self.filas = 0
+        self.resumen = None
+        self.descartados = set()
+        self.publicado = False
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if not self.publicado:
+            self.descartar()
+        return False
+
+    def iniciar(self):
+        self.tabla.create(self.engine)
+
+    def descartar(self):
+        self.tabla.drop(self.engine, checkfirst=True)
+        if self.instantanea is not None:
+            self.instantanea.descartar()
+
+    def filtrar(self, hashes: pd.Series) -> pd.Series:
+        """En una carga completa todas las ofertas se minan (ver procesar_datos_computrabajo_por_bloques)"""
+        return pd.Series(True, index=hashes.index)
+
+    def registrar_descartados(self, hashes):
+        """Hashes de ofertas que el pipeline descartó; se guardan en ofertas_descartadas al publicar"""
+        self.descartados.update(hashes)
+
+    def agregar(self, df: pd.DataFrame):
+        """Escribe un bloque del dataset procesado en la tabla de staging"""
+        if df.empty:
+            return
+        if "career" in df.columns:
+            claves = {carrera: clave_carrera(carrera) for carrera in df["career"].dropna().unique()}
+            df = df.assign(career_clave=df["career"].map(claves))
+        if "salary" in df.columns:
+            df = df.assign(salario_numerico=convertir_salario(df["salary"]))
+        df = df.assign(habilidades_bits=empaquetar(df).astype("int64"))
+        columnas = [c for c in self.columnas if c in df.columns]
+        if not columnas:
+            return
+        datos = df[columnas].copy()
+        habilidades = [c for c in columnas if c.startswith("hard_") or c.startswith("soft_")]
+        datos[habilidades] = datos[habilidades].astype(int)
+
+        with self.engine.begin() as conn:
+            if self.engine.dialect.name == "postgresql":
+                self._copiar_postgresql(conn, datos)
+            else:
+                for inicio in range(0, len(datos), self.tamano_lote):
+                    lote = datos.iloc[inicio:inicio + self.tamano_lote]
+                    registros = lote.astype(object).where(lote.notna(), None).to_dict(orient="records")
+                    conn.execute(self.tabla.insert(), registros)
+        self.filas += len(datos)
+        if self.instantanea is not None:
+            self.instantanea.agregar(datos)
+
+        parcial = calcular_resumen_carreras(datos)
+        self.resumen = parcial if self.resumen is None else self.resumen.add(parcial, fill_value=0)
+
+    def _copiar_postgresql(self, conn, datos):
+        buffer = io.StringIO()
+        datos.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        preparador = conn.dialect.identifier_preparer
+        columnas = ", ".join(preparador.quote(c) for c in datos.columns)
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {preparador.format_table(self.tabla)} ({columnas}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+    def publicar(self):
+        """Reemplaza la tabla viva por la de staging en una sola transacción"""
+        nombre_vivo = self.tabla_viva.name
+        nombre_anterior = f"{self.tabla.name}_anterior"
+        existe = inspect(self.engine).has_table(nombre_vivo)
+
+        with self.engine.begin() as conn:
+            if self.engine.dialect.name == "sqlite":
+                # pysqlite no abre transacción antes de DDL; se abre a mano para que el intercambio sea atómico
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+            if existe:
+                conn.exec_driver_sql(f'ALTER TABLE "{nombre_vivo}" RENAME TO "{nombre_anterior}"')
+            conn.exec_driver_sql(f'ALTER TABLE "{self.tabla.name}" RENAME TO "{nombre_vivo}"')
+            if existe:
+                conn.exec_driver_sql(f'DROP TABLE "{nombre_anterior}"')
+            self._publicar_resumen(conn)
+            conn.execute(OfertaDescartada.__table__.delete())
+            self._insertar_descartados(conn, self.descartados)
+        self.publicado = True
+        if self.instantanea is not None:
+            self.instantanea.publicar()
+        for funcion in _al_publicar:
+            funcion()
+
+    def _insertar_descartados(self, conn, hashes):
+        for lote in _lotes(sorted(hashes), self.tamano_lote):
+            conn.execute(OfertaDescartada.__table__.insert(), [{"hash_contenido": h} for h in lote])
+
+    def _publicar_resumen(self, conn):
+        tabla = ResumenCarrera.__table__
+        conn.execute(tabla.delete())
+        if self.resumen is None:
+            return
+        habilidades = [c for c in self.resumen.columns if c != "total_ofertas"]
+        conn.execute(tabla.insert(), [
+            {
+                "career": carrera,
+                "career_clave": clave_carrera(carrera),
+                "total_ofertas": int(fila["total_ofertas"]),
+                "habilidades": {col: int(fila[col]) for col in habilidades},
+            }
+            for carrera, fila in self.resumen.iterrows()
+        ])
+
+def reemplazar_habilidades(df: pd.DataFrame, engine=None, instantanea=None):
+    """Carga masiva de un DataFrame completo, publicado de forma atómica"""
+    with CargadorHabilidades(engine, instantanea=instantanea) as cargador:
+        cargador.agregar(df)
+        cargador.publicar()
+    return cargador.filas
+
+class CargadorIncremental(CargadorHabilidades):
+    """
+    Carga incremental por hash de contenido: en vez de reemplazar el dataset,
+    agrega solo las ofertas nuevas y, con `retirar`, elimina las que ya no
+    vienen en el archivo.
+
+    Con él como `seguimiento` de procesar_datos_computrabajo_por_bloques, las
+    ofertas cuyo hash ya está en la tabla (o en ofertas_descartadas) no se
+    minan ni se escriben; las nuevas pasan por la tabla de staging y al
+    publicar se copian a la tabla viva, se retiran las ausentes y se
+    recalcula el resumen por carrera, todo en una transacción. El costo
+    depende de cuántas ofertas cambian, no del tamaño del dataset.
+
+    Las filas cargadas antes de que existiera hash_contenido no se pueden
+    reconocer: con `retirar` se eliminan, sin él se conservan.
+
+    Con `instantanea`, la instantánea columnar publicada se continúa: se le
+    agregan las ofertas nuevas y se marcan las retiradas. Solo si no hay una
+    que refleje la tabla viva se reconstruye desde la tabla publicada (sin
+    minar de nuevo).
+    """
+
+    def __init__(self, engine=None, tamano_lote=TAMANO_LOTE, instantanea=None, retirar=False):
+        super().__init__(engine, tamano_lote, instantanea=instantanea)
+        self.instantanea_completa = None
+        self.retirar = retirar
+        self.vistos = set()
+        self.sin_cambios = 0
+        self.retirados = 0
+        self._en_tabla = set()
+        self._descartados_antes = set()
+        self._conocidos = set()
+
+    def iniciar(self):
+        super().iniciar()
+        viva = self.tabla_viva
+        with self.engine.connect() as conn:
+            self._en_tabla = set(conn.execute(
+                select(viva.c.hash_contenido).where(viva.c.hash_contenido.isnot(None))
+            ).scalars())
+            self._descartados_antes = set(conn.execute(select(OfertaDescartada.hash_contenido)).scalars())
+            filas = conn.execute(select(func.count()).select_from(viva)).scalar()
+        self._conocidos = self._en_tabla | self._descartados_antes
+        if self.instantanea is not None and not self.instantanea.continuar(self._en_tabla, filas):
+            # Sin instantánea base: los bloques no se escriben en ella y se reconstruye al publicar
+            self.instantanea_completa, self.instantanea = self.instantanea, None
+
+    def filtrar(self, hashes: pd.Series) -> pd.Series:
+        conocidas = hashes.isin(self._conocidos)
+        self.vistos.update(hashes[conocidas])
+        self.sin_cambios += int(conocidas.sum())
+        return ~conocidas
+
+    def publicar(self):
+        viva = self.tabla_viva
+        descartadas = OfertaDescartada.__table__
+        with self.engine.begin() as conn:
+            if self.engine.dialect.name == "sqlite":
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+            conn.execute(viva.insert().from_select(self.columnas, select(*[self.tabla.c[c] for c in self.columnas])))
+            if self.retirar:
+                for lote in _lotes(self._en_tabla - self.vistos):
+                    self.retirados += conn.execute(viva.delete().where(viva.c.hash_contenido.in_(lote))).rowcount
+                self.retirados += conn.execute(viva.delete().where(viva.c.hash_contenido.is_(None))).rowcount
+                for lote in _lotes(self._descartados_antes - self.vistos):
+                    conn.execute(descartadas.delete().where(descartadas.c.hash_contenido.in_(lote)))
+            self._insertar_descartados(conn, self.descartados - self._descartados_antes)
+            self.tabla.drop(conn)
+
+            self.resumen = _resumen_desde_tabla(conn, viva)
+            self._publicar_resumen(conn)
+        self.publicado = True
+
+        if self.instantanea is not None:
+            if self.retirar:
+                self.instantanea.retirar(self._en_tabla - self.vistos, sin_hash=True)
+            self.instantanea.publicar()
+        elif self.instantanea_completa is not None:
+            with self.engine.connect() as conn:
+                for bloque in pd.read_sql(select(viva), conn, chunksize=self.tamano_lote):
+                    self.instantanea_completa.agregar(bloque)
+            self.instantanea_completa.publicar()
+        for funcion in _al_publicar:
+            funcion()
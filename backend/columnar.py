@@ -0,0 +1,334 @@
+import json
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from consultas import clave_carrera
+import bits_habilidades
+
+# Carpeta de las instantáneas columnares del dataset publicado
+COLUMNAR_DIR = os.getenv("COLUMNAR_DIR", "data/columnar")
+
+# Columnas de texto que se guardan como códigos enteros + lista de categorías
+COLUMNAS_CATEGORICAS = ["career", "title", "workday", "modality"]
+# hash_contenido (hex de 32 caracteres) como bytes de ancho fijo
+TIPO_HASH = "S32"
+# Archivos con un valor por fila, que una carga incremental copia y extiende
+ARCHIVOS_POR_FILA = ["habilidades", "habilidades_bits", "salario", "hashes", *COLUMNAS_CATEGORICAS]
+
+def _es_habilidad(columna):
+    return columna.startswith("hard_") or columna.startswith("soft_")
+
+class EscritorColumnar:
+    """
+    Escribe una instantánea columnar del dataset mientras se carga, bloque a
+    bloque, en una carpeta versionada:
+
+    - habilidades.bin: matriz uint8 (filas x habilidades), 0/1 por oferta.
+    - habilidades_bits.bin: la misma información como una máscara uint64 por
+      oferta (ver bits_habilidades.py), 8 bytes por fila para los conteos.
+    - salario.bin: salario numérico (float64, NaN si no se pudo convertir).
+    - <columna>.bin: códigos int32 de career/title/workday/modality (-1 = nulo);
+      las categorías de cada código quedan en metadatos.json.
+    - hashes.bin: hash_contenido de cada oferta (32 bytes ASCII, vacío si no tiene).
+    - retirados.bin: 1 en las filas que una carga incremental retiró (solo si hay).
+
+    Son arreglos crudos en orden C, así el lector los abre con np.memmap sin
+    copiarlos. publicar() renombra la carpeta y actualiza actual.json de forma
+    atómica; hasta entonces los lectores siguen con la instantánea anterior.
+
+    En una carga incremental, continuar() parte de la instantánea publicada:
+    copia sus archivos, agregar() añade solo las ofertas nuevas y retirar()
+    marca las que salieron, sin volver a leer la tabla.
+    """
+
+    def __init__(self, directorio=COLUMNAR_DIR):
+        self.directorio = directorio
+        self.version = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.temporal = os.path.join(directorio, f"{self.version}.tmp")
+        self.habilidades = None
+        self.categorias = {columna: {} for columna in COLUMNAS_CATEGORICAS}
+        self.filas = 0
+        self.retirados = np.zeros(0, dtype=np.uint8)
+        self._base = None
+        self._archivos = {}
+
+    def _escribir(self, nombre, arreglo):
+        if nombre not in self._archivos:
+            os.makedirs(self.temporal, exist_ok=True)
+            # "ab": tras continuar() se agrega a la copia de la instantánea anterior
+            self._archivos[nombre] = open(os.path.join(self.temporal, f"{nombre}.bin"), "ab")
+        self._archivos[nombre].write(np.ascontiguousarray(arreglo).tobytes())
+
+    def _codificar(self, columna, valores):
+        categorias = self.categorias[columna]
+        for valor in valores.dropna().unique():
+            categorias.setdefault(valor, len(categorias))
+        return valores.map(categorias).fillna(-1).to_numpy(dtype=np.int32)
+
+    def agregar(self, df: pd.DataFrame):
+        """Agrega un bloque con las columnas de Habilidad (incluido salario_numerico)"""
+        if df.empty:
+            return
+        if self.habilidades is None:
+            self.habilidades = [c for c in df.columns if _es_habilidad(c)]
+        # Columnas agregadas por asegurar_esquema quedan NULL en las filas anteriores: cuentan como 0
+        self._escribir("habilidades", df[self.habilidades].fillna(0).to_numpy(dtype=np.uint8))
+        bits = df["habilidades_bits"].to_numpy(dtype=np.int64) if "habilidades_bits" in df.columns else bits_habilidades.empaquetar(df)
+        self._escribir("habilidades_bits", bits.astype(np.uint64))
+        self._escribir("salario", pd.to_numeric(df["salario_numerico"], errors="coerce").to_numpy(dtype=np.float64))
+        for columna in COLUMNAS_CATEGORICAS:
+            valores = df[columna] if columna in df.columns else pd.Series(None, index=df.index, dtype=object)
+            self._escribir(columna, self._codificar(columna, valores))
+        hashes = df["hash_contenido"].fillna("") if "hash_contenido" in df.columns else pd.Series("", index=df.index)
+        self._escribir("hashes", hashes.to_numpy(dtype=TIPO_HASH))
+        self.filas += len(df)
+
+    def continuar(self, hashes_tabla, filas_tabla):
+        """
+        Parte de la instantánea publicada si refleja la tabla viva (mismos
+        hashes y filas vigentes). Devuelve False si no hay una utilizable (no
+        existe, es de otra taxonomía o de antes de hashes.bin, no coincide con
+        la tabla o ya tiene más retiradas que vigentes); entonces hay que
+        reconstruirla desde la tabla.
+        """
+        version = _leer_puntero(os.path.join(self.directorio, "actual.json"))
+        if version is None:
+            return False
+        base = InstantaneaColumnar(os.path.join(self.directorio, version))
+        if not base.compatible or base.hashes is None or base.filas == 0:
+            return False
+        vigentes = base.hashes if base.vigentes is None else base.hashes[base.vigentes]
+        if len(vigentes) != filas_tabla or len(vigentes) * 2 < base.filas:
+            return False
+        if set(vigentes[vigentes != b""].astype(str).tolist()) != set(hashes_tabla):
+            return False
+
+        os.makedirs(self.temporal, exist_ok=True)
+        for nombre in ARCHIVOS_POR_FILA:
+            shutil.copyfile(os.path.join(base.ruta, f"{nombre}.bin"), os.path.join(self.temporal, f"{nombre}.bin"))
+        self.habilidades = list(base.columnas_habilidades)
+        self.categorias = {c: {valor: i for i, valor in enumerate(base.categorias[c])} for c in COLUMNAS_CATEGORICAS}
+        self.filas = base.filas
+        self.retirados = np.zeros(base.filas, dtype=np.uint8) if base.vigentes is None else (~base.vigentes).astype(np.uint8)
+        self._base = base
+        return True
+
+    def retirar(self, hashes, sin_hash=False):
+        """Marca como retiradas las filas de la instantánea base con esos hashes (y, con sin_hash, las que no tienen)"""
+        if self._base is None:
+            return
+        retiradas = np.isin(self._base.hashes, np.array(sorted(hashes), dtype=TIPO_HASH))
+        if sin_hash:
+            retiradas |= self._base.hashes == b""
+        self.retirados[retiradas] = 1
+
+    def _cerrar_archivos(self):
+        for archivo in self._archivos.values():
+            archivo.close()
+        self._archivos = {}
+
+    def publicar(self):
+        self._cerrar_archivos()
+        os.makedirs(self.temporal, exist_ok=True)
+        retirados = int(self.retirados.sum())
+        if retirados:
+            # Las filas agregadas en esta carga nunca están retiradas
+            mascara = np.zeros(self.filas, dtype=np.uint8)
+            mascara[:len(self.retirados)] = self.retirados
+            mascara.tofile(os.path.join(self.temporal, "retirados.bin"))
+        self._base = None  # suelta los memmap de la versión anterior
+        metadatos = {
+            "version": self.version,
+            "filas": self.filas,
+            "retirados": retirados,
+            "hashes": True,
+            "habilidades": self.habilidades or [],
+            "categorias": {columna: list(valores) for columna, valores in self.categorias.items()},
+        }
+        with open(os.path.join(self.temporal, "metadatos.json"), "w", encoding="utf-8") as f:
+            json.dump(metadatos, f, ensure_ascii=False)
+
+        os.rename(self.temporal, os.path.join(self.directorio, self.version))
+        puntero = os.path.join(self.directorio, "actual.json")
+        anterior = _leer_puntero(puntero)
+        with open(f"{puntero}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"version": self.version}, f)
+        os.replace(f"{puntero}.tmp", puntero)
+
+        # Se conserva la anterior por si algún lector aún no la suelta (en Windows no se puede borrar mapeada)
+        for nombre in os.listdir(self.directorio):
+            ruta = os.path.join(self.directorio, nombre)
+            if os.path.isdir(ruta) and nombre not in (self.version, anterior) and not nombre.endswith(".tmp"):
+                shutil.rmtree(ruta, ignore_errors=True)
+
+    def descartar(self):
+        self._cerrar_archivos()
+        self._base = None
+        shutil.rmtree(self.temporal, ignore_errors=True)
+
+def descartar_instantanea(directorio=COLUMNAR_DIR):
+    """Deja sin instantánea publicada (p. ej. si la tabla cambió sin actualizarla); los motores responden None"""
+    try:
+        os.remove(os.path.join(directorio, "actual.json"))
+    except FileNotFoundError:
+        pass
+
+def _leer_puntero(ruta):
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            return json.load(f)["version"]
+    except FileNotFoundError:
+        return None
+
+class InstantaneaColumnar:
+    """Una versión publicada, abierta con np.memmap; es inmutable, así que se comparte entre hilos"""
+
+    def __init__(self, ruta):
+        with open(os.path.join(ruta, "metadatos.json"), "r", encoding="utf-8") as f:
+            metadatos = json.load(f)
+        self.ruta = ruta
+        self.version = metadatos["version"]
+        self.filas = metadatos["filas"]
+        self.columnas_habilidades = metadatos["habilidades"]
+        self.categorias = metadatos["categorias"]
+        # Los bits siguen el orden de COLUMNAS_BITS; una instantánea de otra taxonomía no sirve
+        self.compatible = self.columnas_habilidades == bits_habilidades.COLUMNAS_BITS
+        self.habilidades = self._abrir(ruta, "habilidades", np.uint8, (self.filas, len(self.columnas_habilidades)))
+        self.bits = self._abrir(ruta, "habilidades_bits", np.uint64, (self.filas,))
+        self.salario = self._abrir(ruta, "salario", np.float64, (self.filas,))
+        self.codigos = {c: self._abrir(ruta, c, np.int32, (self.filas,)) for c in COLUMNAS_CATEGORICAS}
+        # Instantáneas anteriores a la carga incremental no guardan hashes
+        self.hashes = self._abrir(ruta, "hashes", TIPO_HASH, (self.filas,)) if metadatos.get("hashes") else None
+        # None si ninguna fila está retirada (el caso de una carga completa)
+        self.vigentes = None
+        if metadatos.get("retirados"):
+            self.vigentes = self._abrir(ruta, "retirados", np.uint8, (self.filas,)) == 0
+        activas = set(np.unique(self.codigos["career"][self.vigentes]).tolist()) if self.vigentes is not None else None
+        # Las carreras que solo tienen filas retiradas quedan fuera, como en la tabla
+        self.claves_carrera = [
+            clave_carrera(c) if activas is None or i in activas else None
+            for i, c in enumerate(self.categorias["career"])
+        ]
+        self._por_carrera = {}
+        self._lock = threading.Lock()
+
+    def _abrir(self, ruta, nombre, tipo, forma):
+        if self.filas == 0 or 0 in forma:
+            return np.zeros(forma, dtype=tipo)
+        return np.memmap(os.path.join(ruta, f"{nombre}.bin"), dtype=tipo, mode="r", shape=forma)
+
+    def codigos_carrera(self, carrera):
+        """Igual que condicion_carrera: la clave exacta y, si no existe, las claves que la contienen"""
+        clave = clave_carrera(carrera)
+        codigos = [i for i, k in enumerate(self.claves_carrera) if k == clave]
+        return codigos or [i for i, k in enumerate(self.claves_carrera) if k is not None and clave in k]
+
+    def _solo_vigentes(self, mascara):
+        return mascara if self.vigentes is None else mascara & self.vigentes
+
+    def mascara_carrera(self, carrera):
+        return self._solo_vigentes(np.isin(self.codigos["career"], self.codigos_carrera(carrera)))
+
+    def _sumas_carrera(self, codigo):
+        # Total de ofertas y frecuencia por habilidad (en el orden de COLUMNAS_BITS); una vez por versión
+        with self._lock:
+            if codigo not in self._por_carrera:
+                bits = self.bits[self._solo_vigentes(self.codigos["career"] == codigo)]
+                self._por_carrera[codigo] = (len(bits), bits_habilidades.frecuencias(bits))
+            return self._por_carrera[codigo]
+
+    def frecuencias(self, carrera):
+        """(total_ofertas, {columna: frecuencia}), igual que frecuencias_sql"""
+        codigos = self.codigos_carrera(carrera)
+        if not codigos:
+            return 0, {}
+        total = 0
+        sumas = np.zeros(len(bits_habilidades.COLUMNAS_BITS), dtype=np.int64)
+        for codigo in codigos:
+            n, parcial = self._sumas_carrera(codigo)
+            total += n
+            sumas += parcial
+        if not total:
+            return 0, {}
+        return total, {col: int(n) for col, n in zip(bits_habilidades.COLUMNAS_BITS, sumas)}
+
+    def matriz_carrera(self, carrera):
+        """(columnas, matriz uint8 ofertas x habilidades) de la carrera"""
+        return self.columnas_habilidades, self.habilidades[self.mascara_carrera(carrera)]
+
+    def contar_con_todas(self, carrera, valor_mascara):
+        """(ofertas de la carrera, ofertas de la carrera que piden todas las habilidades de la máscara)"""
+        mascara = self.mascara_carrera(carrera)
+        bits = self.bits[mascara]
+        return len(bits), bits_habilidades.contar_con_todas(bits, valor_mascara)
+
+    def salarios_por_puesto(self, carrera, minimo=1500):
+        """Mayor salario de cada título por encima de `minimo`, igual que consultas.salarios_por_puesto"""
+        mascara = self.mascara_carrera(carrera) & (self.salario > minimo)
+        if not mascara.any():
+            return []
+        maximos = pd.Series(self.salario[mascara]).groupby(self.codigos["title"][mascara]).max()
+        titulos = self.categorias["title"]
+        salarios = [(None if codigo < 0 else titulos[codigo], float(valor)) for codigo, valor in maximos.items()]
+        salarios.sort(key=lambda par: (par[1], par[0] or ""))
+        return [{"puesto": titulo, "salario": valor} for titulo, valor in salarios]
+
+    def existe_carrera(self, carrera):
+        return bool(self.codigos_carrera(carrera)) and bool(self.mascara_carrera(carrera).any())
+
+class MotorColumnar:
+    """
+    Responde las estadísticas desde la instantánea columnar publicada, sin
+    consultar la BD. Cada llamada revisa actual.json (un stat) y vuelve a
+    abrir la instantánea solo si otro proceso publicó una versión nueva.
+    Los métodos devuelven None mientras no exista ninguna instantánea o si
+    la publicada se generó con otra taxonomía (se responde desde SQL).
+    """
+
+    def __init__(self, directorio=COLUMNAR_DIR):
+        self.directorio = directorio
+        self.puntero = os.path.join(directorio, "actual.json")
+        self._firma = None
+        self._instantanea = None
+        self._lock = threading.Lock()
+
+    def instantanea(self):
+        try:
+            estado = os.stat(self.puntero)
+        except FileNotFoundError:
+            return None
+        firma = (estado.st_mtime_ns, estado.st_size, estado.st_ino)
+        with self._lock:
+            if firma != self._firma:
+                version = _leer_puntero(self.puntero)
+                instantanea = InstantaneaColumnar(os.path.join(self.directorio, version))
+                if not instantanea.compatible:
+                    print(f"⚠️ Instantánea columnar {version} con otra taxonomía; se ignora")
+                    instantanea = None
+                self._instantanea = instantanea
+                self._firma = firma
+            return self._instantanea
+
+    def frecuencias(self, carrera):
+        instantanea = self.instantanea()
+        return None if instantanea is None else instantanea.frecuencias(carrera)
+
+    def salarios_por_puesto(self, carrera, minimo=1500):
+        instantanea = self.instantanea()
+        return None if instantanea is None else instantanea.salarios_por_puesto(carrera, minimo)
+
+    def existe_carrera(self, carrera):
+        instantanea = self.instantanea()
+        return None if instantanea is None else instantanea.existe_carrera(carrera)
+
+    def matriz_carrera(self, carrera):
+        instantanea = self.instantanea()
+        return None if instantanea is None else instantanea.matriz_carrera(carrera)
+
+    def contar_con_todas(self, carrera, valor_mascara):
+        instantanea = self.instantanea()
+        return None if instantanea is None else instantanea.contar_con_todas(carrera, valor_mascara)
@@ -0,0 +1,118 @@
+import numpy as np
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from unidecode import unidecode
+from models.habilidad import Habilidad
+from models.resumen_carrera import ResumenCarrera
+
+def clave_carrera(carrera: str) -> str:
+    """Clave canónica de una carrera: sin tildes, en minúsculas y con espacios normalizados"""
+    return " ".join(unidecode(str(carrera)).lower().split())
+
+def condicion_carrera(db: Session, carrera: str):
+    """
+    Filtro de carrera para Habilidad. Si la clave canónica existe se usa una
+    igualdad sobre la columna indexada; solo si no, se recurre a la búsqueda
+    por subcadena (LIKE '%clave%'), que recorre la tabla.
+    """
+    clave = clave_carrera(carrera)
+    if db.query(Habilidad.id).filter(Habilidad.career_clave == clave).first() is not None:
+        return Habilidad.career_clave == clave
+    return Habilidad.career_clave.like(f"%{clave}%")
+
+def carreras_canonicas(db: Session):
+    """Carreras cargadas con su clave canónica y número de ofertas"""
+    filas = db.query(ResumenCarrera.career, ResumenCarrera.career_clave, ResumenCarrera.total_ofertas).all()
+    if not filas:
+        filas = db.query(Habilidad.career, Habilidad.career_clave, func.count()) \
+            .filter(Habilidad.career.isnot(None)) \
+            .group_by(Habilidad.career, Habilidad.career_clave).all()
+    return sorted(
+        ({"carrera": carrera, "clave": clave, "total_ofertas": int(total)} for carrera, clave, total in filas),
+        key=lambda c: c["carrera"]
+    )
+
+def salarios_por_puesto(db: Session, carrera: str, minimo: float = 1500):
+    """
+    Mayor salario numérico de cada título por encima de `minimo`, ordenado
+    de menor a mayor. El filtro, la deduplicación por título y el orden se
+    resuelven en SQL sobre el índice (career_clave, salario_numerico).
+    """
+    salario = func.max(Habilidad.salario_numerico).label("salario")
+    consulta = (
+        select(Habilidad.title, salario)
+        .where(condicion_carrera(db, carrera), Habilidad.salario_numerico > minimo)
+        .group_by(Habilidad.title)
+        .order_by(salario, Habilidad.title)
+    )
+    return [{"puesto": titulo, "salario": valor} for titulo, valor in db.execute(consulta)]
+
+def existe_carrera(db: Session, carrera: str) -> bool:
+    return db.query(Habilidad.id).filter(condicion_carrera(db, carrera)).first() is not None
+
+# Cada consulta de frecuencias devuelve (total_ofertas, {columna hard_*/soft_*: frecuencia})
+
+def frecuencias_desde_resumen(db: Session, carrera: str):
+    """
+    Lee las frecuencias del resumen por carrera calculado en la carga.
+    Primero busca la clave canónica exacta (indexada); si no existe, suma
+    las carreras cuya clave la contiene, igual que condicion_carrera.
+    Devuelve None si el resumen todavía no se ha generado.
+    """
+    clave = clave_carrera(carrera)
+    filas = db.query(ResumenCarrera).filter(ResumenCarrera.career_clave == clave).all()
+    if not filas:
+        filas = db.query(ResumenCarrera).filter(ResumenCarrera.career_clave.like(f"%{clave}%")).all()
+    if not filas:
+        if db.query(ResumenCarrera.id).first() is None:
+            return None
+        return 0, {}
+
+    total = sum(f.total_ofertas for f in filas)
+    frecuencias = {}
+    for fila in filas:
+        for col, valor in fila.habilidades.items():
+            frecuencias[col] = frecuencias.get(col, 0) + valor
+    return total, frecuencias
+
+COLUMNAS_HABILIDADES = [c for c in Habilidad.__table__.columns if c.name.startswith("hard_") or c.name.startswith("soft_")]
+
+def frecuencias_sql(db: Session, carrera: str):
+    """
+    Agrega en la base de datos: un solo SELECT SUM(hard_x), ..., COUNT(*)
+    que devuelve una fila, sin traer las ofertas a Python.
+    """
+    consulta = select(
+        func.count().label("total_ofertas"),
+        *[func.sum(col).label(col.name) for col in COLUMNAS_HABILIDADES]
+    ).where(condicion_carrera(db, carrera))
+    fila = db.execute(consulta).one()
+
+    total = fila[0]
+    if not total:
+        return 0, {}
+    return total, {col.name: int(valor or 0) for col, valor in zip(COLUMNAS_HABILIDADES, fila[1:])}
+
+def contar_con_todas_sql(db: Session, carrera: str, valor_mascara: int):
+    """
+    (ofertas de la carrera, ofertas que piden todas las habilidades de la
+    máscara), con un AND de bits sobre habilidades_bits en una sola consulta.
+    """
+    con_todas = case((Habilidad.habilidades_bits.op("&")(valor_mascara) == valor_mascara, 1), else_=0)
+    consulta = select(func.count(), func.sum(con_todas)).where(condicion_carrera(db, carrera))
+    total, cantidad = db.execute(consulta).one()
+    return int(total or 0), int(cantidad or 0)
+
+def filas_habilidades_sql(db: Session, carrera: str):
+    """Filas de columnas hard_*/soft_* de la carrera, sin convertir (ver matriz_desde_filas)"""
+    return db.execute(select(*COLUMNAS_HABILIDADES).where(condicion_carrera(db, carrera))).all()
+
+def matriz_desde_filas(filas):
+    """(columnas, matriz uint8 ofertas x habilidades) a partir de filas_habilidades_sql"""
+    columnas = [col.name for col in COLUMNAS_HABILIDADES]
+    matriz = np.array(filas, dtype=np.float64).reshape(len(filas), len(columnas))
+    return columnas, np.nan_to_num(matriz).astype(np.uint8)
+
+def matriz_habilidades_sql(db: Session, carrera: str):
+    """(columnas, matriz uint8 ofertas x habilidades) de la carrera, con solo las columnas hard_*/soft_*"""
+    return matriz_desde_filas(filas_habilidades_sql(db, carrera))
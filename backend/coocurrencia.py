@@ -0,0 +1,35 @@
+import numpy as np
+
+def matriz_coocurrencia(matriz):
+    """
+    Coocurrencias de una matriz 0/1 (ofertas x habilidades) con un solo
+    producto XᵀX: la diagonal es la frecuencia de cada habilidad y (i, j) el
+    número de ofertas que piden i y j a la vez. Se multiplica en float64
+    (BLAS), exacto para conteos menores a 2^53.
+    """
+    x = np.asarray(matriz, dtype=np.float64)
+    return np.rint(x.T @ x).astype(np.int64)
+
+def matriz_lift(coocurrencias, total_ofertas):
+    """lift(i, j) = P(i y j) / (P(i) P(j)); NaN si alguna de las dos no aparece"""
+    frecuencias = np.diag(coocurrencias).astype(np.float64)
+    esperadas = np.outer(frecuencias, frecuencias)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(esperadas > 0, coocurrencias * float(total_ofertas) / esperadas, np.nan)
+
+def pares_principales(coocurrencias, lift, columnas, top):
+    """Los `top` pares (i < j) con más ofertas en común; empates por lift y luego por nombre"""
+    filas, cols = np.triu_indices(len(columnas), k=1)
+    conteos = coocurrencias[filas, cols]
+    elegidos = np.flatnonzero(conteos > 0)
+    if len(elegidos) > top:
+        # argpartition fija el conteo del puesto `top`; solo se conservan los pares que lo alcanzan
+        umbral = conteos[elegidos[np.argpartition(-conteos[elegidos], top - 1)[top - 1]]]
+        elegidos = elegidos[conteos[elegidos] >= umbral]
+    # Orden completo (conteo, lift, nombres) con lexsort; los empates en el umbral quedan fuera del top
+    rango = np.argsort(np.argsort(np.asarray(columnas, dtype=object), kind="stable"))
+    orden = np.lexsort((rango[cols[elegidos]], rango[filas[elegidos]], -lift[filas[elegidos], cols[elegidos]], -conteos[elegidos]))
+    return [
+        (columnas[filas[k]], columnas[cols[k]], int(conteos[k]), float(lift[filas[k], cols[k]]))
+        for k in elegidos[orden[:top]]
+    ]
@@ -1,6 +1,8 @@
 from database import Base, engine
 from models.habilidad import Habilidad
 from models.tiempo import TiempoCarga 
+from models.resumen_carrera import ResumenCarrera
+from models.oferta_descartada import OfertaDescartada
 
 # Esta línea le dice a SQLAlchemy que cree todas las tablas definidas
 Base.metadata.create_all(bind=engine)
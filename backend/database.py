@@ -1,8 +1,12 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from dotenv import load_dotenv
 import os
+import time
 
 # Cargar variables del .env
 load_dotenv()
@@ -14,10 +18,79 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Pool de conexiones: tamaño fijo, conexiones extra en picos, segundos máximos esperando una
+# conexión libre, reciclado (segundos, -1 = nunca) y verificación antes de entregar cada conexión
+DB_POOL_TAMANO = int(os.getenv("DB_POOL_TAMANO", "5"))
+DB_POOL_EXCESO = int(os.getenv("DB_POOL_EXCESO", "10"))
+DB_POOL_ESPERA = float(os.getenv("DB_POOL_ESPERA", "30"))
+DB_POOL_RECICLAR = int(os.getenv("DB_POOL_RECICLAR", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+# Con 1, los endpoints de lectura usan un engine async (asyncpg / aiosqlite) en vez del threadpool.
+# DATABASE_URL_ASYNC permite indicar la URL; si no, se deriva de DATABASE_URL
+DB_ASYNC = os.getenv("DB_ASYNC", "0") == "1"
+DATABASE_URL_ASYNC = os.getenv("DATABASE_URL_ASYNC")
+
+# Drivers async por dialecto
+DRIVERS_ASYNC = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+# Funciones que reciben (segundos esperados, "sync" | "async") en cada checkout del pool
+_al_esperar_conexion = []
+
+def registrar_al_esperar_conexion(funcion):
+    _al_esperar_conexion.append(funcion)
+
+class _EsperaMedida:
+    """Mide cuánto espera cada checkout por una conexión libre del pool (incluye abrir una nueva)"""
+
+    tipo = "sync"
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            espera = time.perf_counter() - inicio
+            for funcion in _al_esperar_conexion:
+                funcion(espera, self.tipo)
+
+class PoolMedido(_EsperaMedida, QueuePool):
+    pass
+
+class PoolAsyncMedido(_EsperaMedida, AsyncAdaptedQueuePool):
+    tipo = "async"
+
+def opciones_pool(url, clase=PoolMedido):
+    """Argumentos de create_engine para el pool; SQLite en memoria conserva su pool por defecto"""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": clase,
+        "pool_size": DB_POOL_TAMANO,
+        "max_overflow": DB_POOL_EXCESO,
+        "pool_timeout": DB_POOL_ESPERA,
+        "pool_recycle": DB_POOL_RECICLAR,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+def url_async(url):
+    """DATABASE_URL con el driver async del dialecto (postgresql+psycopg2 -> postgresql+asyncpg)"""
+    url = make_url(url)
+    return url.set(drivername=f"{url.get_backend_name()}+{DRIVERS_ASYNC[url.get_backend_name()]}")
+
+def crear_engine_async(url=None):
+    """Engine async con el mismo pool; requiere el driver del dialecto (asyncpg o aiosqlite)"""
+    url = url or DATABASE_URL_ASYNC or url_async(DATABASE_URL)
+    return create_async_engine(url, **opciones_pool(url, PoolAsyncMedido))
+
 # Crear engine y session local
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **opciones_pool(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine y sesiones async de los endpoints de lectura (None si DB_ASYNC=0)
+engine_async = crear_engine_async() if DB_ASYNC else None
+AsyncSessionLocal = async_sessionmaker(engine_async, expire_on_commit=False) if engine_async is not None else None
+
 # Base para declarar modelos
 #from sqlalchemy.ext.declarative import declarative_base
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
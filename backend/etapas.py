@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Con 1, cada procesamiento activa tracemalloc para medir los bytes asignados por etapa.
+# Cuesta ~3x en tiempo, por eso viene apagado; si tracemalloc ya está activo se mide igual.
+MINERIA_TRAZAR_MEMORIA = os.getenv("MINERIA_TRAZAR_MEMORIA", "0") == "1"
+
+# Mediciones de memoria abiertas en el proceso: [memoria al entrar, pico visto].
+# El pico de tracemalloc es global, así que antes de reiniciarlo se reparte a
+# todas las abiertas (también las de otros hilos); eso permite anidarlas.
+_abiertas = []
+_lock = threading.Lock()
+
+def _repartir_pico():
+    pico = tracemalloc.get_traced_memory()[1]
+    for abierta in _abiertas:
+        abierta[1] = max(abierta[1], pico)
+
+class Etapas:
+    """
+    Registra un span por cada etapa del pipeline: tiempo de reloj, tiempo
+    de CPU del hilo, filas de entrada y salida y, si tracemalloc está
+    activo, el pico de bytes asignados sobre la memoria al entrar.
+
+    Los spans son dicts simples para poder devolverlos desde el pool de
+    procesos y unirlos con extender().
+    """
+
+    def __init__(self):
+        self.spans = []
+
+    @contextmanager
+    def medir(self, etapa, filas_entrada=None):
+        """Mide el bloque `with`; el llamador completa span["filas_salida"]"""
+        span = {"etapa": etapa, "filas_entrada": filas_entrada, "filas_salida": filas_entrada}
+        trazando = tracemalloc.is_tracing()
+        if trazando:
+            with _lock:
+                _repartir_pico()
+                actual = tracemalloc.get_traced_memory()[0]
+                abierta = [actual, actual]
+                _abiertas.append(abierta)
+                tracemalloc.reset_peak()
+        inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield span
+        finally:
+            span["segundos"] = time.perf_counter() - inicio
+            span["cpu_segundos"] = time.thread_time() - inicio_cpu
+            span["bytes_asignados"] = None
+            if trazando:
+                with _lock:
+                    if tracemalloc.is_tracing():
+                        _repartir_pico()
+                        tracemalloc.reset_peak()
+                        span["bytes_asignados"] = abierta[1] - abierta[0]
+                    # Por identidad: dos mediciones pueden tener los mismos valores
+                    _abiertas[:] = [otra for otra in _abiertas if otra is not abierta]
+            self.spans.append(span)
+
+    def extender(self, spans):
+        self.spans.extend(spans)
+
+    def resumen(self):
+        """
+        Un registro por etapa, en el orden en que aparecieron: tiempos y
+        filas sumados entre bloques (o fragmentos) y el mayor pico de bytes.
+        """
+        etapas = {}
+        for span in self.spans:
+            total = etapas.setdefault(span["etapa"], {
+                "etapa": span["etapa"], "llamadas": 0, "segundos": 0.0, "cpu_segundos": 0.0,
+                "filas_entrada": None, "filas_salida": None, "bytes_asignados": None
+            })
+            total["llamadas"] += 1
+            total["segundos"] += span["segundos"]
+            total["cpu_segundos"] += span["cpu_segundos"]
+            for campo in ("filas_entrada", "filas_salida"):
+                if span[campo] is not None:
+                    total[campo] = (total[campo] or 0) + int(span[campo])
+            if span["bytes_asignados"] is not None:
+                total["bytes_asignados"] = max(total["bytes_asignados"] or 0, span["bytes_asignados"])
+        for total in etapas.values():
+            total["segundos"] = round(total["segundos"], 6)
+            total["cpu_segundos"] = round(total["cpu_segundos"], 6)
+        return list(etapas.values())
+
+@contextmanager
+def trazar_memoria(activar=None):
+    """Activa tracemalloc durante el bloque si MINERIA_TRAZAR_MEMORIA (o `activar`) lo pide y no estaba activo"""
+    activar = MINERIA_TRAZAR_MEMORIA if activar is None else activar
+    iniciar = activar and not tracemalloc.is_tracing()
+    if iniciar:
+        tracemalloc.start()
+    try:
+        yield
+    finally:
+        if iniciar:
+            tracemalloc.stop()
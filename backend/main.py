@@ -1,20 +1,39 @@
-from fastapi import FastAPI, Depends, Query, UploadFile, File
+from fastapi import FastAPI, Depends, Query, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from database import SessionLocal,Base,engine
+from database import SessionLocal,Base,engine, AsyncSessionLocal, engine_async, registrar_al_esperar_conexion
 from models.habilidad import Habilidad
+from models.resumen_carrera import ResumenCarrera
 from fastapi.middleware.cors import CORSMiddleware
-from mineria import procesar_datos_computrabajo
+from fastapi.responses import PlainTextResponse
+from mineria import procesar_datos_computrabajo, procesar_datos_computrabajo_por_bloques, obtener_pool, TAMANO_BLOQUE_DEFECTO, MINERIA_TRABAJADORES
 from models.tiempo import TiempoCarga
 from datetime import datetime, timezone, timedelta
+import numpy as np
 import pandas as pd
 from pydantic import BaseModel
 import shutil
 import json
 import os
+import uuid
 from monitor_recursos import MonitorRecursos
-from calcular_energia import calcular_energia_por_consulta
+from etapas import Etapas
+from registro_metricas import RegistroMetricas
+from carga_datos import CargadorHabilidades, CargadorIncremental, reemplazar_habilidades, asegurar_esquema, registrar_al_publicar
+from cache import CacheEstadisticas, crear_backend
+from trabajos import GestorTrabajos, Trabajo
+from columnar import EscritorColumnar, MotorColumnar, COLUMNAR_DIR, descartar_instantanea
+from vistas_previas import VistasPrevias, leer_pagina, CONJUNTOS as CONJUNTOS_VISTAS_PREVIAS
+from consultas import (
+    frecuencias_desde_resumen, frecuencias_sql, condicion_carrera, carreras_canonicas, clave_carrera,
+    salarios_por_puesto, existe_carrera, contar_con_todas_sql, filas_habilidades_sql, matriz_desde_filas
+)
+from coocurrencia import matriz_coocurrencia, matriz_lift, pares_principales
+import bits_habilidades
+from metricas_prometheus import RegistroPrometheus, MetricasHttp, MiddlewareMetricas, instrumentar_engine, CUBETAS_CONSULTA_BD
 
 Base.metadata.create_all(bind=engine)
+asegurar_esquema(engine)
 
 app = FastAPI(title="API Habilidades Laborales")
 
@@ -29,6 +48,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Métricas en formato Prometheus (GET /metrics): por ruta, caché, filas ingeridas y tiempo de consultas a la BD
+registro_prometheus = RegistroPrometheus()
+app.add_middleware(MiddlewareMetricas, metricas=MetricasHttp(registro_prometheus))
+filas_leidas = registro_prometheus.contador(
+    "habilis_filas_leidas_total", "Ofertas leídas de los CSV procesados", ("modo",))
+filas_ingeridas = registro_prometheus.contador(
+    "habilis_filas_ingeridas_total", "Ofertas cargadas en la BD", ("modo",))
+consultas_bd = registro_prometheus.histograma(
+    "habilis_bd_consulta_segundos", "Tiempo de cada sentencia SQL", cubetas=CUBETAS_CONSULTA_BD)
+instrumentar_engine(engine, consultas_bd)
+if engine_async is not None:
+    instrumentar_engine(engine_async.sync_engine, consultas_bd)
+# Espera por una conexión libre del pool: si crece, subir DB_POOL_TAMANO / DB_POOL_EXCESO
+espera_conexion = registro_prometheus.histograma(
+    "habilis_bd_espera_conexion_segundos", "Espera por una conexión del pool", ("engine",), cubetas=CUBETAS_CONSULTA_BD)
+registrar_al_esperar_conexion(lambda segundos, tipo: espera_conexion.observar(segundos, tipo))
+
+def _estado_pools():
+    metricas = []
+    for prefijo, motor in (("habilis_bd", engine), ("habilis_bd_async", engine_async)):
+        pool = motor.pool if motor is not None else None
+        if hasattr(pool, "checkedout"):  # SQLite en memoria no usa QueuePool
+            metricas += [
+                (f"{prefijo}_conexiones_en_uso", "gauge", "Conexiones del pool entregadas", pool.checkedout()),
+                (f"{prefijo}_conexiones_libres", "gauge", "Conexiones abiertas esperando en el pool", pool.checkedin()),
+                (f"{prefijo}_conexiones_exceso", "gauge", "Conexiones abiertas por encima de pool_size", max(pool.overflow(), 0)),
+            ]
+    return metricas
+registro_prometheus.registrar_recolector(_estado_pools)
+
+# Filas por bloque del modo streaming de /proceso-csv (0 = cargar el archivo completo)
+CSV_TAMANO_BLOQUE = int(os.getenv("CSV_TAMANO_BLOQUE", "0"))
+# Motor de /estadisticas/*: bd (SQL) o columnar (instantánea en disco escrita en cada carga, sin ir a la BD)
+ESTADISTICAS_MOTOR = os.getenv("ESTADISTICAS_MOTOR", "bd")
+motor_columnar = MotorColumnar(COLUMNAR_DIR) if ESTADISTICAS_MOTOR == "columnar" else None
+if motor_columnar is None:
+    # Con el motor bd las cargas no actualizan la instantánea: se descarta para no servirla desactualizada
+    registrar_al_publicar(lambda: descartar_instantanea(COLUMNAR_DIR))
+
+def _escritor_columnar():
+    """EscritorColumnar de una carga, solo si el motor columnar usa la instantánea"""
+    return EscritorColumnar(COLUMNAR_DIR) if motor_columnar is not None else None
+
+# Carpeta con las vistas previas completas del último CSV procesado
+DIRECTORIO_VISTAS_PREVIAS = os.getenv("VISTAS_PREVIAS_DIR", "data/vistas_previas")
+
 # crear una sesión por cada solicitud
 def get_db():
     db = SessionLocal()
@@ -37,6 +102,23 @@ def get_db():
     finally:
         db.close()
 
+async def _en_sesion(consultar):
+    """
+    Ejecuta consultar(db) con una sesión para los endpoints de lectura async:
+    con DB_ASYNC=1 en el engine async (run_sync, sin ocupar un hilo); si no,
+    en el threadpool con una sesión síncrona, como get_db. Con run_sync la
+    función corre en el event loop: solo debe leer de la BD, el cálculo
+    posterior va en run_in_threadpool.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as sesion:
+            return await sesion.run_sync(consultar)
+
+    def en_hilo():
+        with SessionLocal() as db:
+            return consultar(db)
+    return await run_in_threadpool(en_hilo)
+
 @app.get("/")
 def read_root():
     return {"message": "Backend is ready"}
@@ -44,99 +126,206 @@ def read_root():
 # Endpoint para filtrar por carrera
 @app.get("/habilidades/")
 def obtener_habilidades(carrera: str = Query(..., description="Nombre de la carrera"), db: Session = Depends(get_db)):
-    resultados = db.query(Habilidad).filter(Habilidad.career.ilike(f"%{carrera.strip()}%")).all()
+    resultados = db.query(Habilidad).filter(condicion_carrera(db, carrera.strip())).all()
     return resultados
 
+# Carreras canónicas, para que el frontend envíe claves exactas
+@app.get("/carreras")
+async def listar_carreras():
+    return {"carreras": await _en_sesion(carreras_canonicas)}
+
 # Función para limpiar nombre de habilidad
 def formatear_nombre(nombre: str) -> str:
     partes = nombre.split('_')[1:]  # elimina el prefijo 'hard_' o 'soft_'
     return ' '.join(partes).capitalize()  # puedes usar .title() si quieres Todo En Mayúscula Inicial
 
 CACHE_DURACION = timedelta(minutes=5)
-cache_estadisticas: dict[str, tuple[dict, datetime]] = {}
-
-def _cache_get(key: str):
-    item = cache_estadisticas.get(key)
-    if not item:
-        return None
-    data, ts = item
-    if datetime.now() - ts > CACHE_DURACION:
-        del cache_estadisticas[key]
-        return None
-    return data
-
-def _cache_set(key: str, data: dict):
-    cache_estadisticas[key] = (data, datetime.now())
-    _limpiar_cache_viejo()
-
-def _limpiar_cache_viejo():
-    now = datetime.now()
-    expirados = [k for k, (_, ts) in cache_estadisticas.items() if now - ts > CACHE_DURACION]
-    for k in expirados:
-        del cache_estadisticas[k]
+# CACHE_BACKEND=memoria (por worker) o sqlite (un archivo compartido por todos los workers del host)
+cache_estadisticas = CacheEstadisticas(backend=crear_backend(
+    os.getenv("CACHE_BACKEND", "memoria"),
+    max_entradas=int(os.getenv("CACHE_MAX_ENTRADAS", "256")),
+    ttl_segundos=CACHE_DURACION.total_seconds(),
+    ruta_sqlite=os.getenv("CACHE_SQLITE_RUTA", "data/cache_estadisticas.sqlite3")
+))
+# Un dataset nuevo deja obsoletas todas las estadísticas
+registrar_al_publicar(cache_estadisticas.invalidar)
+# La caché ya cuenta aciertos y fallos; /metrics solo los lee
+registro_prometheus.registrar_recolector(lambda: [
+    ("habilis_cache_aciertos_total", "counter", "Consultas de estadísticas respondidas desde la caché", cache_estadisticas.aciertos),
+    ("habilis_cache_fallos_total", "counter", "Consultas de estadísticas que se calcularon", cache_estadisticas.fallos),
+    ("habilis_cache_compartidos_total", "counter", "Consultas que esperaron el cálculo de otra igual", cache_estadisticas.compartidos),
+])
+
+def _desde_cache(resultado: dict, carrera: str):
+    """
+    Respuesta servida desde la caché: la clave usa la carrera canónica, así que
+    se responde con la carrera de esta solicitud y no con la de quien la calculó
+    """
+    respuesta = {**resultado, "cache": True}
+    if "carrera" in respuesta:
+        respuesta["carrera"] = carrera.strip()
+    return respuesta
+
+async def _cache_obtener_o_calcular(key: str, calcular):
+    """
+    Devuelve (resultado, desde_cache) con la corrutina calcular(); las solicitudes
+    simultáneas de la misma clave calculan una sola vez
+    """
+    return await cache_estadisticas.obtener_o_calcular_async(key, calcular)
 # ===============================================
 
+# Métricas por consulta: escritura por lotes, rotación y agregados (ver registro_metricas.py)
+registro_metricas = RegistroMetricas("data/metricas_recursos.json")
+
 @app.get("/estadisticas/habilidades")
-def estadisticas_habilidades(carrera: str = Query(..., description="Nombre de la carrera"), db: Session = Depends(get_db)):
+async def estadisticas_habilidades(carrera: str = Query(..., description="Nombre de la carrera")):
+    cache_key = f"habilidades:{clave_carrera(carrera)}"
+    resultado, en_cache = await _cache_obtener_o_calcular(
+        cache_key, lambda: _calcular_estadisticas_habilidades(carrera.strip()))
+
+    if resultado is None:
+        return {"message": "No se encontraron resultados para esa carrera."}
     # HIT de caché
-    cache_key = f"habilidades:{carrera.strip().lower()}"
-    cached = _cache_get(cache_key)
-    if cached:
-        return {**cached, "cache": True}
+    if en_cache:
+        return _desde_cache(resultado, carrera)
+    return resultado
+
+def _frecuencias_bd(db: Session, carrera: str):
+    # Resumen por carrera calculado en la carga o, si no existe, agregación en SQL
+    frecuencias = frecuencias_desde_resumen(db, carrera)
+    return frecuencias if frecuencias is not None else frecuencias_sql(db, carrera)
 
+async def _calcular_estadisticas_habilidades(carrera: str):
     monitor = MonitorRecursos()
-    monitor.iniciar_monitoreo()
-    
-    carrera = carrera.strip()
-    registros = db.query(Habilidad).filter(Habilidad.career.ilike(f"%{carrera}%")).all() #consultar
-    monitor.capturar_metrica()  # Captura después de la consulta DB
+    await run_in_threadpool(monitor.iniciar_monitoreo)
 
-    if not registros:
-        return {"message": "No se encontraron resultados para esa carrera."}
+    # Instantánea columnar si está configurada (sin abrir sesión); si no, la BD
+    frecuencias = await run_in_threadpool(motor_columnar.frecuencias, carrera) if motor_columnar is not None else None
+    if frecuencias is None:
+        frecuencias = await _en_sesion(lambda db: _frecuencias_bd(db, carrera))
+    return await run_in_threadpool(_armar_estadisticas_habilidades, monitor, carrera, frecuencias)
 
-    df = pd.DataFrame([r.__dict__ for r in registros])
-    df.drop(columns=["_sa_instance_state", "id"], inplace=True)
-    monitor.capturar_metrica()  # Captura después de procesar DataFrame
+def _armar_estadisticas_habilidades(monitor: MonitorRecursos, carrera: str, frecuencias):
+    total_ofertas, conteos = frecuencias
+    monitor.capturar_metrica()  # Captura después de la consulta DB
 
-    columnas_tecnicas = [col for col in df.columns if col.startswith("hard_")]
-    columnas_blandas = [col for col in df.columns if col.startswith("soft_")]
+    if not total_ofertas:
+        return None
 
-    tecnicas_sumadas = df[columnas_tecnicas].sum().sort_values(ascending=False)
-    blandas_sumadas = df[columnas_blandas].sum().sort_values(ascending=False)
+    tecnicas_sumadas = sorted(((col, n) for col, n in conteos.items() if col.startswith("hard_")), key=lambda x: x[1], reverse=True)
+    blandas_sumadas = sorted(((col, n) for col, n in conteos.items() if col.startswith("soft_")), key=lambda x: x[1], reverse=True)
     monitor.capturar_metrica()  # Captura después de calcular habilidades
 
     habilidades_tecnicas = [
-        {"nombre": formatear_nombre(col), "frecuencia": int(tecnicas_sumadas[col])}
-        for col in tecnicas_sumadas.index
+        {"nombre": formatear_nombre(col), "frecuencia": int(n)}
+        for col, n in tecnicas_sumadas
     ]
 
     habilidades_blandas = [
-        {"nombre": formatear_nombre(col), "frecuencia": int(blandas_sumadas[col])}
-        for col in blandas_sumadas.index
+        {"nombre": formatear_nombre(col), "frecuencia": int(n)}
+        for col, n in blandas_sumadas
     ]
 
     # Finalizar monitoreo
     metricas = monitor.finalizar_monitoreo()
     
-    # Guardar métricas en archivo para análisis
-    with open("data/metricas_recursos.json", "a") as f:
-        json.dump({
-            "endpoint": "/estadisticas/habilidades",
-            "carrera": carrera,
-            "timestamp": datetime.now().isoformat(),
-            **metricas
-        }, f)
-        f.write("\n")
-
-    resultado = {
+    # Guardar métricas para análisis (se escriben por lotes fuera de la solicitud, sin el detalle por captura)
+    registro_metricas.registrar({
+        "endpoint": "/estadisticas/habilidades",
+        "carrera": carrera,
+        "timestamp": datetime.now().isoformat(),
+        **{k: v for k, v in metricas.items() if k != "metricas_detalladas"}
+    })
+
+    return {
         "carrera": carrera,
-        "total_ofertas": len(df),
+        "total_ofertas": int(total_ofertas),
         "habilidades_tecnicas": habilidades_tecnicas,
         "habilidades_blandas": habilidades_blandas,
         "metricas_recursos": metricas  # Incluir en respuesta
     }
-    # Guardar en caché
-    _cache_set(cache_key, resultado)
+
+@app.get("/estadisticas/habilidades/combinadas")
+async def estadisticas_habilidades_combinadas(
+    carrera: str = Query(..., description="Nombre de la carrera"),
+    habilidades: list[str] = Query(..., description="Columnas hard_*/soft_* que la oferta debe pedir a la vez")
+):
+    """Cuántas ofertas de la carrera piden todas las habilidades indicadas (p. ej. hard_python y hard_sql)"""
+    habilidades = sorted(set(habilidades))
+    try:
+        valor_mascara = bits_habilidades.mascara(habilidades)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cache_key = f"combinadas:{clave_carrera(carrera)}:{','.join(habilidades)}"
+    resultado, en_cache = await _cache_obtener_o_calcular(
+        cache_key, lambda: _calcular_habilidades_combinadas(carrera.strip(), habilidades, valor_mascara)
+    )
+    if resultado is None:
+        return {"message": "No se encontraron resultados para esa carrera."}
+    if en_cache:
+        return _desde_cache(resultado, carrera)
+    return resultado
+
+async def _calcular_habilidades_combinadas(carrera: str, habilidades: list[str], valor_mascara: int):
+    # Un AND de bits por oferta: sobre la instantánea columnar si está configurada, si no en SQL
+    conteo = await run_in_threadpool(motor_columnar.contar_con_todas, carrera, valor_mascara) if motor_columnar is not None else None
+    if conteo is None:
+        conteo = await _en_sesion(lambda db: contar_con_todas_sql(db, carrera, valor_mascara))
+    total_ofertas, con_todas = conteo
+    if not total_ofertas:
+        return None
+    return {
+        "carrera": carrera,
+        "habilidades": [formatear_nombre(col) for col in habilidades],
+        "total_ofertas": total_ofertas,
+        "ofertas_con_todas": con_todas,
+        "porcentaje": round(100 * con_todas / total_ofertas, 2)
+    }
+
+@app.get("/estadisticas/coocurrencia")
+async def estadisticas_coocurrencia(
+    carrera: str = Query(..., description="Nombre de la carrera"),
+    top: int | None = Query(None, ge=1, le=1000, description="Devolver solo los N pares que más aparecen juntos")
+):
+    """Qué habilidades se piden juntas en la carrera: matrices de coocurrencia y lift, o solo los pares principales"""
+    cache_key = f"coocurrencia:{clave_carrera(carrera)}:{top or ''}"
+    resultado, en_cache = await _cache_obtener_o_calcular(cache_key, lambda: _calcular_coocurrencia(carrera.strip(), top))
+    if resultado is None:
+        return {"message": "No se encontraron resultados para esa carrera."}
+    if en_cache:
+        return _desde_cache(resultado, carrera)
+    return resultado
+
+async def _calcular_coocurrencia(carrera: str, top: int | None):
+    datos = await run_in_threadpool(motor_columnar.matriz_carrera, carrera) if motor_columnar is not None else None
+    if datos is not None:
+        return await run_in_threadpool(_armar_coocurrencia, carrera, top, datos)
+    # En la sesión solo se traen las filas; la matriz y XᵀX se calculan en el threadpool
+    filas = await _en_sesion(lambda db: filas_habilidades_sql(db, carrera))
+    return await run_in_threadpool(lambda: _armar_coocurrencia(carrera, top, matriz_desde_filas(filas)))
+
+def _armar_coocurrencia(carrera: str, top: int | None, datos):
+    columnas, matriz = datos
+    if not len(matriz):
+        return None
+
+    coocurrencias = matriz_coocurrencia(matriz)
+    lift = matriz_lift(coocurrencias, len(matriz))
+    nombres = [formatear_nombre(col) for col in columnas]
+    resultado = {"carrera": carrera, "total_ofertas": int(len(matriz))}
+    if top is not None:
+        resultado["pares"] = [
+            {"habilidad_a": formatear_nombre(a), "habilidad_b": formatear_nombre(b), "ofertas": n,
+             "soporte": round(n / len(matriz), 4), "lift": round(valor, 4)}
+            for a, b, n, valor in pares_principales(coocurrencias, lift, columnas, top)
+        ]
+        return resultado
+    resultado.update({
+        "habilidades": nombres,
+        "coocurrencia": coocurrencias.tolist(),
+        "lift": [[None if np.isnan(v) else round(float(v), 4) for v in fila] for fila in lift]
+    })
     return resultado
 
 @app.get("/estado-csv-procesado")
@@ -161,107 +350,221 @@ async def subir_csv_crudo(file: UploadFile = File(...)):
         f.write(contents)
 
     # Procesar el archivo con la función del módulo mineria.py
-    df = procesar_datos_computrabajo(temp_path)
+    df = procesar_datos_computrabajo(temp_path)[0]
     # GUARDAR EL CSV PROCESADO
     df.to_csv("data/datos_procesados.csv", index=False)
 
-    # Insertar los datos en la base de datos
-    db = SessionLocal()
-    db.query(Habilidad).delete()
-    db.commit()
-    for _, row in df.iterrows():
-        habilidad = Habilidad(
-            career=row.get("career"),
-            title=row.get("title"),
-            company=row.get("company"),
-            workday=row.get("workday"),
-            modality=row.get("modality"),
-            salary=row.get("salary"),
-            **{col: int(row[col]) for col in df.columns if col.startswith("hard_") or col.startswith("soft_")}
-        )
-        db.add(habilidad)
-
-    db.commit()
-    db.close()
+    # Insertar los datos en la base de datos (carga masiva con intercambio atómico)
+    reemplazar_habilidades(df, instantanea=_escritor_columnar())
 
     return {"message": f"{len(df)} registros procesados y guardados exitosamente."}
 
 # Filtramos por carrera en la consulta y directamente en la base de datos
 @app.get("/estadisticas/salarios")
-def estadisticas_salarios(carrera: str = Query(..., description="Nombre de la carrera"), db: Session = Depends(get_db)):
+async def estadisticas_salarios(carrera: str = Query(..., description="Nombre de la carrera")):
+    cache_key = f"salarios:{clave_carrera(carrera)}"
+    resultado, en_cache = await _cache_obtener_o_calcular(
+        cache_key, lambda: _calcular_estadisticas_salarios(carrera.strip()))
+
+    if resultado is None:
+        return {"message": "No se encontraron resultados para esa carrera."}
     # HIT de caché
-    cache_key = f"salarios:{carrera.strip().lower()}"
-    cached = _cache_get(cache_key)
-    if cached:
-        return {**cached, "cache": True}
+    if en_cache:
+        return _desde_cache(resultado, carrera)
+    return resultado
 
-    registros = db.query(Habilidad).filter(Habilidad.career.ilike(f"%{carrera.strip()}%")).all()
+def _salarios_columnar(instantanea, carrera: str):
+    salarios = instantanea.salarios_por_puesto(carrera, minimo=1500)
+    if not salarios and not instantanea.existe_carrera(carrera):
+        return None
+    return {"salarios": salarios}
 
-    if not registros:
-        return {"message": "No se encontraron resultados para esa carrera."}
+def _salarios_bd(db: Session, carrera: str):
+    # Filtro > 1500, un registro por título (el mayor salario) y orden ascendente, todo en SQL
+    salarios = salarios_por_puesto(db, carrera, minimo=1500)
 
-    df = pd.DataFrame([r.__dict__ for r in registros])
-    df.drop(columns=["_sa_instance_state", "id"], inplace=True)
+    if not salarios and not existe_carrera(db, carrera):
+        return None
+    return {"salarios": salarios}
 
-    # Filtrar salarios válidos
-    df = df[df["salary"].notnull() & (df["salary"] != "No especificado")].copy()
+async def _calcular_estadisticas_salarios(carrera: str):
+    instantanea = await run_in_threadpool(motor_columnar.instantanea) if motor_columnar is not None else None
+    if instantanea is not None:
+        return await run_in_threadpool(_salarios_columnar, instantanea, carrera)
+    return await _en_sesion(lambda db: _salarios_bd(db, carrera))
 
-    def limpiar_salario(s):
-        try:
-            s = str(s).strip().lower()
-            s = s.replace("s/", "").replace(".", "").replace(",", ".")
-            return float(s)
-        except:
-            return None
+def _guardar_upload(file: UploadFile, path_csv: str):
+    os.makedirs("data", exist_ok=True)
+    with open(path_csv, "wb") as f:
+        shutil.copyfileobj(file.file, f)
+
+def _procesar_csv(path_csv: str, file_name: str, tamano_bloque: int, monitor: MonitorRecursos, trabajo: Trabajo = None, ejecutor=None,
+                  incremental: bool = False, retirar: bool = False):
+    """
+    Minería, carga en BD y métricas de un CSV ya guardado en disco; devuelve
+    la respuesta de /proceso-csv. Es síncrona: se ejecuta en el threadpool o
+    en el gestor de trabajos, nunca en el event loop. Si recibe un trabajo,
+    informa en él la etapa y las filas procesadas.
+
+    Con `incremental` solo se minan y agregan las ofertas nuevas (por hash de
+    contenido) y, con `retirar`, se eliminan las que ya no vienen en el
+    archivo; siempre usa el modo streaming.
+    """
+    def avanzar(etapa, filas=None):
+        if trabajo is not None:
+            trabajo.avanzar(etapa, filas)
+
+    # Obtener información del archivo
+    file_size_bytes = os.path.getsize(path_csv)
+    file_size_mb = file_size_bytes / (1024 * 1024)
+
+    print(f"📁 Archivo recibido: {file_name} ({file_size_mb:.2f} MB)")
+
+    monitor.capturar_metrica()  # Después de guardar archivo
+    # Spans de las etapas que corren aquí (carga en BD); se agregan a los de la minería
+    etapas = Etapas()
+
+    # Procesar archivo CSV, reutilizamos la misma función de minería.
+    # Los cuatro conjuntos completos quedan en disco (ver /vistas-previas/); la respuesta solo lleva muestras
+    with VistasPrevias(DIRECTORIO_VISTAS_PREVIAS) as vistas_previas:
+        if tamano_bloque or incremental:
+            # Modo streaming: cada bloque se carga en staging apenas termina
+            avanzar("procesando_bloques", 0)
+            if incremental:
+                cargador = CargadorIncremental(instantanea=_escritor_columnar(), retirar=retirar)
+            else:
+                cargador = CargadorHabilidades(instantanea=_escritor_columnar())
+            with cargador:
+                resumen, columnas_detectadas, preview_antes, preview_despues, preview_no_ingenieria, preview_no_clasificados = \
+                    procesar_datos_computrabajo_por_bloques(
+                        path_csv, tamano_bloque or TAMANO_BLOQUE_DEFECTO, al_procesar_bloque=cargador.agregar, ejecutor=ejecutor,
+                        al_avanzar=lambda parcial: avanzar("procesando_bloques", parcial["originales"]),
+                        vistas_previas=vistas_previas, seguimiento=cargador
+                    )
+                if incremental or int(resumen["finales"]) > 0:
+                    avanzar("publicando")
+                    with etapas.medir("publicar", int(resumen["finales"])):
+                        cargador.publicar()
+            df_final = None
+        else:
+            avanzar("procesando")
+            df_final, resumen, columnas_detectadas, preview_antes, preview_despues, preview_no_ingenieria, preview_no_clasificados = \
+                procesar_datos_computrabajo(path_csv, vistas_previas=vistas_previas)
+            avanzar("procesando", resumen["originales"])
+
+    monitor.capturar_metrica()  # Después de procesar
+
+   # Asegurar que ambos previews sean listas válidas (ya vienen como dicts)
+    if not isinstance(preview_antes, list):
+        preview_antes = []
+    else:
+        preview_antes = preview_antes
+
+    if not isinstance(preview_despues, list):
+        preview_despues = []
+    else:
+        preview_despues = preview_despues
+    # Verificar si no quedaron registros (importante validación); en una carga incremental puede no haber nuevas
+    if int(resumen["finales"]) == 0 and not incremental:
+        return {"message": "No se generaron registros válidos tras procesar el CSV.", "error": "DataFrame vacío."}
+
+    # Asegurar tipos correctos para el frontend
+    resumen = {
+        "originales": int(resumen["originales"]),
+        "eliminados": int(resumen["eliminados"]),
+        "finales": int(resumen["finales"]),
+        "transformaciones_salario": int(resumen["transformaciones_salario"]),
+        "rellenos": resumen["rellenos"],
+        "columnas_eliminadas": resumen["columnas_eliminadas"],
+        "caracteres_limpiados": resumen["caracteres_limpiados"],
+        "habilidades": resumen["habilidades"],
+        "carreras": resumen["carreras"],
+        "taxonomia": resumen["taxonomia"],  # versión de la taxonomía con la que se minó
+        "etapas": resumen["etapas"]
+    }
+    if incremental:
+        resumen.update({
+            "insertados": cargador.filas,
+            "sin_cambios": cargador.sin_cambios,
+            "retirados": cargador.retirados
+        })
+
+    # Los registros eliminados ya los guardó la minería en data/registros_no_*.json;
+    # en modo streaming la BD también se escribió bloque a bloque
+    if df_final is not None:
+        # Insertar datos procesados en BD (carga masiva con intercambio atómico)
+        avanzar("cargando_bd")
+        with etapas.medir("carga_bd", len(df_final)):
+            reemplazar_habilidades(df_final, instantanea=_escritor_columnar())
+    resumen["etapas"] = resumen["etapas"] + etapas.resumen()
+    modo = "incremental" if incremental else "bloques" if tamano_bloque else "completo"
+    filas_leidas.inc(modo, cantidad=resumen["originales"])
+    filas_ingeridas.inc(modo, cantidad=resumen["insertados"] if incremental else resumen["finales"])
+
+    monitor.capturar_metrica()  # Después de insertar en BD
+
+    # Finalizar monitoreo
+    metricas = monitor.finalizar_monitoreo()
 
-    df["salario_numerico"] = df["salary"].apply(limpiar_salario)
-    df = df.dropna(subset=["salario_numerico"])
+    print(f"📊 Métricas capturadas: {metricas}")
+
+    # Guardar métricas del procesamiento CSV
+    metricas_csv = {
+        "timestamp": datetime.now().isoformat(),
+        "nombre_archivo": file_name,
+        "peso_mb": round(file_size_mb, 2),
+        "registros_originales": resumen["originales"],
+        "registros_finales": resumen["finales"],
+        "registros_eliminados": resumen["eliminados"],
+        "taxonomia": resumen["taxonomia"],
+        "etapas": resumen["etapas"],  # Tiempo, CPU, filas y memoria de cada etapa del pipeline
+        **metricas
+    }
 
-    # Filtrar solo salarios > 1500
-    df = df[df["salario_numerico"] > 1500]
+    # Asegurar que la carpeta data existe
+    os.makedirs("data", exist_ok=True)
+    ruta_metricas = "data/metricas_csv_procesado.json"
 
-    # Eliminar títulos duplicados (quedarse con el mayor salario por título)
-    df = df.sort_values(by="salario_numerico", ascending=False).drop_duplicates(subset=["title"])
+    with open(ruta_metricas, "w", encoding="utf-8") as f:
+        json.dump(metricas_csv, f, ensure_ascii=False, indent=2)
 
-    # Ordenar de menor a mayor para la gráfica
-    df = df.sort_values(by="salario_numerico", ascending=True)
+    print(f"✅ Métricas guardadas en: {ruta_metricas}")
+    print(f"✅ Contenido guardado: {json.dumps(metricas_csv, indent=2, ensure_ascii=False)}")
 
-    resultado = {
-        "salarios": [
-            {"puesto": row["title"], "salario": row["salario_numerico"]}
-            for _, row in df.iterrows()
-        ]
+    avanzar("terminado")
+    return {
+        "message": f"{resumen['finales']} registros procesados y guardados exitosamente." if not incremental else
+                   f"Carga incremental: {resumen['insertados']} nuevos, {resumen['sin_cambios']} sin cambios, {resumen['retirados']} retirados.",
+        "resumen": resumen,
+        "preview_antes": preview_antes,
+        "preview_despues": preview_despues,
+        "no_ingenieria": preview_no_ingenieria,
+        "no_clasificados": preview_no_clasificados,
+        "vistas_previas": vistas_previas.totales,  # Filas de cada conjunto, paginables en /vistas-previas/
+        "metricas_procesamiento": metricas_csv  # Incluir métricas en respuesta
     }
-    # Guardar en caché
-    _cache_set(cache_key, resultado)
-    return resultado
 
 @app.post("/proceso-csv")
-async def proceso_csv_crudo(file: UploadFile = File(...)):
+async def proceso_csv_crudo(
+    file: UploadFile = File(...),
+    bloque: int | None = Query(None, ge=1, description="Filas por bloque para procesar en modo streaming"),
+    incremental: bool = Query(False, description="Agregar solo las ofertas nuevas en vez de reemplazar el dataset"),
+    retirar: bool = Query(False, description="En modo incremental, eliminar las ofertas que no vienen en el archivo")
+):
     try:
-        # Guardar el archivo temporalmente
-        os.makedirs("data", exist_ok=True)
-        path_csv = "data/upload.csv"
-        
         # Iniciar monitoreo ANTES de guardar
         monitor = MonitorRecursos()
         monitor.iniciar_monitoreo()
-        
-        with open(path_csv, "wb") as f:
-            shutil.copyfileobj(file.file, f)
-        
-        # Obtener información del archivo
-        file_size_bytes = os.path.getsize(path_csv)
-        file_size_mb = file_size_bytes / (1024 * 1024)
-        file_name = file.filename
-        
-        print(f"📁 Archivo recibido: {file_name} ({file_size_mb:.2f} MB)")
-        
-        monitor.capturar_metrica()  # Después de guardar archivo
 
-        # Procesar archivo CSV, reutilizamos la misma función de minería
+        # Guardar el archivo y procesarlo en el threadpool para no bloquear el event loop
+        path_csv = "data/upload.csv"
+        await run_in_threadpool(_guardar_upload, file, path_csv)
         try:
-            df_final, resumen, columnas_detectadas, preview_antes, preview_despues, preview_no_ingenieria, preview_no_clasificados = procesar_datos_computrabajo(path_csv)
+            # Con MINERIA_TRABAJADORES > 1 los bloques también se minan en el pool de procesos
+            ejecutor = obtener_pool() if MINERIA_TRABAJADORES > 1 else None
+            return await run_in_threadpool(
+                _procesar_csv, path_csv, file.filename, bloque or CSV_TAMANO_BLOQUE, monitor, None, ejecutor, incremental, retirar
+            )
         except ValueError as e:
             return {
                 "message": f"❌ Error en contenido del CSV: {str(e)}",
@@ -269,97 +572,6 @@ async def proceso_csv_crudo(file: UploadFile = File(...)):
                 "suggestion": "Verifique que el archivo contenga datos válidos en las columnas requeridas"
             }
 
-        monitor.capturar_metrica()  # Después de procesar
-
-       # Asegurar que ambos previews sean listas válidas (ya vienen como dicts)
-        if not isinstance(preview_antes, list):
-            preview_antes = []
-        else:
-            preview_antes = preview_antes
-
-        if not isinstance(preview_despues, list):
-            preview_despues = []
-        else:
-            preview_despues = preview_despues
-        # Verificar si df_final está vacío (importante validación)
-        if df_final.empty:
-            return {"message": "No se generaron registros válidos tras procesar el CSV.", "error": "DataFrame vacío."}
-
-        # Asegurar tipos correctos para el frontend
-        resumen = {
-            "originales": int(resumen["originales"]),
-            "eliminados": int(resumen["eliminados"]),
-            "finales": int(resumen["finales"]),
-            "transformaciones_salario": int(resumen["transformaciones_salario"]),
-            "rellenos": resumen["rellenos"],
-            "columnas_eliminadas": resumen["columnas_eliminadas"],
-            "caracteres_limpiados": resumen["caracteres_limpiados"],
-            "habilidades": resumen["habilidades"]
-        }
-        
-        # Guardar registros eliminados como archivos .json
-        with open("data/registros_no_ingenieria.json", "w", encoding="utf-8") as f1:
-            json.dump(preview_no_ingenieria, f1, ensure_ascii=False, indent=2)
-
-        with open("data/registros_no_clasificados.json", "w", encoding="utf-8") as f2:
-            json.dump(preview_no_clasificados, f2, ensure_ascii=False, indent=2)
-
-        # Insertar datos procesados en BD
-        db = SessionLocal()
-        db.query(Habilidad).delete()
-        db.commit()
-        for _, row in df_final.iterrows():
-            habilidad = Habilidad(
-                career=row.get("career"),
-                title=row.get("title"),
-                company=row.get("company"),
-                workday=row.get("workday"),
-                modality=row.get("modality"),
-                salary=row.get("salary"),
-                **{col: int(row[col]) for col in columnas_detectadas}
-            )
-            db.add(habilidad)
-        db.commit()
-        db.close()
-        
-        monitor.capturar_metrica()  # Después de insertar en BD
-        
-        # Finalizar monitoreo
-        metricas = monitor.finalizar_monitoreo()
-        
-        print(f"📊 Métricas capturadas: {metricas}")
-        
-        # Guardar métricas del procesamiento CSV
-        metricas_csv = {
-            "timestamp": datetime.now().isoformat(),
-            "nombre_archivo": file_name,
-            "peso_mb": round(file_size_mb, 2),
-            "registros_originales": resumen["originales"],
-            "registros_finales": resumen["finales"],
-            "registros_eliminados": resumen["eliminados"],
-            **metricas
-        }
-        
-        # Asegurar que la carpeta data existe
-        os.makedirs("data", exist_ok=True)
-        ruta_metricas = "data/metricas_csv_procesado.json"
-        
-        with open(ruta_metricas, "w", encoding="utf-8") as f:
-            json.dump(metricas_csv, f, ensure_ascii=False, indent=2)
-        
-        print(f"✅ Métricas guardadas en: {ruta_metricas}")
-        print(f"✅ Contenido guardado: {json.dumps(metricas_csv, indent=2, ensure_ascii=False)}")
-
-        return {
-            "message": f"{len(df_final)} registros procesados y guardados exitosamente.",
-            "resumen": resumen,
-            "preview_antes": preview_antes,
-            "preview_despues": preview_despues,
-            "no_ingenieria": preview_no_ingenieria,
-            "no_clasificados": preview_no_clasificados,
-            "metricas_procesamiento": metricas_csv  # Incluir métricas en respuesta
-        }
-
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
@@ -370,6 +582,57 @@ async def proceso_csv_crudo(file: UploadFile = File(...)):
             "detalle": error_trace 
         }
 
+# ================= TRABAJOS EN SEGUNDO PLANO =================
+gestor_trabajos = GestorTrabajos()
+
+def _trabajo_proceso_csv(trabajo: Trabajo, path_csv: str, file_name: str, tamano_bloque: int,
+                         incremental: bool = False, retirar: bool = False):
+    monitor = MonitorRecursos()
+    monitor.iniciar_monitoreo()
+    try:
+        # La minería de cada bloque corre en el pool de procesos; la carga en BD, en el hilo del gestor
+        return _procesar_csv(path_csv, file_name, tamano_bloque, monitor, trabajo=trabajo, ejecutor=obtener_pool(),
+                             incremental=incremental, retirar=retirar)
+    finally:
+        os.remove(path_csv)
+
+@app.post("/trabajos/proceso-csv", status_code=202)
+async def encolar_proceso_csv(
+    file: UploadFile = File(...),
+    bloque: int | None = Query(None, ge=1, description="Filas por bloque"),
+    incremental: bool = Query(False, description="Agregar solo las ofertas nuevas en vez de reemplazar el dataset"),
+    retirar: bool = Query(False, description="En modo incremental, eliminar las ofertas que no vienen en el archivo")
+):
+    """Guarda el CSV y encola su procesamiento; devuelve de inmediato el id del trabajo"""
+    path_csv = f"data/upload_{uuid.uuid4().hex}.csv"
+    await run_in_threadpool(_guardar_upload, file, path_csv)
+    tamano_bloque = bloque or CSV_TAMANO_BLOQUE or TAMANO_BLOQUE_DEFECTO
+    trabajo = gestor_trabajos.encolar("proceso-csv", _trabajo_proceso_csv, path_csv, file.filename, tamano_bloque,
+                                      incremental, retirar)
+    return {**trabajo.progreso(), "en_cola": gestor_trabajos.pendientes()}
+
+def _obtener_trabajo(trabajo_id: str) -> Trabajo:
+    trabajo = gestor_trabajos.obtener(trabajo_id)
+    if trabajo is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return trabajo
+
+@app.get("/trabajos/{trabajo_id}")
+def progreso_trabajo(trabajo_id: str):
+    """Estado, etapa, filas procesadas y tiempo transcurrido del trabajo"""
+    return _obtener_trabajo(trabajo_id).progreso()
+
+@app.get("/trabajos/{trabajo_id}/resultado")
+def resultado_trabajo(trabajo_id: str):
+    """Resumen y métricas del trabajo terminado (la misma respuesta que /proceso-csv)"""
+    trabajo = _obtener_trabajo(trabajo_id)
+    progreso = trabajo.progreso()
+    if progreso["estado"] == "error":
+        return {"message": "❌ Error al procesar el archivo. Formato Incorrecto o datos inválidos.", **progreso}
+    if progreso["estado"] != "completado":
+        return {"message": "El trabajo aún no termina.", **progreso}
+    return trabajo.resultado
+
 class TiempoCargaRequest(BaseModel):
     carrera: str
     inicio: float  
@@ -396,6 +659,20 @@ def registrar_tiempo_carga(req: TiempoCargaRequest, db: Session = Depends(get_db
         "fin": fin_dt.isoformat()
     }
 
+@app.get("/vistas-previas/{conjunto}")
+def obtener_vista_previa(
+    conjunto: str,
+    offset: int = Query(0, ge=0, description="Filas a saltar"),
+    limite: int = Query(50, ge=1, le=1000, description="Filas por página")
+):
+    """Página de un conjunto del último CSV procesado: antes, despues, no_ingenieria o no_clasificados"""
+    if conjunto not in CONJUNTOS_VISTAS_PREVIAS:
+        raise HTTPException(status_code=404, detail=f"Conjunto desconocido; use uno de {', '.join(CONJUNTOS_VISTAS_PREVIAS)}")
+    pagina = leer_pagina(conjunto, offset, limite, DIRECTORIO_VISTAS_PREVIAS)
+    if pagina is None:
+        raise HTTPException(status_code=404, detail="Aún no se ha procesado ningún CSV")
+    return pagina
+
 @app.get("/registros-eliminados")
 def obtener_registros_eliminados():
     try:
@@ -416,57 +693,43 @@ def obtener_registros_eliminados():
     }
 
 @app.get("/obtener-metricas/")
-def obtener_metricas():
-    try:
-        with open("data/metricas_recursos.json", "r") as f:
-            lineas = f.readlines()
-        
-        metricas = [json.loads(l) for l in lineas]
-        
-        # Calcular estadísticas de recursos
-        cpu_prom = sum(m['cpu_promedio_percent'] for m in metricas) / len(metricas)
-        ram_prom = sum(m['ram_promedio_mb'] for m in metricas) / len(metricas)
-        tiempo_prom = sum(m['tiempo_total_seg'] for m in metricas) / len(metricas)
-        
-        # Calcular energía para cada consulta
-        total_energia = 0
-        total_co2 = 0
-        for m in metricas:
-            calculo = calcular_energia_por_consulta(m)
-            m['energia_wh'] = calculo['energia_wh']
-            m['co2_gramos'] = calculo['co2_gramos']
-            total_energia += calculo['energia_wh']
-            total_co2 += calculo['co2_gramos']
-        
-        energia_promedio = total_energia / len(metricas) if len(metricas) > 0 else 0
-        
-        return {
-            "metricas": metricas,
-            "estadisticas": {
-                "total_consultas": len(metricas),
-                "cpu_promedio": round(cpu_prom, 2),
-                "ram_promedio": round(ram_prom, 2),
-                "tiempo_promedio": round(tiempo_prom, 4),
-                "energia_total_wh": round(total_energia, 4),
-                "co2_total_gramos": round(total_co2, 2),
-                "energia_promedio_wh": round(energia_promedio, 6)
-            }
-        }
-    except FileNotFoundError:
-        return {"metricas": [], "estadisticas": {}}
+def obtener_metricas(
+    desde: str | None = Query(None, description="Timestamp ISO mínimo"),
+    hasta: str | None = Query(None, description="Timestamp ISO máximo"),
+    limite: int = Query(500, ge=1, le=5000, description="Registros por página"),
+    offset: int = Query(0, ge=0, description="Registros a saltar, contando desde el más reciente")
+):
+    # Estadísticas globales desde los agregados; registros paginados del más reciente hacia atrás
+    registro_metricas.vaciar()
+    metricas, hay_mas = registro_metricas.leer(desde, hasta, limite, offset)
+    return {
+        "metricas": metricas,
+        "estadisticas": registro_metricas.estadisticas(),
+        "paginacion": {"limite": limite, "offset": offset, "hay_mas": hay_mas}
+    }
 
 @app.get("/cache/estado")
 def estado_cache():
-    _limpiar_cache_viejo()
+    # Las claves son "<endpoint>:<carrera>[:<parámetros>]" (habilidades, salarios, combinadas, coocurrencia)
+    por_endpoint = {}
+    for key in cache_estadisticas.claves():
+        endpoint, carrera = key.split(":")[:2]
+        por_endpoint.setdefault(endpoint, []).append(carrera)
     return {
-        "entradas_activas": len(cache_estadisticas),
-        "carreras_cacheadas": [key.replace("habilidades:", "").replace("salarios:", "") for key in cache_estadisticas.keys()],
+        **cache_estadisticas.estado(),
+        "carreras_cacheadas": list(dict.fromkeys(c for carreras in por_endpoint.values() for c in carreras)),
+        "carreras_por_endpoint": por_endpoint,
         "duracion_cache_minutos": CACHE_DURACION.total_seconds() / 60
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metricas_prometheus():
+    """Métricas del worker en formato de texto de Prometheus"""
+    return PlainTextResponse(registro_prometheus.exponer(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.delete("/cache/limpiar")
 def limpiar_cache():
-    cache_estadisticas.clear()
+    cache_estadisticas.invalidar()
     return {"message": "Caché limpiado exitosamente"}
 
 @app.get("/metricas-csv-procesado/")
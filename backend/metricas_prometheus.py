@@ -0,0 +1,216 @@
+import bisect
+import threading
+import time
+from sqlalchemy import event
+
+# Límites (segundos) de las cubetas de latencia; /proceso-csv puede tardar minutos
+CUBETAS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+CUBETAS_CONSULTA_BD = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Rutas distintas que se recuerdan en el mapa ruta -> plantilla (las de /trabajos/{id} no se repiten)
+MAX_RUTAS_RECORDADAS = 1024
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _etiquetas(nombres, valores, extra=""):
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+def _numero(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def _encabezado(self):
+        return [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+
+    def exponer(self):
+        with self._lock:
+            valores = list(self._valores.items())
+        return self._encabezado() + [
+            f"{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}" for clave, valor in valores
+        ]
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def inc(self, *valores, cantidad=1):
+        """Suma `cantidad` a la serie con los valores de etiqueta dados (en el orden de `etiquetas`)"""
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + cantidad
+
+class Medidor(_Metrica):
+    tipo = "gauge"
+
+    def inc(self, *valores, cantidad=1):
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + cantidad
+
+    def dec(self, *valores, cantidad=1):
+        self.inc(*valores, cantidad=-cantidad)
+
+class Histograma(_Metrica):
+    """Cubetas acumuladas al exponer; observar() solo suma en una cubeta (bisect)"""
+
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), cubetas=CUBETAS_LATENCIA):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.cubetas = tuple(sorted(cubetas))
+
+    def observar(self, valor, *valores):
+        indice = bisect.bisect_left(self.cubetas, valor)
+        with self._lock:
+            serie = self._valores.get(valores)
+            if serie is None:
+                # [conteo por cubeta (la última es +Inf), suma, total]
+                serie = self._valores[valores] = [[0] * (len(self.cubetas) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def exponer(self):
+        with self._lock:
+            series = [(clave, list(conteos), suma, total) for clave, (conteos, suma, total) in self._valores.items()]
+        lineas = self._encabezado()
+        for clave, conteos, suma, total in series:
+            acumulado = 0
+            for limite, conteo in zip(self.cubetas + (float("inf"),), conteos):
+                acumulado += conteo
+                etiquetas = _etiquetas(self.etiquetas, clave, f'le="{_numero(limite)}"')
+                lineas.append(f"{self.nombre}_bucket{etiquetas} {acumulado}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {_numero(suma)}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {total}")
+        return lineas
+
+class RegistroPrometheus:
+    """
+    Métricas del proceso en formato de texto de Prometheus (v0.0.4).
+
+    Los recolectores son funciones que se llaman solo al exponer y devuelven
+    [(nombre, tipo, ayuda, valor)]; sirven para contadores que ya se llevan
+    en otro lado (p. ej. aciertos de la caché) sin costo por solicitud.
+    Cada worker de uvicorn tiene su propio registro.
+    """
+
+    def __init__(self):
+        self.metricas = []
+        self.recolectores = []
+
+    def _agregar(self, metrica):
+        self.metricas.append(metrica)
+        return metrica
+
+    def contador(self, nombre, ayuda, etiquetas=()):
+        return self._agregar(Contador(nombre, ayuda, etiquetas))
+
+    def medidor(self, nombre, ayuda, etiquetas=()):
+        return self._agregar(Medidor(nombre, ayuda, etiquetas))
+
+    def histograma(self, nombre, ayuda, etiquetas=(), cubetas=CUBETAS_LATENCIA):
+        return self._agregar(Histograma(nombre, ayuda, etiquetas, cubetas))
+
+    def registrar_recolector(self, recolector):
+        self.recolectores.append(recolector)
+
+    def exponer(self):
+        lineas = []
+        for metrica in self.metricas:
+            lineas.extend(metrica.exponer())
+        for recolector in self.recolectores:
+            for nombre, tipo, ayuda, valor in recolector():
+                lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} {tipo}", f"{nombre} {_numero(valor)}"]
+        return "\n".join(lineas) + "\n"
+
+class MetricasHttp:
+    """Solicitudes, códigos de estado, latencia y solicitudes en curso por ruta"""
+
+    def __init__(self, registro):
+        self.solicitudes = registro.contador(
+            "habilis_http_solicitudes_total", "Solicitudes HTTP atendidas", ("ruta", "metodo", "estado"))
+        self.latencia = registro.histograma(
+            "habilis_http_latencia_segundos", "Latencia de las solicitudes HTTP", ("ruta", "metodo"))
+        self.en_curso = registro.medidor(
+            "habilis_http_en_curso", "Solicitudes HTTP en curso", ("ruta", "metodo"))
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI puro (sin BaseHTTPMiddleware, que agrega una tarea por
+    solicitud). La ruta se etiqueta con su plantilla (/trabajos/{trabajo_id})
+    para no crear una serie por cada URL; la plantilla de cada ruta vista se
+    recuerda, así el costo por solicitud son dos perf_counter y unos locks.
+    """
+
+    def __init__(self, app, metricas):
+        self.app = app
+        self.metricas = metricas
+        self._plantillas = {}
+
+    def _plantilla(self, scope):
+        ruta = scope["path"]
+        plantilla = self._plantillas.get(ruta)
+        if plantilla is None:
+            plantilla = "sin_ruta"
+            for candidata in getattr(scope.get("app"), "routes", ()):
+                coincidencia, _ = candidata.matches(scope)
+                if coincidencia.value:  # Match.NONE == 0
+                    plantilla = getattr(candidata, "path", ruta)
+                    break
+            if len(self._plantillas) >= MAX_RUTAS_RECORDADAS:
+                self._plantillas.clear()
+            self._plantillas[ruta] = plantilla
+        return plantilla
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        ruta, metodo = self._plantilla(scope), scope["method"]
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            await send(mensaje)
+
+        self.metricas.en_curso.inc(ruta, metodo)
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            self.metricas.latencia.observar(time.perf_counter() - inicio, ruta, metodo)
+            self.metricas.solicitudes.inc(ruta, metodo, str(estado))
+            self.metricas.en_curso.dec(ruta, metodo)
+
+def instrumentar_engine(engine, histograma):
+    """Mide cada sentencia que ejecuta `engine` (eventos de cursor de SQLAlchemy)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_inicios_metricas", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _despues(conn, cursor, statement, parameters, context, executemany):
+        inicios = conn.info.get("_inicios_metricas")
+        if inicios:
+            histograma.observar(time.perf_counter() - inicios.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _error(contexto):
+        inicios = contexto.connection.info.get("_inicios_metricas") if contexto.connection is not None else None
+        if inicios:
+            histograma.observar(time.perf_counter() - inicios.pop())
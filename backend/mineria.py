@@ -1,176 +1,406 @@
+import codecs
+import hashlib
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 import re
+from etapas import Etapas, trazar_memoria
+from taxonomia import TAXONOMIA, columnas_habilidades
 #from sklearn.base import BaseEstimator, TransformerMixin
 
-#USAR LA MISMA FUNCIÓN DE MINERÍA
-def procesar_datos_computrabajo(csv_path):
-    # Leer archivo CSV
+# HABILIDADES A DETECTAR (ver taxonomia.json)
+HARD_SKILLS = TAXONOMIA.hard_skills
+SOFT_SKILLS = TAXONOMIA.soft_skills
+
+# Caracteres que re.IGNORECASE iguala a una letra ASCII pero que lower() no cambia
+_PLEGADO_IGNORECASE = str.maketrans({'ſ': 's', 'ı': 'i'})
+
+def _es_palabra(caracter):
+    return re.match(r'\w', caracter) is not None
+
+class DetectorHabilidades:
+    """
+    Detecta todas las habilidades recorriendo cada documento una sola vez.
+
+    Las habilidades se combinan en una única alternancia \b(?:a|b|...)\b sin
+    grupos de captura (así el motor de re puede optimizarla) y el texto
+    encontrado se traduce a su columna con un diccionario. Como la
+    alternancia consume el texto, una habilidad que empieza dentro de otra ya
+    encontrada ("big data" / "data lake") no la vería el recorrido; esos
+    solapamientos posibles se calculan al compilar y se verifican con el
+    patrón individual en la posición exacta.
+    """
+
+    def __init__(self, columnas):
+        self.columnas = list(columnas.keys())
+        habilidades = list(columnas.values())
+        minusculas = [h.lower() for h in habilidades]
+
+        # Patrón individual \bskill\b (mismo criterio que la versión por patrón)
+        self.patrones = [re.compile(rf'\b{re.escape(h)}\b', re.IGNORECASE) for h in habilidades]
+
+        # Las más largas primero para que la alternancia prefiera la coincidencia completa
+        alternativas = '|'.join(re.escape(h) for h in sorted(set(minusculas), key=len, reverse=True))
+        self.patron_combinado = re.compile(rf'\b(?:{alternativas})\b')
+        self.literal_a_columna = {}
+        for i, h in enumerate(minusculas):
+            self.literal_a_columna.setdefault(h, i)
+
+        # (desplazamiento, columna) de otras habilidades que podrían empezar
+        # dentro de la coincidencia de cada habilidad (solo donde hay \b)
+        self.solapamientos = [
+            [(o, j) for o in range(len(propia)) for j, otra in enumerate(minusculas)
+             if (o or j != i)
+             and (o == 0 or _es_palabra(propia[o - 1]) != _es_palabra(propia[o]))
+             and (otra.startswith(propia[o:]) or propia[o:].startswith(otra))]
+            for i, propia in enumerate(minusculas)
+        ]
+
+    def detectar(self, textos):
+        """Devuelve una matriz booleana (documentos x columnas)"""
+        buscar = self.patron_combinado.finditer
+        literal_a_columna = self.literal_a_columna
+        solapamientos = self.solapamientos
+        patrones = self.patrones
+
+        # Coordenadas de los aciertos; la matriz se llena de una sola vez al final
+        filas, cols = [], []
+        for fila, texto in enumerate(textos):
+            if not isinstance(texto, str):
+                continue
+            texto = texto.lower()
+            if 'ſ' in texto or 'ı' in texto:
+                texto = texto.translate(_PLEGADO_IGNORECASE)
+            for m in buscar(texto):
+                col = literal_a_columna[m.group()]
+                filas.append(fila)
+                cols.append(col)
+                for o, otra in solapamientos[col]:
+                    if patrones[otra].match(texto, m.start() + o):
+                        filas.append(fila)
+                        cols.append(otra)
+
+        matriz = np.zeros((len(textos), len(self.columnas)), dtype=bool)
+        matriz[filas, cols] = True
+        return matriz
+
+class Buscadores:
+    """
+    Detector de habilidades y patrones de carrera compilados a partir de
+    una taxonomía. Compilarlos cuesta; se construyen una vez por versión
+    de la taxonomía con obtener_buscadores() y se reutilizan.
+
+    Los patrones combinados (patron_*) son los de la clasificación por
+    columnas: los de palabra completa se aplican sin IGNORECASE sobre texto
+    en minúsculas plegado (ſ, ı), que es equivalente y mucho más rápido.
+    """
+
+    def __init__(self, taxonomia):
+        self.version = taxonomia.version
+        self.detector = DetectorHabilidades(taxonomia.columnas())
+        self.keywords_ingenieria = taxonomia.keywords_ingenieria
+        self.carrera_keywords = taxonomia.carrera_keywords
+        self.keywords_principales = taxonomia.keywords_principales
+        self.patrones_carrera = {
+            carrera: [re.compile(rf'\b{re.escape(kw)}\b', re.IGNORECASE) for kw in keywords]
+            for carrera, keywords in self.carrera_keywords.items()
+        }
+        self.patron_principales = {
+            carrera: re.compile('|'.join(re.escape(kw) for kw in kws)) for carrera, kws in self.keywords_principales.items()
+        }
+        self.patrones_plegados = {
+            carrera: [re.compile(rf'\b{re.escape(kw.lower())}\b') for kw in kws] for carrera, kws in self.carrera_keywords.items()
+        }
+        self.patron_carrera = {
+            carrera: re.compile(rf'\b(?:{"|".join(re.escape(kw.lower()) for kw in kws)})\b')
+            for carrera, kws in self.carrera_keywords.items()
+        }
+        self.patron_generico = {
+            carrera: re.compile(rf'\b(?:{"|".join(re.escape(kw.lower()) for kw in kws[:2])})\b')
+            for carrera, kws in self.carrera_keywords.items()
+        }
+
+# Buscadores ya compilados, por versión de taxonomía
+_BUSCADORES = {}
+
+def obtener_buscadores(taxonomia=None):
+    """Buscadores de `taxonomia` (por defecto la del proceso), compilados solo la primera vez"""
+    taxonomia = TAXONOMIA if taxonomia is None else taxonomia
+    buscadores = _BUSCADORES.get(taxonomia.version)
+    if buscadores is None:
+        buscadores = _BUSCADORES[taxonomia.version] = Buscadores(taxonomia)
+    return buscadores
+
+BUSCADORES = obtener_buscadores()
+DETECTOR_HABILIDADES = BUSCADORES.detector
+
+# FILTRADO POR INGENIERÍAS
+KEYWORDS_ENGINEERING = BUSCADORES.keywords_ingenieria
+
+# CLASIFICACIÓN DE CARRERA
+CARRERA_KEYWORDS = BUSCADORES.carrera_keywords
+# Keywords principales para búsqueda rápida (sin regex)
+KEYWORDS_PRINCIPALES = BUSCADORES.keywords_principales
+# Patrones regex pre-compilados (solo una vez)
+CARRERA_PATTERNS = BUSCADORES.patrones_carrera
+
+def detectar_carrera_optimizada(titulo, subtitulo, descripcion, requerimientos):
+    """Clasifica carrera con salida temprana para reducir búsquedas"""
+    # Convertir campos a lowercase una sola vez
+    campos = [
+        str(titulo).lower(),
+        str(subtitulo).lower(),
+        str(descripcion).lower(),
+        str(requerimientos).lower()
+    ]
+
+    # PASO 1: Búsqueda rápida con keywords principales (substring, sin regex)
+    for carrera, kws_principales in KEYWORDS_PRINCIPALES.items():
+        for campo in campos:
+            if any(kw in campo for kw in kws_principales):
+                return carrera  # Salida temprana
+
+    # PASO 2: Solo si no hubo match, hacer búsqueda regex completa
+    puntajes = {}
+    for carrera, patterns in CARRERA_PATTERNS.items():
+        score = 0
+        for campo in campos:
+            for pattern in patterns:
+                if pattern.search(campo):
+                    score += 1
+                    if score >= 2:
+                        return carrera
+
+        if score > 0:
+            puntajes[carrera] = score
+
+    # PASO 3: Si hay puntajes pero ninguno llegó a 2, devolver el mayor
+    if puntajes:
+        return max(puntajes, key=puntajes.get)
+
+    # PASO 4: términos genéricos
+    texto_total = ' '.join(campos)
+    if 'ingeniero' in texto_total or 'ing.' in texto_total:
+        for carrera, patterns in CARRERA_PATTERNS.items():
+            if any(p.search(texto_total) for p in patterns[:2]):  # Solo primeros 2 patterns
+                return carrera
+
+    return 'No clasificado'
+
+def _plegar(texto):
+    return texto.translate(_PLEGADO_IGNORECASE) if 'ſ' in texto or 'ı' in texto else texto
+
+def _coincide(patron, textos):
+    """Máscara booleana de patron.search sobre un arreglo de textos"""
+    buscar = patron.search
+    return np.fromiter((buscar(t) is not None for t in textos), dtype=bool, count=len(textos))
+
+def clasificar_carreras(titulos, subtitulos, descripciones, requerimientos, buscadores=None):
+    """
+    Versión por columnas de detectar_carrera_optimizada, con el mismo
+    resultado fila a fila: cada patrón combinado de carrera se evalúa una
+    vez por columna, solo sobre las filas que siguen sin carrera, y la
+    prioridad se resuelve con máscaras.
+
+    1. keywords principales (substring): la primera carrera que aparezca
+    2-3. la primera carrera con puntaje >= 2; si ninguna, la primera con
+         puntaje 1 (puntaje = pares campo/patrón que coinciden)
+    4. si el texto dice 'ingeniero' o 'ing.', la primera carrera cuyos dos
+       primeros patrones aparezcan en el texto unido
+
+    `buscadores` permite clasificar con otra taxonomía (ver obtener_buscadores)
+    """
+    buscadores = BUSCADORES if buscadores is None else buscadores
+    campos = [pd.Series(c).astype(str).str.lower() for c in (titulos, subtitulos, descripciones, requerimientos)]
+    indice = campos[0].index
+    campos = [c.to_numpy(dtype=object) for c in campos]
+    plegados = [np.array([_plegar(t) for t in c], dtype=object) for c in campos]
+    n = len(indice)
+    resultado = np.full(n, 'No clasificado', dtype=object)
+    pendientes = np.ones(n, dtype=bool)
+
+    def asignar(carrera, mascara):
+        nuevas = pendientes & mascara
+        resultado[nuevas] = carrera
+        pendientes[nuevas] = False
+
+    # PASO 1: keywords principales, sin regex por palabra
+    for carrera, patron in buscadores.patron_principales.items():
+        coincide = np.zeros(n, dtype=bool)
+        for campo in campos:
+            filas = np.flatnonzero(pendientes & ~coincide)
+            coincide[filas] = _coincide(patron, campo[filas])
+        asignar(carrera, coincide)
+
+    # PASO 2-3: puntajes sobre las filas restantes
+    con_puntaje_uno = np.full(n, None, dtype=object)
+    for carrera, patron in buscadores.patron_carrera.items():
+        restantes = np.flatnonzero(pendientes)
+        if not len(restantes):
+            break
+        presencia = np.column_stack([_coincide(patron, campo[restantes]) for campo in plegados])
+        campos_con_match = presencia.sum(axis=1)
+        puntaje_dos = campos_con_match >= 2
+        # Un solo campo con coincidencias: el puntaje es cuántos patrones distintos coinciden en él
+        unico = np.flatnonzero(campos_con_match == 1)
+        if len(unico):
+            columna = presencia[unico].argmax(axis=1)
+            for j, campo in enumerate(plegados):
+                filas = unico[columna == j]
+                if len(filas):
+                    textos = campo[restantes[filas]]
+                    distintos = sum(_coincide(p, textos).astype(int) for p in buscadores.patrones_plegados[carrera])
+                    puntaje_dos[filas] = distintos >= 2
+        mascara = np.zeros(n, dtype=bool)
+        mascara[restantes[puntaje_dos]] = True
+        asignar(carrera, mascara)
+        primera_con_uno = restantes[(campos_con_match >= 1) & ~puntaje_dos]
+        primera_con_uno = primera_con_uno[con_puntaje_uno[primera_con_uno] == None]
+        con_puntaje_uno[primera_con_uno] = carrera
+    con_uno = pendientes & (con_puntaje_uno != None)
+    resultado[con_uno] = con_puntaje_uno[con_uno]
+    pendientes[con_uno] = False
+
+    # PASO 4: términos genéricos sobre el texto unido
+    filas = np.flatnonzero(pendientes)
+    if len(filas):
+        # 'ingeniero' e 'ing.' no contienen espacios: basta buscarlos campo por campo
+        generico = np.zeros(len(filas), dtype=bool)
+        for campo in campos:
+            generico |= np.fromiter(('ingeniero' in t or 'ing.' in t for t in campo[filas]), dtype=bool, count=len(filas))
+        filas = filas[generico]
+        texto_total = np.array([' '.join(textos) for textos in zip(*(campo[filas] for campo in plegados))], dtype=object)
+        for carrera, patron in buscadores.patron_generico.items():
+            coincide = np.zeros(n, dtype=bool)
+            coincide[filas] = _coincide(patron, texto_total)
+            asignar(carrera, coincide)
+
+    return pd.Series(resultado, index=indice, dtype=object)
+
+COLUMNAS_A_ELIMINAR = [
+    'Subtítulo', 'Calificación', 'URL_Empresa', 'Región',
+    'Requerimientos', 'Contrato', 'Descripción', 'texto_skills', 'Acerca_de_Empresa'
+]
+
+# Campos crudos que identifican una oferta para la carga incremental
+CAMPOS_HASH = ['Título', 'Empresa', 'Descripción', 'Requerimientos']
+
+def hash_contenido(df_original):
+    """Hash estable (blake2b de 128 bits, en hex) del contenido de cada oferta cruda"""
+    texto = df_original.reindex(columns=CAMPOS_HASH).fillna('').astype(str)
+    unido = texto[CAMPOS_HASH[0]].str.strip()
+    for campo in CAMPOS_HASH[1:]:
+        unido = unido + '\x1f' + texto[campo].str.strip()
+    return pd.Series(
+        [hashlib.blake2b(valor.encode('utf-8'), digest_size=16).hexdigest() for valor in unido],
+        index=df_original.index, dtype=object
+    )
+
+def _sin_hash(df):
+    return df.drop(columns='hash_contenido', errors='ignore')
+
+# Tamaño de bloque por defecto del modo streaming (filas por bloque)
+TAMANO_BLOQUE_DEFECTO = 5000
+# Filas de muestra que devuelve el modo streaming para las vistas previas
+FILAS_MUESTRA = 50
+
+# Procesos del pool de minería; con más de uno, un archivo completo se reparte en fragmentos
+MINERIA_TRABAJADORES = int(os.getenv("MINERIA_TRABAJADORES", "1"))
+# Filas mínimas por fragmento: por debajo de esto no compensa enviar el trabajo a otro proceso
+FILAS_MINIMAS_FRAGMENTO = 2000
+# Campos que se rellenan con 'No especificado', en el orden en que se reportan
+CAMPOS_RELLENO = ['company', 'salary', 'modality']
+_pool = None
+
+def obtener_pool(trabajadores=None):
+    """
+    ProcessPoolExecutor compartido, creado al primer uso con
+    max(MINERIA_TRABAJADORES, trabajadores) procesos. Si se piden más
+    procesos de los que tiene, se reemplaza por uno más grande; el anterior
+    termina los trabajos que ya recibió.
+    """
+    global _pool
+    procesos = max(MINERIA_TRABAJADORES, trabajadores or 0)
+    if _pool is None or _pool._max_workers < procesos:
+        anterior, _pool = _pool, ProcessPoolExecutor(max_workers=procesos)
+        if anterior is not None:
+            anterior.shutdown(wait=False)
+    return _pool
+
+def _detectar_encoding(csv_path):
+    """Devuelve 'utf-8' si todo el archivo decodifica como UTF-8, si no 'latin1' (sin cargarlo en memoria)"""
+    decodificador = codecs.getincrementaldecoder('utf-8')()
     try:
-        df_original = pd.read_csv(csv_path, sep=';', encoding='utf-8', on_bad_lines='skip')
+        with open(csv_path, 'rb') as f:
+            for bloque in iter(lambda: f.read(1024 * 1024), b''):
+                decodificador.decode(bloque)
+        decodificador.decode(b'', final=True)
+        return 'utf-8'
     except UnicodeDecodeError:
-        df_original = pd.read_csv(csv_path, sep=';', encoding='latin1', on_bad_lines='skip')
+        return 'latin1'
 
-    # Hacer una copia para procesar
+def _procesar_bloque(df_original):
+    """
+    Aplica el pipeline completo a un DataFrame crudo.
+    Devuelve (df_final, registros_no_ingenieria, registros_no_clasificados, rellenados, spans),
+    con un span por etapa (ver etapas.Etapas)
+    """
+    etapas = Etapas()
+    # Hacer una copia para procesar; el hash se calcula antes de modificar los textos
+    if 'hash_contenido' not in df_original.columns:
+        with etapas.medir("hash", len(df_original)):
+            df_original = df_original.assign(hash_contenido=hash_contenido(df_original))
     df = df_original.copy()
     # LIMPIEZA DE SALARIO
-    df['Salario'] = df['Salario'].fillna('').astype(str).str.replace(r"\(.*?\)", "", regex=True).str.strip()
-    df[['Salario_Simbolo', 'Salario_Valor']] = df['Salario'].str.extract(r'(\D+)?([\d.,]+)')
-    df['Salario'] = df['Salario'].str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
-    df['Salario'] = pd.to_numeric(df['Salario'], errors='coerce')
+    with etapas.medir("salario", len(df)):
+        df['Salario'] = df['Salario'].fillna('').astype(str).str.replace(r"\(.*?\)", "", regex=True).str.strip()
+        df[['Salario_Simbolo', 'Salario_Valor']] = df['Salario'].str.extract(r'(\D+)?([\d.,]+)')
+        df['Salario'] = df['Salario'].str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+        df['Salario'] = pd.to_numeric(df['Salario'], errors='coerce')
 
-    df.drop(columns='Salario_Simbolo', inplace=True)
-    df.drop(columns='Salario', inplace=True)
-    df.rename(columns={'Salario_Valor': 'Salario'}, inplace=True)
+        df.drop(columns='Salario_Simbolo', inplace=True)
+        df.drop(columns='Salario', inplace=True)
+        df.rename(columns={'Salario_Valor': 'Salario'}, inplace=True)
 
     # FILTRADO POR INGENIERÍAS
-    keywords_engineering = [
-    'engineer', 'ingeniería', 'ingeniero', 'ingeniero agrónomo', 'ing.', 'industrial', 'civil', 'sistemas', 'ambiental',
-    'agronomía', 'agrónomo', 'agronoma', 'agronomist', 'minas', 'minería', 'software engineer',
-    'network engineer', 'system engineer', 'data engineer', 'devops', 'frontend', 'backend'
-    ]
-
     def contiene_palabra_ingenieria(texto):
         if isinstance(texto, str):
-            return any(palabra in texto for palabra in keywords_engineering)
+            return any(palabra in texto for palabra in KEYWORDS_ENGINEERING)
         return False
-    df['Título'] = df['Título'].astype(str).str.lower()
-    df['Descripción'] = df['Descripción'].astype(str).str.lower()
-    filtro = df['Título'].apply(contiene_palabra_ingenieria) | df['Descripción'].apply(contiene_palabra_ingenieria)
-    df = df[filtro].copy()
-
-    registros_no_ingenieria = df_original[~filtro].copy()
-    registros_no_ingenieria.to_json("data/registros_no_ingenieria.json", orient="records", force_ascii=False)
-
-    # UNIFICAR TEXTO PARA MINERÍA DE HABILIDADES
-    df['Descripción'] = df['Descripción'].str.replace(r'[\r\n]+', ' ', regex=True)
-    df['Requerimientos'] = df['Requerimientos'].astype(str).str.replace(r'[\r\n]+', ' ', regex=True)
-    df['texto_skills'] = df['Descripción'] + " " + df['Requerimientos']
-
-    # DETECCIÓN DE HABILIDADES
-    hard_skills = [
-        'python', 'java', 'sql', '_net', 'javascript', 'html', 'css', 'django', 'flask', 'react', 'angular',
-        'node', 'power bi', 'sap', 'aws', 'azure', 'git', 'github', 'ci/cd', 'linux', 'docker', 'kubernetes',
-        'etl', 'big data', 'data lake', 'postgresql', 'mysql', 'nosql', 'mongodb', 'cloud', 'bash', 'jira',
-        'excel', 'autocad', 'r', 'office', 'google_workspace', 'matlab', 'project', 'solidworks', 'Manejo_de_datos',
-        'seguridad', 'desarrollo_web', 'gestión_proyectos', 'Mejora_procesos'
-    ]
-    soft_skills = [
-        'comunicación', 'trabajo en equipo', 'proactividad', 'compromiso', 'adaptabilidad',
-        'liderazgo', 'responsabilidad', 'creatividad', 'resolución de problemas',
-        'orientación al cliente', 'pensamiento crítico'
-    ]
-    
-    # Crear diccionario con TODOS los patrones y nombres de columnas
-    all_patterns = {}
-    for skill in hard_skills:
-        col_name = f"hard_{skill.replace('/', '_').replace(' ', '_')}"
-        all_patterns[col_name] = re.compile(rf'\b{re.escape(skill)}\b', re.IGNORECASE)
-    
-    for skill in soft_skills:
-        col_name = f"soft_{skill.replace(' ', '_')}"
-        all_patterns[col_name] = re.compile(rf'\b{re.escape(skill)}\b', re.IGNORECASE)
-    
-    # Función que aplica TODOS los patrones en una sola pasada
-    def detectar_todas_habilidades(texto):
-        if not isinstance(texto, str):
-            return {col: False for col in all_patterns.keys()}
-        
-        texto_lower = texto.lower()
-        return {col: bool(pattern.search(texto_lower)) for col, pattern in all_patterns.items()}
-    
-    # Aplicar la función UNA SOLA VEZ por fila (en lugar de 41 veces)
-    print("Detectando habilidades en una sola pasada...")
-    resultados_skills = df['texto_skills'].apply(detectar_todas_habilidades)
-    
-    # Convertir resultados a columnas del DataFrame
-    df_skills = pd.DataFrame(resultados_skills.tolist(), index=df.index)
-    df = pd.concat([df, df_skills], axis=1)
+    with etapas.medir("filtro_ingenieria", len(df)) as span:
+        df['Título'] = df['Título'].astype(str).str.lower()
+        df['Descripción'] = df['Descripción'].astype(str).str.lower()
+        filtro = df['Título'].apply(contiene_palabra_ingenieria) | df['Descripción'].apply(contiene_palabra_ingenieria)
+        df = df[filtro].copy()
+        span["filas_salida"] = len(df)
 
-    # CLASIFICACIÓN DE CARRERA
-    df['Subtítulo'] = df['Subtítulo'].astype(str).str.lower()
-    
-    carrera_keywords = {
-        'Ingeniería de Sistemas': ['network engineer', 'ingeniería de sistemas', 'ing. sistemas', 'sistemas', 'informática', 'ciencia de datos', 'python', 'java', 'sql'],
-        'Ingeniería de Minas': ['ingeniería de minas', 'minería', 'voladura', 'mina', 'unidad minera'],
-        'Ingeniería Industrial': ['ingeniería industrial', 'procesos', 'gestión de calidad', 'producción', 'logística'],
-        'Ingeniería Civil': ['ingeniería civil', 'civil', 'autocad', 'estructuras', 'obra', 'planos'],
-        'Ingeniería Ambiental': ['ingeniería ambiental', 'medio ambiente', 'impacto ambiental', 'residuos'],
-        'Ingeniería Agrónoma': ['ingeniería agrónoma', 'cultivos', 'agronomía', 'ingeniero agrónomo', 'agroindustria', 'agrícola']
-    }
-    
-    # Keywords principales para búsqueda rápida (sin regex)
-    keywords_principales = {
-        'Ingeniería de Sistemas': ['sistemas', 'python', 'java', 'sql'],
-        'Ingeniería de Minas': ['minería', 'mina', 'voladura'],
-        'Ingeniería Industrial': ['industrial', 'producción', 'logística'],
-        'Ingeniería Civil': ['civil', 'autocad', 'obra'],
-        'Ingeniería Ambiental': ['ambiental', 'residuos', 'medio ambiente'],
-        'Ingeniería Agrónoma': ['agrónoma', 'cultivos', 'agrícola']
-    }
-    
-    # Pre-compilar patrones regex (solo una vez)
-    carrera_patterns = {
-        carrera: [re.compile(rf'\b{re.escape(kw)}\b', re.IGNORECASE) for kw in keywords]
-        for carrera, keywords in carrera_keywords.items()
-    }
+    registros_no_ingenieria = _sin_hash(df_original[~filtro])
 
-    def detectar_carrera_optimizada(titulo, subtitulo, descripcion, requerimientos):
-        """Clasifica carrera con salida temprana para reducir búsquedas"""
-        # Convertir campos a lowercase una sola vez
-        campos = [
-            str(titulo).lower(),
-            str(subtitulo).lower(),
-            str(descripcion).lower(),
-            str(requerimientos).lower()
-        ]
-        
-        # PASO 1: Búsqueda rápida con keywords principales (substring, sin regex)
-        for carrera, kws_principales in keywords_principales.items():
-            for campo in campos:
-                if any(kw in campo for kw in kws_principales):
-                    return carrera  # Salida temprana
-        
-        # PASO 2: Solo si no hubo match, hacer búsqueda regex completa
-        puntajes = {}
-        for carrera, patterns in carrera_patterns.items():
-            score = 0
-            for campo in campos:
-                for pattern in patterns:
-                    if pattern.search(campo):
-                        score += 1
-                        if score >= 2:  
-                            return carrera
-            
-            if score > 0:
-                puntajes[carrera] = score
-        
-        # PASO 3: Si hay puntajes pero ninguno llegó a 2, devolver el mayor
-        if puntajes:
-            return max(puntajes, key=puntajes.get)
-        
-        # PASO 4: términos genéricos
-        texto_total = ' '.join(campos)
-        if 'ingeniero' in texto_total or 'ing.' in texto_total:
-            for carrera, patterns in carrera_patterns.items():
-                if any(p.search(texto_total) for p in patterns[:2]):  # Solo primeros 2 patterns
-                    return carrera
-        
-        return 'No clasificado'
-
-    print("Clasificando carreras con algoritmo optimizado...")
-    df['Carrera Detectada'] = df.apply(
-        lambda row: detectar_carrera_optimizada(
-            row['Título'], row['Subtítulo'], row['Descripción'], row['Requerimientos']
-        ), 
-        axis=1
-    )
+    # DETECCIÓN DE HABILIDADES (un solo recorrido por documento)
+    with etapas.medir("habilidades", len(df)):
+        # UNIFICAR TEXTO PARA MINERÍA DE HABILIDADES
+        df['Descripción'] = df['Descripción'].str.replace(r'[\r\n]+', ' ', regex=True)
+        df['Requerimientos'] = df['Requerimientos'].astype(str).str.replace(r'[\r\n]+', ' ', regex=True)
+        df['texto_skills'] = df['Descripción'] + " " + df['Requerimientos']
+        matriz_skills = DETECTOR_HABILIDADES.detectar(df['texto_skills'])
+
+        # La matriz booleana se convierte directamente en columnas del DataFrame
+        df_skills = pd.DataFrame(matriz_skills, index=df.index, columns=DETECTOR_HABILIDADES.columnas)
+        df = pd.concat([df, df_skills], axis=1)
 
-    df_con_carrera = df.copy()
-    df = df[df['Carrera Detectada'] != 'No clasificado'].copy()
-    registros_no_clasificados = df_con_carrera[df_con_carrera['Carrera Detectada'] == 'No clasificado'].copy()
-    columnas_habilidades = [col for col in registros_no_clasificados.columns if col.startswith("hard_") or col.startswith("soft_")]
-    registros_no_clasificados = registros_no_clasificados.drop(columns=columnas_habilidades)
-    registros_no_clasificados.to_json("data/registros_no_clasificados.json", orient="records", force_ascii=False)
+    # CLASIFICACIÓN DE CARRERA
+    with etapas.medir("carreras", len(df)) as span:
+        df['Subtítulo'] = df['Subtítulo'].astype(str).str.lower()
+        df['Carrera Detectada'] = clasificar_carreras(df['Título'], df['Subtítulo'], df['Descripción'], df['Requerimientos'])
+
+        df_con_carrera = df.copy()
+        df = df[df['Carrera Detectada'] != 'No clasificado'].copy()
+        registros_no_clasificados = df_con_carrera[df_con_carrera['Carrera Detectada'] == 'No clasificado'].copy()
+        columnas_skills = [col for col in registros_no_clasificados.columns if col.startswith("hard_") or col.startswith("soft_")]
+        registros_no_clasificados = registros_no_clasificados.drop(columns=columnas_skills + ['hash_contenido'])
+        span["filas_salida"] = len(df)
 
     # LIMPIEZA DE CARACTERES
     columnas_texto = df.select_dtypes(include='object').columns
@@ -178,58 +408,298 @@ def procesar_datos_computrabajo(csv_path):
         if not isinstance(texto, str):
             return texto
         return re.sub(r'[^\w\s.,:/()-]', '', texto)
-    for col in columnas_texto:
-        df[col] = df[col].apply(limpiar_y_contar)
+    with etapas.medir("limpieza_caracteres", len(df)):
+        for col in columnas_texto:
+            df[col] = df[col].apply(limpiar_y_contar)
 
-    # ELIMINAR COLUMNAS INNECESARIAS
-    columnas_a_eliminar = [
-        'Subtítulo', 'Calificación', 'URL_Empresa', 'Región',
-        'Requerimientos', 'Contrato', 'Descripción', 'texto_skills', 'Acerca_de_Empresa'
-    ]
-    df.drop(columns=[col for col in columnas_a_eliminar if col in df.columns], inplace=True)
-
-    # RENOMBRAR
-    df.rename(columns={
-        'Título': 'title',
-        'Empresa': 'company',
-        'Salario': 'salary',
-        'Jornada': 'workday',
-        'Tipo_Asistencia': 'modality',
-        'Carrera Detectada': 'career'
-    }, inplace=True)
-
-    # RELLENAR NULOS
-    rellenados = []
-    for campo in ['company', 'salary', 'modality']:
-        if campo in df.columns:
-            cantidad_nulos = df[campo].isna().sum()
-            if cantidad_nulos > 0:
-                rellenados.append(campo)
-            df[campo] = df[campo].fillna('No especificado')
-
-    # SELECCIONAR COLUMNAS FINALES
-    columnas_finales = ['career', 'title', 'company', 'workday', 'modality', 'salary'] + \
-        [col for col in df.columns if col.startswith("hard_") or col.startswith("soft_")]
+    with etapas.medir("columnas_finales", len(df)):
+        # ELIMINAR COLUMNAS INNECESARIAS
+        df.drop(columns=[col for col in COLUMNAS_A_ELIMINAR if col in df.columns], inplace=True)
+
+        # RENOMBRAR
+        df.rename(columns={
+            'Título': 'title',
+            'Empresa': 'company',
+            'Salario': 'salary',
+            'Jornada': 'workday',
+            'Tipo_Asistencia': 'modality',
+            'Carrera Detectada': 'career'
+        }, inplace=True)
+
+        # RELLENAR NULOS
+        rellenados = []
+        for campo in CAMPOS_RELLENO:
+            if campo in df.columns:
+                cantidad_nulos = df[campo].isna().sum()
+                if cantidad_nulos > 0:
+                    rellenados.append(campo)
+                df[campo] = df[campo].fillna('No especificado')
+
+        # SELECCIONAR COLUMNAS FINALES
+        columnas_finales = ['career', 'title', 'company', 'workday', 'modality', 'salary'] + \
+            [col for col in df.columns if col.startswith("hard_") or col.startswith("soft_")] + ['hash_contenido']
+        df_final = df[columnas_finales].copy()
+
+    return df_final, registros_no_ingenieria, registros_no_clasificados, rellenados, etapas.spans
+
+def _concatenar(partes):
+    # Los fragmentos vacíos se omiten para no alterar los tipos de columna del resultado
+    no_vacias = [p for p in partes if not p.empty]
+    return pd.concat(no_vacias) if no_vacias else partes[0]
+
+def _procesar_en_fragmentos(df_original, ejecutor, fragmentos):
+    """
+    Reparte df_original en `fragmentos` tramos consecutivos, aplica
+    _procesar_bloque a cada uno en el ejecutor y los une en el orden
+    original. Todas las etapas son independientes por fila (el relleno usa
+    un valor fijo), así que el resultado es idéntico al de un solo bloque.
+    """
+    limites = np.linspace(0, len(df_original), fragmentos + 1, dtype=int)
+    partes = [df_original.iloc[inicio:fin] for inicio, fin in zip(limites[:-1], limites[1:])]
+    resultados = list(ejecutor.map(_procesar_bloque, partes))
+    rellenados = [c for c in CAMPOS_RELLENO if any(c in r[3] for r in resultados)]
+    return (_concatenar([r[0] for r in resultados]), _concatenar([r[1] for r in resultados]),
+            _concatenar([r[2] for r in resultados]), rellenados, [span for r in resultados for span in r[4]])
+
+def _contar_carreras(carreras, conteo=None):
+    """Suma las ofertas por carrera a `conteo`; devuelve el dict ordenado de mayor a menor"""
+    conteo = dict(conteo or {})
+    for carrera, cantidad in carreras.value_counts().items():
+        conteo[carrera] = conteo.get(carrera, 0) + int(cantidad)
+    return dict(sorted(conteo.items(), key=lambda par: (-par[1], par[0])))
+
+#USAR LA MISMA FUNCIÓN DE MINERÍA
+def procesar_datos_computrabajo(csv_path, trabajadores=None, vistas_previas=None):
+    """
+    Procesa el archivo completo en memoria. Con `vistas_previas` (una
+    VistasPrevias) los cuatro conjuntos se escriben en disco y las vistas
+    previas devueltas son solo las primeras FILAS_MUESTRA filas de cada uno.
+    resumen["etapas"] trae el span de cada etapa (ver etapas.Etapas).
+    """
+    with trazar_memoria():
+        return _procesar_datos_computrabajo(csv_path, trabajadores, vistas_previas)
+
+def _procesar_datos_computrabajo(csv_path, trabajadores, vistas_previas):
+    etapas = Etapas()
+    # Leer archivo CSV
+    with etapas.medir("lectura") as span:
+        try:
+            df_original = pd.read_csv(csv_path, sep=';', encoding='utf-8', on_bad_lines='skip')
+        except UnicodeDecodeError:
+            df_original = pd.read_csv(csv_path, sep=';', encoding='latin1', on_bad_lines='skip')
+        span["filas_salida"] = len(df_original)
+
+    # Con varios trabajadores, el archivo se procesa en fragmentos en paralelo
+    trabajadores = MINERIA_TRABAJADORES if trabajadores is None else trabajadores
+    fragmentos = min(trabajadores, len(df_original) // FILAS_MINIMAS_FRAGMENTO)
+    if fragmentos > 1:
+        # Un fragmento por proceso: más fragmentos que procesos solo se ejecutarían uno tras otro
+        df_final, registros_no_ingenieria, registros_no_clasificados, rellenados, spans = \
+            _procesar_en_fragmentos(df_original, obtener_pool(fragmentos), fragmentos)
+    else:
+        df_final, registros_no_ingenieria, registros_no_clasificados, rellenados, spans = _procesar_bloque(df_original)
+    etapas.extender(spans)
+    with etapas.medir("registros_descartados", len(registros_no_ingenieria) + len(registros_no_clasificados)):
+        registros_no_ingenieria.to_json("data/registros_no_ingenieria.json", orient="records", force_ascii=False)
+        registros_no_clasificados.to_json("data/registros_no_clasificados.json", orient="records", force_ascii=False)
 
     # Guardar para estadísticas
-    df_final = df[columnas_finales].copy()
-    columnas_detectadas = [col for col in df.columns if col.startswith("hard_") or col.startswith("soft_")]
-    
+    columnas_detectadas = [col for col in df_final.columns if col.startswith("hard_") or col.startswith("soft_")]
+
     resumen = {
         "originales": len(df_original),
-        "eliminados": len(df_original) - len(df),
-        "finales": len(df),
-        "transformaciones_salario": df["salary"].notna().sum() if "salary" in df else 0,
+        "eliminados": len(df_original) - len(df_final),
+        "finales": len(df_final),
+        "transformaciones_salario": df_final["salary"].notna().sum() if "salary" in df_final else 0,
         "rellenos": rellenados,
-        "columnas_eliminadas": columnas_a_eliminar,
+        "columnas_eliminadas": COLUMNAS_A_ELIMINAR,
         "caracteres_limpiados": True,
-        "habilidades": columnas_detectadas
+        "habilidades": columnas_detectadas,
+        "carreras": _contar_carreras(df_final["career"]),
+        "sin_cambios": 0,
+        "taxonomia": BUSCADORES.version
     }
 
-    # Preparar datos para mostrar
-    preview_no_ingenieria = registros_no_ingenieria.fillna('').astype(str).to_dict(orient='records')
-    preview_no_clasificados = registros_no_clasificados.fillna('').astype(str).to_dict(orient='records')
-    preview_antes = df_original.fillna('').astype(str).to_dict(orient='records')
-    preview_despues = df_final.fillna('').to_dict(orient='records')
+    with etapas.medir("vistas_previas", len(df_original) + len(df_final) + len(registros_no_ingenieria) + len(registros_no_clasificados)):
+        if vistas_previas is not None:
+            vistas_previas.agregar(df_original, df_final, registros_no_ingenieria, registros_no_clasificados)
+            df_original = df_original.head(FILAS_MUESTRA)
+            registros_no_ingenieria = registros_no_ingenieria.head(FILAS_MUESTRA)
+            registros_no_clasificados = registros_no_clasificados.head(FILAS_MUESTRA)
+
+        # Preparar datos para mostrar
+        preview_no_ingenieria = registros_no_ingenieria.fillna('').astype(str).to_dict(orient='records')
+        preview_no_clasificados = registros_no_clasificados.fillna('').astype(str).to_dict(orient='records')
+        preview_antes = df_original.fillna('').astype(str).to_dict(orient='records')
+        preview_despues = _sin_hash(df_final if vistas_previas is None else df_final.head(FILAS_MUESTRA)).fillna('').to_dict(orient='records')
+    resumen["etapas"] = etapas.resumen()
+
+    return df_final, resumen, columnas_detectadas, preview_antes, preview_despues, preview_no_ingenieria, preview_no_clasificados
+
+class _EscritorRegistrosJson:
+    """Escribe un arreglo JSON de registros bloque a bloque, sin mantenerlos en memoria"""
+
+    def __init__(self, ruta):
+        self.archivo = open(ruta, "w", encoding="utf-8")
+        self.archivo.write("[")
+        self.vacio = True
+
+    def escribir(self, df):
+        if df.empty:
+            return
+        registros = df.to_json(orient="records", force_ascii=False)[1:-1]
+        if not self.vacio:
+            self.archivo.write(",")
+        self.archivo.write(registros)
+        self.vacio = False
+
+    def cerrar(self):
+        self.archivo.write("]")
+        self.archivo.close()
+
+def _preparar_bloque(df_original, seguimiento, etapas):
+    """Con seguimiento, calcula los hashes del bloque y deja solo las ofertas que `seguimiento.filtrar` marca como nuevas"""
+    if seguimiento is None:
+        return df_original
+    with etapas.medir("hash", len(df_original)) as span:
+        hashes = hash_contenido(df_original)
+        nuevas = seguimiento.filtrar(hashes)
+        span["filas_salida"] = int(np.count_nonzero(nuevas))
+    return df_original[nuevas].assign(hash_contenido=hashes[nuevas])
+
+def _leer_bloques(lector, etapas):
+    """Itera el lector de pandas midiendo la lectura de cada bloque"""
+    while True:
+        with etapas.medir("lectura") as span:
+            df_original = next(lector, None)
+            span["filas_salida"] = 0 if df_original is None else len(df_original)
+        if df_original is None:
+            return
+        yield df_original
+
+def _procesar_bloques(lector, ejecutor=None, seguimiento=None, etapas=None):
+    """
+    Tríos (df_original, df_minado, resultado de _procesar_bloque) en el orden
+    del archivo; df_minado es el bloque que realmente se minó (ver
+    _preparar_bloque). Con un ejecutor, los bloques siguientes se procesan
+    mientras el llamador consume el actual; se mantienen pocos bloques en
+    vuelo para acotar la memoria. La lectura y el hash se registran en `etapas`.
+    """
+    etapas = Etapas() if etapas is None else etapas
+    lector = _leer_bloques(iter(lector), etapas)
+    if ejecutor is None:
+        for df_original in lector:
+            df_minado = _preparar_bloque(df_original, seguimiento, etapas)
+            yield df_original, df_minado, _procesar_bloque(df_minado)
+        return
+
+    en_vuelo = getattr(ejecutor, "_max_workers", 1) + 1
+    pendientes = deque()
+    for df_original in lector:
+        df_minado = _preparar_bloque(df_original, seguimiento, etapas)
+        pendientes.append((df_original, df_minado, ejecutor.submit(_procesar_bloque, df_minado)))
+        if len(pendientes) >= en_vuelo:
+            df, minado, futuro = pendientes.popleft()
+            yield df, minado, futuro.result()
+    while pendientes:
+        df, minado, futuro = pendientes.popleft()
+        yield df, minado, futuro.result()
+
+def procesar_datos_computrabajo_por_bloques(csv_path, tamano_bloque=TAMANO_BLOQUE_DEFECTO, al_procesar_bloque=None,
+                                            ejecutor=None, al_avanzar=None, vistas_previas=None, seguimiento=None):
+    """
+    Modo streaming: lee el CSV por bloques de `tamano_bloque` filas y aplica
+    el pipeline a cada uno. Cada df_final parcial se entrega a
+    `al_procesar_bloque` (p. ej. para insertarlo en la BD) y los registros
+    descartados se agregan a los archivos JSON en cuanto termina el bloque,
+    de modo que la memoria depende del tamaño de bloque y no del archivo.
+
+    Con `ejecutor` (p. ej. obtener_pool()) la minería de cada bloque corre en
+    otro proceso; la lectura, los archivos y `al_procesar_bloque` siguen en el
+    hilo que llama. `al_avanzar(resumen)` se llama al terminar cada bloque.
+    Con `vistas_previas` cada bloque se agrega también a las vistas previas
+    en disco.
+
+    Con `seguimiento` (p. ej. un CargadorIncremental) se calcula el hash de
+    contenido de cada oferta: solo se minan las que `seguimiento.filtrar(hashes)`
+    marca como nuevas (las demás cuentan en resumen["sin_cambios"]) y los
+    hashes de las que el pipeline descarta se entregan a
+    `seguimiento.registrar_descartados(hashes)`.
+
+    Devuelve (resumen, columnas_detectadas, preview_antes, preview_despues,
+    preview_no_ingenieria, preview_no_clasificados); las vistas previas son
+    solo las primeras FILAS_MUESTRA filas de cada conjunto. resumen["etapas"]
+    suma los spans de todos los bloques por etapa.
+    """
+    with trazar_memoria():
+        return _procesar_datos_computrabajo_por_bloques(csv_path, tamano_bloque, al_procesar_bloque, ejecutor, al_avanzar,
+                                                        vistas_previas, seguimiento)
+
+def _procesar_datos_computrabajo_por_bloques(csv_path, tamano_bloque, al_procesar_bloque, ejecutor, al_avanzar,
+                                             vistas_previas, seguimiento):
+    etapas = Etapas()
+    encoding = _detectar_encoding(csv_path)
+    escritor_no_ingenieria = _EscritorRegistrosJson("data/registros_no_ingenieria.json")
+    escritor_no_clasificados = _EscritorRegistrosJson("data/registros_no_clasificados.json")
+
+    resumen = {
+        "originales": 0,
+        "eliminados": 0,
+        "finales": 0,
+        "transformaciones_salario": 0,
+        "rellenos": [],
+        "columnas_eliminadas": COLUMNAS_A_ELIMINAR,
+        "caracteres_limpiados": True,
+        "habilidades": list(DETECTOR_HABILIDADES.columnas),
+        "carreras": {},
+        "sin_cambios": 0,
+        "taxonomia": BUSCADORES.version
+    }
+    muestras = {"antes": [], "despues": [], "no_ingenieria": [], "no_clasificados": []}
+
+    def agregar_muestra(nombre, df, rellenar=True):
+        faltantes = FILAS_MUESTRA - len(muestras[nombre])
+        if faltantes > 0 and not df.empty:
+            cabeza = df.head(faltantes).fillna('')
+            muestras[nombre].extend((cabeza.astype(str) if rellenar else cabeza).to_dict(orient='records'))
+
+    try:
+        with pd.read_csv(csv_path, sep=';', encoding=encoding, on_bad_lines='skip', chunksize=tamano_bloque) as lector:
+            for df_original, df_minado, procesado in _procesar_bloques(lector, ejecutor, seguimiento, etapas):
+                df_final, registros_no_ingenieria, registros_no_clasificados, rellenados, spans = procesado
+                etapas.extender(spans)
+                with etapas.medir("registros_descartados", len(registros_no_ingenieria) + len(registros_no_clasificados)):
+                    if seguimiento is not None:
+                        descartadas = ~df_minado.index.isin(df_final.index)
+                        seguimiento.registrar_descartados(df_minado["hash_contenido"][descartadas].to_numpy())
+
+                    escritor_no_ingenieria.escribir(registros_no_ingenieria)
+                    escritor_no_clasificados.escribir(registros_no_clasificados)
+                if al_procesar_bloque is not None and not df_final.empty:
+                    with etapas.medir("carga_bloque", len(df_final)):
+                        al_procesar_bloque(df_final)
+
+                resumen["originales"] += len(df_original)
+                resumen["sin_cambios"] += len(df_original) - len(df_minado)
+                resumen["eliminados"] += len(df_minado) - len(df_final)
+                resumen["finales"] += len(df_final)
+                resumen["transformaciones_salario"] += int(df_final["salary"].notna().sum())
+                resumen["rellenos"] = [c for c in CAMPOS_RELLENO if c in resumen["rellenos"] or c in rellenados]
+                resumen["carreras"] = _contar_carreras(df_final["career"], resumen["carreras"])
+                with etapas.medir("vistas_previas", len(df_original) + len(df_final) + len(registros_no_ingenieria) + len(registros_no_clasificados)):
+                    if vistas_previas is not None:
+                        vistas_previas.agregar(df_original, df_final, registros_no_ingenieria, registros_no_clasificados)
+
+                    agregar_muestra("antes", df_original)
+                    agregar_muestra("despues", _sin_hash(df_final), rellenar=False)
+                    agregar_muestra("no_ingenieria", registros_no_ingenieria)
+                    agregar_muestra("no_clasificados", registros_no_clasificados)
+                if al_avanzar is not None:
+                    al_avanzar(resumen)
+    finally:
+        escritor_no_ingenieria.cerrar()
+        escritor_no_clasificados.cerrar()
 
-    return df_final, resumen, columnas_detectadas, preview_antes, preview_despues, preview_no_ingenieria, preview_no_clasificados
\ No newline at end of file
+    resumen["etapas"] = etapas.resumen()
+    return (resumen, resumen["habilidades"], muestras["antes"], muestras["despues"],
+            muestras["no_ingenieria"], muestras["no_clasificados"])
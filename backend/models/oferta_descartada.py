@@ -0,0 +1,8 @@
+from sqlalchemy import Column, String
+from database import Base
+
+class OfertaDescartada(Base):
+    """Hash de contenido de las ofertas que el pipeline descartó (no ingeniería o sin carrera), para no volver a minarlas"""
+    __tablename__ = "ofertas_descartadas"
+
+    hash_contenido = Column(String(32), primary_key=True)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, JSON
+from database import Base
+
+class ResumenCarrera(Base):
+    """Conteo de habilidades por carrera, recalculado en cada carga de datos"""
+    __tablename__ = "resumen_carreras"
+
+    id = Column(Integer, primary_key=True, index=True)
+    career = Column(String, nullable=False, unique=True, index=True)
+    career_clave = Column(String, nullable=False, index=True)
+    total_ofertas = Column(Integer, nullable=False)
+    # {columna hard_*/soft_*: número de ofertas que la piden}
+    habilidades = Column(JSON, nullable=False)
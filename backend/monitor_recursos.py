@@ -1,40 +1,129 @@
-import psutil  
-import time   
-import json   
-from datetime import datetime  
+import psutil
+import os
+import threading
+import time
+import json
+from collections import deque
+from datetime import datetime
+
+# muestreo: un hilo de fondo toma las muestras y las mediciones no esperan
+# sincrono: cada captura mide CPU durante 0.1 s (comportamiento original)
+MONITOR_MODO = os.getenv("MONITOR_MODO", "muestreo")
+MONITOR_INTERVALO = float(os.getenv("MONITOR_INTERVALO", "0.1"))
+# Muestras que guarda el buffer circular (600 x 0.1 s = último minuto)
+MONITOR_MUESTRAS = int(os.getenv("MONITOR_MUESTRAS", "600"))
+
+class MuestreadorRecursos:
+    """
+    Hilo de fondo que mide CPU y RAM del proceso a intervalo fijo y guarda
+    las muestras (perf_counter, cpu_percent, ram_mb) en un buffer circular.
+    """
+
+    def __init__(self, intervalo=MONITOR_INTERVALO, max_muestras=MONITOR_MUESTRAS):
+        self.intervalo = intervalo
+        self.proceso = psutil.Process()
+        self.muestras = deque(maxlen=max_muestras)
+        self._lock = threading.Lock()
+        self._hilo = None
+
+    def iniciar(self):
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self.proceso.cpu_percent(interval=None)  # la primera lectura de psutil siempre es 0
+            self._muestrear()
+            self._hilo = threading.Thread(target=self._ejecutar, name="muestreador-recursos", daemon=True)
+            self._hilo.start()
+
+    def _muestrear(self):
+        muestra = (time.perf_counter(), self.proceso.cpu_percent(interval=None), self.proceso.memory_info().rss / (1024 * 1024))
+        self.muestras.append(muestra)
+
+    def _ejecutar(self):
+        while True:
+            time.sleep(self.intervalo)
+            self._muestrear()
+
+    def ultima(self):
+        return self.muestras[-1]
+
+    def ventana(self, desde, hasta):
+        """Muestras tomadas entre dos instantes de perf_counter"""
+        return [m for m in list(self.muestras) if desde <= m[0] <= hasta]
+
+_muestreador = None
+
+def obtener_muestreador():
+    global _muestreador
+    if _muestreador is None:
+        _muestreador = MuestreadorRecursos()
+    _muestreador.iniciar()
+    return _muestreador
 
 class MonitorRecursos:
 
-    def __init__(self):
+    def __init__(self, modo=None):
         # Obtiene referencia al proceso actual de Python
         self.proceso = psutil.Process()
+        self.modo = modo or MONITOR_MODO
         self.inicio = None
         self.metricas = []
-    
+
     def iniciar_monitoreo(self):
 
         self.inicio = time.time()
         self.metricas = []
+        if self.modo == "muestreo":
+            self.muestreador = obtener_muestreador()
+            self.inicio_perf = time.perf_counter()
+            self.inicio_cpu = self._tiempo_cpu()
         # Primera captura
         self.capturar_metrica()
-    
+
+    def _tiempo_cpu(self):
+        tiempos = self.proceso.cpu_times()
+        return tiempos.user + tiempos.system
+
     def capturar_metrica(self):
 
+        if self.modo == "muestreo":
+            self._marcar()
+            return
+
         tiempo_transcurrido = time.time() - self.inicio
         cpu_percent = self.proceso.cpu_percent(interval=0.1)
         ram_mb = self.proceso.memory_info().rss / (1024 * 1024)
-        
+
         self.metricas.append({
             'tiempo_transcurrido': tiempo_transcurrido,
             'cpu_percent': cpu_percent,
             'ram_mb': ram_mb,
             'timestamp': time.time()
         })
-    
+
+    def _marcar(self):
+        # Solo marcas de tiempo y CPU consumida; la RAM sale de la última muestra del buffer
+        ahora = time.perf_counter()
+        cpu = self._tiempo_cpu()
+        anterior_perf, anterior_cpu = (self.inicio_perf, self.inicio_cpu) if not self.metricas else \
+            (self.metricas[-1]['_perf'], self.metricas[-1]['_cpu'])
+        transcurrido = ahora - anterior_perf
+        _, cpu_muestra, ram_muestra = self.muestreador.ultima()
+        # cpu_times avanza en ticks de ~10 ms: en tramos más cortos que el intervalo se usa la muestra de fondo
+        cpu_percent = 100 * (cpu - anterior_cpu) / transcurrido if transcurrido >= self.muestreador.intervalo else cpu_muestra
+        self.metricas.append({
+            'tiempo_transcurrido': ahora - self.inicio_perf,
+            'cpu_percent': cpu_percent,
+            'ram_mb': ram_muestra,
+            'timestamp': time.time(),
+            '_perf': ahora,
+            '_cpu': cpu
+        })
+
     def finalizar_monitoreo(self):
 
         tiempo_total = time.time() - self.inicio
-        
+
         if not self.metricas:
             return {
                 'tiempo_total_seg': round(tiempo_total, 4),
@@ -44,11 +133,22 @@ class MonitorRecursos:
                 'num_muestras': 0,
                 'metricas_detalladas': []
             }
-        
+
         cpu_promedio = sum(m['cpu_percent'] for m in self.metricas) / len(self.metricas)
         ram_promedio = sum(m['ram_mb'] for m in self.metricas) / len(self.metricas)
         ram_max = max(m['ram_mb'] for m in self.metricas)
-        
+
+        if self.modo == "muestreo":
+            # CPU exacta del intervalo completo; RAM de las muestras de fondo dentro de la ventana
+            fin_perf = time.perf_counter()
+            duracion = fin_perf - self.inicio_perf
+            if duracion >= self.muestreador.intervalo:
+                cpu_promedio = 100 * (self._tiempo_cpu() - self.inicio_cpu) / duracion
+            ventana = self.muestreador.ventana(self.inicio_perf, fin_perf)
+            ram = [m[2] for m in ventana] + [m['ram_mb'] for m in self.metricas]
+            ram_promedio = sum(ram) / len(ram)
+            ram_max = max(ram)
+
         from datetime import datetime
         metricas_formateadas = [
             {
@@ -59,7 +159,7 @@ class MonitorRecursos:
             }
             for m in self.metricas
         ]
-        
+
         return {
             'tiempo_total_seg': round(tiempo_total, 4),
             'cpu_promedio_percent': round(cpu_promedio, 2),
@@ -0,0 +1,227 @@
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from calcular_energia import AgregadorEnergia, calcular_energia_por_consulta
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+# Tamaño máximo del archivo activo antes de rotarlo, y archivos rotados que se conservan
+METRICAS_MAX_BYTES = int(os.getenv("METRICAS_MAX_BYTES", str(5 * 1024 * 1024)))
+METRICAS_MAX_ARCHIVOS = int(os.getenv("METRICAS_MAX_ARCHIVOS", "30"))
+# Segundos entre escrituras del hilo de fondo
+METRICAS_INTERVALO = float(os.getenv("METRICAS_INTERVALO", "1.0"))
+
+class RegistroMetricas:
+    """
+    Registro de métricas por consulta en JSON Lines, escrito fuera del
+    camino de la solicitud.
+
+    - registrar() solo encola; un hilo de fondo escribe los registros por
+      lotes cada `intervalo` segundos.
+    - El archivo activo (`ruta`) se rota por tamaño o al cambiar de día a
+      `<nombre>_<fecha>.json`, conservando los últimos `max_archivos`.
+    - Al escribir cada lote se actualizan los agregados (conteo, sumas de
+      CPU/RAM/tiempo, energía y CO₂) en `<nombre>_resumen.json`, así que
+      estadisticas() no recorre el historial. Lote, rotación y agregados se
+      escriben bajo un bloqueo de archivo, de modo que varios workers pueden
+      compartir el mismo registro.
+    """
+
+    def __init__(self, ruta="data/metricas_recursos.json", max_bytes=METRICAS_MAX_BYTES,
+                 max_archivos=METRICAS_MAX_ARCHIVOS, intervalo=METRICAS_INTERVALO):
+        self.ruta = ruta
+        base, _ = os.path.splitext(ruta)
+        self.base = base
+        self.ruta_resumen = f"{base}_resumen.json"
+        self.ruta_bloqueo = f"{base}.lock"
+        self.max_bytes = max_bytes
+        self.max_archivos = max_archivos
+        self.intervalo = intervalo
+        self._cola = queue.Queue()
+        self._lock = threading.Lock()
+        self._hilo = None
+
+    # ---------- escritura ----------
+
+    def registrar(self, registro):
+        """Encola un registro; energía y CO₂ se calculan al escribirlo"""
+        self._iniciar()
+        self._cola.put(registro)
+
+    def vaciar(self, timeout=5):
+        """Espera a que se escriban los registros encolados hasta ahora"""
+        self._iniciar()
+        listo = threading.Event()
+        self._cola.put(listo)
+        listo.wait(timeout)
+
+    def _iniciar(self):
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._ejecutar, name="registro-metricas", daemon=True)
+                self._hilo.start()
+                atexit.register(self.vaciar, 1)
+
+    def _ejecutar(self):
+        while True:
+            # Se junta un lote durante `intervalo` segundos desde el primer registro, o hasta que alguien pida vaciar
+            lote = [self._cola.get()]
+            fin = time.monotonic() + self.intervalo
+            while not isinstance(lote[-1], threading.Event):
+                restante = fin - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(self._cola.get(timeout=restante))
+                except queue.Empty:
+                    break
+            esperando = []
+            registros = []
+            for elemento in lote:
+                if isinstance(elemento, threading.Event):
+                    esperando.append(elemento)
+                else:
+                    registros.append(elemento)
+            try:
+                if registros:
+                    self._escribir(registros)
+            except Exception as e:
+                print(f"❌ Error al escribir métricas: {e}")
+            for evento in esperando:
+                evento.set()
+
+    def _bloquear(self):
+        directorio = os.path.dirname(self.ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        archivo = open(self.ruta_bloqueo, "a")
+        if fcntl is not None:
+            fcntl.flock(archivo, fcntl.LOCK_EX)
+        return archivo
+
+    def _escribir(self, registros):
+        lote = AgregadorEnergia()
+        energia = lote.agregar_registros(registros)
+        lineas = [
+            json.dumps({**registro, "energia_wh": float(e), "co2_gramos": float(c)}, ensure_ascii=False)
+            for registro, e, c in zip(registros, energia["energia_wh"], energia["co2_gramos"])
+        ]
+
+        bloqueo = self._bloquear()
+        try:
+            agregados = self._leer_agregados()
+            hoy = datetime.now().strftime("%Y%m%d")
+            tamano = os.path.getsize(self.ruta) if os.path.exists(self.ruta) else 0
+            if tamano and agregados["dia_archivo_activo"] not in (None, hoy):
+                self._rotar()
+                tamano = 0
+            pendientes = []
+            for linea in lineas:
+                linea = (linea + "\n").encode("utf-8")
+                if tamano and tamano + len(linea) > self.max_bytes:
+                    self._agregar_lineas(pendientes)
+                    self._rotar()
+                    pendientes, tamano = [], 0
+                pendientes.append(linea)
+                tamano += len(linea)
+            self._agregar_lineas(pendientes)
+
+            for campo in AgregadorEnergia.CAMPOS:
+                agregados[campo] += getattr(lote, campo)
+            agregados["dia_archivo_activo"] = hoy
+            self._guardar_agregados(agregados)
+        finally:
+            bloqueo.close()
+
+    def _agregar_lineas(self, lineas):
+        if lineas:
+            with open(self.ruta, "ab") as f:
+                f.write(b"".join(lineas))
+
+    def _rotar(self):
+        os.replace(self.ruta, f"{self.base}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.json")
+        for antiguo in self._rotados()[:-self.max_archivos or None]:
+            os.remove(antiguo)
+
+    def _rotados(self):
+        return sorted(glob.glob(f"{glob.escape(self.base)}_[0-9]*.json"))
+
+    # ---------- agregados ----------
+
+    def _leer_agregados(self):
+        try:
+            with open(self.ruta_resumen, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            agregados = self._reconstruir_agregados()
+            self._guardar_agregados(agregados)
+            return agregados
+
+    def _reconstruir_agregados(self):
+        """Recorre una sola vez un historial escrito antes de que existiera el resumen"""
+        agregador = AgregadorEnergia()
+        for ruta in self._rotados() + [self.ruta]:
+            if os.path.exists(ruta):
+                agregador.consumir_archivo(ruta)
+        agregados = {**agregador.como_dict(), "dia_archivo_activo": None}
+        if os.path.exists(self.ruta):
+            agregados["dia_archivo_activo"] = datetime.fromtimestamp(os.path.getmtime(self.ruta)).strftime("%Y%m%d")
+        return agregados
+
+    def _guardar_agregados(self, agregados):
+        temporal = f"{self.ruta_resumen}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(agregados, f)
+        os.replace(temporal, self.ruta_resumen)
+
+    def estadisticas(self):
+        """Estadísticas globales de /obtener-metricas/ a partir de los agregados; {} si no hay registros"""
+        bloqueo = self._bloquear()
+        try:
+            agregados = self._leer_agregados()
+        finally:
+            bloqueo.close()
+        return AgregadorEnergia(**agregados).estadisticas()
+
+    # ---------- lectura ----------
+
+    def leer(self, desde=None, hasta=None, limite=100, offset=0):
+        """
+        Registros con timestamp en [desde, hasta] (ISO 8601), del más reciente
+        al más antiguo: se saltan `offset` y se devuelven hasta `limite`, en
+        orden cronológico. Devuelve (registros, hay_mas).
+        """
+        seleccionados = []
+        saltados = 0
+        for ruta in reversed(self._rotados() + [self.ruta]):
+            try:
+                with open(ruta, "r", encoding="utf-8") as f:
+                    lineas = f.readlines()
+            except FileNotFoundError:
+                continue
+            for linea in reversed(lineas):
+                if not linea.strip():
+                    continue
+                registro = json.loads(linea)
+                timestamp = registro.get("timestamp", "")
+                if hasta is not None and timestamp > hasta:
+                    continue
+                if desde is not None and timestamp < desde:
+                    return list(reversed(seleccionados)), False
+                if saltados < offset:
+                    saltados += 1
+                    continue
+                if len(seleccionados) == limite:
+                    return list(reversed(seleccionados)), True
+                if "energia_wh" not in registro:
+                    registro.update({k: v for k, v in calcular_energia_por_consulta(registro).items() if k in ("energia_wh", "co2_gramos")})
+                seleccionados.append(registro)
+        return list(reversed(seleccionados)), False
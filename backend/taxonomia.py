@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+
+# Archivo con las habilidades y las keywords de carreras (ver taxonomia.json)
+TAXONOMIA_RUTA = os.getenv("TAXONOMIA_RUTA", os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxonomia.json"))
+# Las habilidades de una oferta se empaquetan en un BigInteger con signo (ver bits_habilidades.py)
+MAX_HABILIDADES = 63
+
+def columnas_habilidades(hard_skills=None, soft_skills=None):
+    """Devuelve {columna: habilidad} con los nombres hard_*/soft_* usados en la BD (por defecto, de TAXONOMIA)"""
+    hard_skills = TAXONOMIA.hard_skills if hard_skills is None else hard_skills
+    soft_skills = TAXONOMIA.soft_skills if soft_skills is None else soft_skills
+    columnas = {}
+    for skill in hard_skills:
+        columnas[f"hard_{skill.replace('/', '_').replace(' ', '_')}"] = skill
+    for skill in soft_skills:
+        columnas[f"soft_{skill.replace(' ', '_')}"] = skill
+    return columnas
+
+class Taxonomia:
+    """
+    Habilidades técnicas y blandas, keywords del filtro de ingeniería y
+    keywords de cada carrera, leídas de un archivo de datos.
+
+    De aquí se derivan las columnas hard_*/soft_* del modelo Habilidad, el
+    orden de los bits de habilidades_bits y los patrones de la minería (ver
+    mineria.obtener_buscadores). El orden de las listas importa: las
+    carreras se evalúan en el orden del archivo y cada habilidad ocupa el
+    bit de su posición, así que las nuevas se agregan al final.
+
+    `version` es un hash del contenido: identifica con qué taxonomía se
+    minó un dataset y es la clave del registro de patrones compilados.
+    """
+
+    def __init__(self, datos):
+        self.hard_skills = list(datos["hard_skills"])
+        self.soft_skills = list(datos["soft_skills"])
+        self.keywords_ingenieria = list(datos["keywords_ingenieria"])
+        self.carrera_keywords = {carrera: list(d["keywords"]) for carrera, d in datos["carreras"].items()}
+        self.keywords_principales = {carrera: list(d["principales"]) for carrera, d in datos["carreras"].items()}
+
+        columnas = self.columnas()
+        if len(columnas) != len(self.hard_skills) + len(self.soft_skills):
+            raise ValueError("La taxonomía tiene habilidades repetidas (o que dan la misma columna)")
+        if len(columnas) > MAX_HABILIDADES:
+            raise ValueError(f"La taxonomía tiene {len(columnas)} habilidades; el máximo es {MAX_HABILIDADES}")
+
+        normalizado = json.dumps(datos, ensure_ascii=False, sort_keys=False, separators=(",", ":"))
+        self.version = hashlib.blake2b(normalizado.encode("utf-8"), digest_size=8).hexdigest()
+
+    def columnas(self):
+        return columnas_habilidades(self.hard_skills, self.soft_skills)
+
+def cargar_taxonomia(ruta=TAXONOMIA_RUTA):
+    with open(ruta, "r", encoding="utf-8") as f:
+        return Taxonomia(json.load(f))
+
+# Taxonomía del proceso: se lee una vez al importar (el esquema de la BD depende de ella)
+TAXONOMIA = cargar_taxonomia()
@@ -0,0 +1,34 @@
+# backend/tests/datos_prueba.py
+# Genera un CSV pequeño con el formato de exportación de Computrabajo (separado por ';')
+
+import random
+import pandas as pd
+
+TITULOS = ['Ingeniero de Sistemas', 'Analista', 'Ingeniero Civil', 'Vendedor', 'Ing. Minas',
+           'Data Engineer', 'Ingeniero Ambiental', 'Ingeniero', 'Asistente administrativo']
+DESCRIPCIONES = ['Experiencia en python y sql\ncon docker', 'obra civil y autocad', 'ventas al por mayor',
+                 'manejo de cultivos', 'procesos y logística', 'gestión de residuos', 'network engineer junior',
+                 'ingeniero para planos y estructuras', 'atención al cliente']
+REQUERIMIENTOS = ['Trabajo en equipo, liderazgo', 'Excel avanzado', '', 'big data lake',
+                  'Comunicación y proactividad', 'Power BI; Git y GitHub']
+SALARIOS = ['S/ 2.500,00 (Mensual)', 'S/ 1.200,00', '', None, 'S/ 5.000,00', 'S/ 3.800,50 (Mensual)']
+
+def escribir_csv_computrabajo(ruta, filas=300, semilla=0):
+    random.seed(semilla)
+    registros = [{
+        'Título': random.choice(TITULOS),
+        'Subtítulo': random.choice(['Lima', 'Arequipa', None]),
+        'Empresa': random.choice(['ACME', 'Minera Sur', None]),
+        'Calificación': 4.1,
+        'URL_Empresa': 'https://pe.computrabajo.com',
+        'Región': 'Lima',
+        'Salario': random.choice(SALARIOS),
+        'Descripción': random.choice(DESCRIPCIONES),
+        'Requerimientos': random.choice(REQUERIMIENTOS),
+        'Contrato': 'Indefinido',
+        'Jornada': 'Tiempo completo',
+        'Tipo_Asistencia': random.choice(['Presencial', 'Remoto', None]),
+        'Acerca_de_Empresa': '...',
+    } for _ in range(filas)]
+    pd.DataFrame(registros).to_csv(ruta, sep=';', index=False)
+    return ruta
@@ -0,0 +1,30 @@
+# backend/tests/test_benchmarks.py
+
+import pandas as pd
+from benchmarks.generador import generar_csv
+from benchmarks.ejecutar import comparar, medir_mineria
+
+def test_generador_reproducible_por_bloques(tmp_path):
+    a = generar_csv(tmp_path / "a.csv", 2500, semilla=3, filas_por_bloque=1000)
+    b = generar_csv(tmp_path / "b.csv", 2500, semilla=3, filas_por_bloque=1000)
+    assert a.read_bytes() == b.read_bytes()
+    df = pd.read_csv(a, sep=';')
+    assert len(df) == 2500
+    assert "Salario" in df.columns and "Requerimientos" in df.columns
+
+def test_mezcla_de_carreras(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    csv_path = generar_csv(tmp_path / "civil.csv", 400, mezcla_carreras={"Ingeniería Civil": 1.0})
+    medicion, resumen = medir_mineria(csv_path)
+    # Alguna oferta civil pide python/sql al azar y se clasifica como Sistemas
+    assert list(resumen["carreras"])[0] == "Ingeniería Civil"
+    assert resumen["carreras"]["Ingeniería Civil"] > 0.8 * resumen["finales"]
+    assert set(medicion["segundos"]) >= {"lectura", "hash", "salario", "habilidades", "carreras", "vistas_previas", "total"}
+
+def test_comparar_con_linea_base():
+    base = {"resultados": {"1000": {"mineria": {"segundos": {"total": 1.0, "hash": 0.001}, "filas": {"finales": 10}}}}}
+    actual = {"resultados": {"1000": {"mineria": {"segundos": {"total": 1.5, "hash": 0.004}, "filas": {"finales": 20}}}}}
+    # hash está bajo el umbral de ruido y las filas no son una medición
+    assert comparar(actual, base, 0.2) == [("1000.mineria.segundos.total", 1.0, 1.5, 1.5)]
+    assert comparar(actual, base, 0.6) == []
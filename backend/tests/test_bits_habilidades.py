@@ -0,0 +1,63 @@
+# backend/tests/test_bits_habilidades.py
+
+import pytest
+import numpy as np
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from mineria import procesar_datos_computrabajo
+from carga_datos import asegurar_esquema, reemplazar_habilidades
+from columnar import EscritorColumnar, MotorColumnar
+from consultas import condicion_carrera, contar_con_todas_sql
+from models.habilidad import Habilidad
+import bits_habilidades
+from tests.datos_prueba import escribir_csv_computrabajo
+
+COMBINACIONES = [["hard_python"], ["hard_python", "hard_sql"], ["hard_docker", "hard_python", "hard_sql"], ["soft_liderazgo", "soft_trabajo_en_equipo"]]
+CARRERAS = ["Ingeniería de Sistemas", "Ingeniería Civil", "Ingeniería", "Medicina"]
+
+@pytest.fixture(scope="module")
+def cargado(tmp_path_factory):
+    ruta = tmp_path_factory.mktemp("bits")
+    engine = create_engine(f"sqlite:///{ruta / 'bits.db'}")
+    Base.metadata.create_all(bind=engine)
+    df_final = procesar_datos_computrabajo(escribir_csv_computrabajo(ruta / "computrabajo.csv", filas=400))[0]
+    reemplazar_habilidades(df_final, engine, instantanea=EscritorColumnar(str(ruta / "instantaneas")))
+
+    sesion = sessionmaker(bind=engine)()
+    yield df_final, sesion, MotorColumnar(str(ruta / "instantaneas")), engine
+    sesion.close()
+    engine.dispose()
+
+def test_empaquetar_y_frecuencias(cargado):
+    df_final = cargado[0]
+    bits = bits_habilidades.empaquetar(df_final)
+    assert bits.dtype == np.uint64 and len(bits) == len(df_final)
+    esperado = df_final[bits_habilidades.COLUMNAS_BITS].astype(int).sum().to_numpy()
+    assert bits_habilidades.frecuencias(bits).tolist() == esperado.tolist()
+
+def test_mascara_desconocida():
+    with pytest.raises(ValueError):
+        bits_habilidades.mascara(["hard_python", "hard_cobol"])
+
+def con_pandas(db, carrera, habilidades):
+    filas = db.query(Habilidad).filter(condicion_carrera(db, carrera)).all()
+    return len(filas), sum(all(getattr(f, h) for h in habilidades) for f in filas)
+
+@pytest.mark.parametrize("carrera", CARRERAS)
+@pytest.mark.parametrize("habilidades", COMBINACIONES)
+def test_conteo_sql_y_columnar_igual_a_pandas(cargado, carrera, habilidades):
+    _, db, motor, _ = cargado
+    valor = bits_habilidades.mascara(habilidades)
+    esperado = con_pandas(db, carrera, habilidades)
+    assert contar_con_todas_sql(db, carrera, valor) == esperado
+    assert motor.contar_con_todas(carrera, valor) == esperado
+
+def test_asegurar_esquema_rellena_los_bits(cargado):
+    _, db, _, engine = cargado
+    with engine.begin() as conn:
+        originales = conn.execute(text("SELECT id, habilidades_bits FROM habilidades ORDER BY id")).all()
+        conn.execute(text("ALTER TABLE habilidades DROP COLUMN habilidades_bits"))
+    asegurar_esquema(engine)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT id, habilidades_bits FROM habilidades ORDER BY id")).all() == originales
@@ -0,0 +1,189 @@
+# backend/tests/test_cache.py
+
+import asyncio
+import sqlite3
+import threading
+import time
+import cache
+import pytest
+from cache import CacheEstadisticas, BackendSQLite
+
+def test_desaloja_la_entrada_menos_usada():
+    c = CacheEstadisticas(max_entradas=2)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1      # "a" pasa a ser la más reciente
+    c.set("c", 3)
+
+    assert c.get("b") is None
+    assert c.claves() == ["a", "c"]
+    assert c.estado()["desalojos"] == 1
+
+def test_expiracion(monkeypatch):
+    ahora = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: ahora[0])
+    c = CacheEstadisticas(ttl_segundos=10)
+    c.set("a", 1)
+    ahora[0] += 5
+    c.set("b", 2)
+    ahora[0] += 6
+
+    assert c.get("a") is None
+    assert c.get("b") == 2
+    assert c.estado()["expirados"] == 1
+
+def test_single_flight():
+    c = CacheEstadisticas()
+    llamadas = []
+
+    def calcular():
+        llamadas.append(1)
+        time.sleep(0.2)
+        return {"total": 42}
+
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(c.obtener_o_calcular("k", calcular))) for _ in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    assert len(llamadas) == 1
+    assert all(valor == {"total": 42} for valor, _ in resultados)
+    assert c.obtener_o_calcular("k", calcular) == ({"total": 42}, True)
+    assert c.estado()["compartidos"] == 7
+
+@pytest.mark.asyncio
+async def test_single_flight_async():
+    c = CacheEstadisticas()
+    llamadas = []
+
+    async def calcular():
+        llamadas.append(1)
+        await asyncio.sleep(0.1)
+        return {"total": 7}
+
+    resultados = await asyncio.gather(*(c.obtener_o_calcular_async("k", calcular) for _ in range(5)))
+
+    assert len(llamadas) == 1
+    assert resultados == [({"total": 7}, False)] + [({"total": 7}, True)] * 4
+    assert await c.obtener_o_calcular_async("k", calcular) == ({"total": 7}, True)
+    assert c.estado()["compartidos"] == 4
+
+@pytest.mark.asyncio
+async def test_espera_async_de_un_calculo_en_otro_hilo():
+    c = CacheEstadisticas()
+    empezo = threading.Event()
+
+    def calcular():
+        empezo.set()
+        time.sleep(0.1)
+        return {"total": 3}
+
+    hilo = threading.Thread(target=c.obtener_o_calcular, args=("k", calcular))
+    hilo.start()
+    await asyncio.to_thread(empezo.wait)
+
+    async def no_deberia_calcular():
+        raise AssertionError("el cálculo ya estaba en curso")
+
+    assert await c.obtener_o_calcular_async("k", no_deberia_calcular) == ({"total": 3}, True)
+    hilo.join()
+
+def test_none_no_se_guarda():
+    c = CacheEstadisticas()
+    assert c.obtener_o_calcular("k", lambda: None) == (None, False)
+    assert c.estado()["entradas_activas"] == 0
+
+def test_invalidar_descarta_calculos_en_curso():
+    c = CacheEstadisticas()
+
+    def calcular():
+        c.invalidar()  # llega un dataset nuevo mientras se calcula
+        return {"viejo": True}
+
+    assert c.obtener_o_calcular("k", calcular) == ({"viejo": True}, False)
+    assert c.get("k") is None
+
+def test_backend_sqlite_compartido_entre_instancias(tmp_path):
+    ruta = str(tmp_path / "cache.sqlite3")
+    worker_a = CacheEstadisticas(backend=BackendSQLite(ruta, max_entradas=2))
+    worker_b = CacheEstadisticas(backend=BackendSQLite(ruta, max_entradas=2))
+
+    valor = {"carrera": "Ingeniería de Sistemas", "habilidades": [{"nombre": "Python", "frecuencia": 3}]}
+    assert worker_a.obtener_o_calcular("k", lambda: valor) == (valor, False)
+    assert worker_b.obtener_o_calcular("k", lambda: None) == (valor, True)
+
+    worker_b.set("b", 2)
+    worker_b.set("c", 3)
+    assert worker_a.get("k") is None        # desalojada por LRU en el archivo compartido
+    assert sorted(worker_a.claves()) == ["b", "c"]
+
+    worker_a.invalidar()                    # un worker publica un dataset nuevo
+    assert worker_b.get("b") is None
+    assert worker_b.backend.version() == 1
+
+def test_backend_sqlite_acierto_sin_escribir(tmp_path):
+    ruta = str(tmp_path / "cache.sqlite3")
+    backend = BackendSQLite(ruta, intervalo_usos=3600)
+    backend.set("a", 1)
+    usado_inicial = backend._conexion().execute("SELECT usado FROM cache WHERE clave = 'a'").fetchone()[0]
+    time.sleep(0.01)
+
+    assert backend.get("a") == 1
+    otra = sqlite3.connect(ruta)
+    assert otra.execute("SELECT usado FROM cache WHERE clave = 'a'").fetchone()[0] == usado_inicial
+
+    backend.set("b", 2)  # set vuelca las marcas de uso pendientes
+    assert otra.execute("SELECT usado FROM cache WHERE clave = 'a'").fetchone()[0] > usado_inicial
+    otra.close()
+
+def test_backend_sqlite_bloqueado_cuenta_como_fallo(tmp_path, monkeypatch):
+    c = CacheEstadisticas(backend=BackendSQLite(str(tmp_path / "cache.sqlite3")))
+    c.set("a", 1)
+
+    def bloqueado():
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(c.backend, "_conexion", bloqueado)
+    assert c.get("a") is None
+    c.set("b", 2)
+    assert c.fallos == 1
+
+@pytest.mark.asyncio
+async def test_backend_sqlite_fuera_del_event_loop(tmp_path, monkeypatch):
+    c = CacheEstadisticas(backend=BackendSQLite(str(tmp_path / "cache.sqlite3")))
+    hilos = []
+
+    def registrar_hilo(original):
+        def envoltura(*args):
+            hilos.append(threading.current_thread())
+            return original(*args)
+        return envoltura
+
+    monkeypatch.setattr(c.backend, "get", registrar_hilo(c.backend.get))
+    monkeypatch.setattr(c.backend, "set", registrar_hilo(c.backend.set))
+
+    async def calcular():
+        return {"total": 1}
+
+    assert await c.obtener_o_calcular_async("k", calcular) == ({"total": 1}, False)
+    assert await c.obtener_o_calcular_async("k", calcular) == ({"total": 1}, True)
+    assert len(hilos) == 3 and threading.main_thread() not in hilos
+
+@pytest.mark.asyncio
+async def test_estado_lista_carreras_de_todas_las_claves():
+    from httpx import AsyncClient, ASGITransport
+    import main
+
+    main.cache_estadisticas.invalidar()
+    for clave in ("habilidades:ingenieria civil", "salarios:ingenieria civil",
+                  "combinadas:ingenieria de sistemas:hard_python,hard_sql", "coocurrencia:ingenieria de minas:10"):
+        main.cache_estadisticas.set(clave, {"total": 1})
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+        data = (await ac.get("/cache/estado")).json()
+    main.cache_estadisticas.invalidar()
+
+    assert sorted(data["carreras_cacheadas"]) == ["ingenieria civil", "ingenieria de minas", "ingenieria de sistemas"]
+    assert data["carreras_por_endpoint"]["combinadas"] == ["ingenieria de sistemas"]
+    assert data["carreras_por_endpoint"]["coocurrencia"] == ["ingenieria de minas"]
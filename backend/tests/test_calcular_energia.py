@@ -0,0 +1,41 @@
+# backend/tests/test_calcular_energia.py
+
+import json
+import numpy as np
+from calcular_energia import AgregadorEnergia, calcular_energia_lote, calcular_energia_por_consulta
+
+def generar_metricas(n, semilla=7):
+    rng = np.random.default_rng(semilla)
+    return [
+        {"cpu_promedio_percent": float(c), "ram_promedio_mb": float(r), "tiempo_total_seg": float(t)}
+        for c, r, t in zip(rng.uniform(0, 400, n), rng.uniform(50, 4000, n), rng.exponential(0.5, n))
+    ]
+
+def test_lote_igual_a_consulta_por_consulta():
+    metricas = generar_metricas(5000)
+    esperado = [calcular_energia_por_consulta(m) for m in metricas]
+
+    obtenido = calcular_energia_lote(
+        [m["cpu_promedio_percent"] for m in metricas],
+        [m["ram_promedio_mb"] for m in metricas],
+        [m["tiempo_total_seg"] for m in metricas],
+    )
+
+    for campo, decimales in (("energia_wh", 6), ("potencia_promedio_w", 2), ("co2_gramos", 4)):
+        np.testing.assert_allclose(obtenido[campo], [e[campo] for e in esperado], rtol=0, atol=10 ** -decimales)
+
+def test_agregador_en_streaming(tmp_path):
+    metricas = generar_metricas(3000)
+    ruta = tmp_path / "metricas_recursos.json"
+    with open(ruta, "w") as f:
+        for m in metricas:
+            f.write(json.dumps({"carrera": "X", **m}) + "\n")
+
+    agregador = AgregadorEnergia().consumir_archivo(ruta, bytes_por_bloque=4096)
+    energias = [calcular_energia_por_consulta(m) for m in metricas]
+
+    assert agregador.total_consultas == 3000
+    assert abs(agregador.energia_total_wh - sum(e["energia_wh"] for e in energias)) < 1e-6 * 3000
+    assert abs(agregador.co2_total_gramos - sum(e["co2_gramos"] for e in energias)) < 1e-4 * 3000
+    assert agregador.estadisticas()["cpu_promedio"] == round(sum(m["cpu_promedio_percent"] for m in metricas) / 3000, 2)
+    assert AgregadorEnergia().estadisticas() == {}
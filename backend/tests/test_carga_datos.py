@@ -0,0 +1,53 @@
+# backend/tests/test_carga_datos.py
+
+import pytest
+import pandas as pd
+from sqlalchemy import create_engine, inspect, text
+from database import Base
+from carga_datos import CargadorHabilidades, reemplazar_habilidades
+
+def dataset(carrera, filas):
+    return pd.DataFrame({
+        "career": [carrera] * filas,
+        "title": [f"ingeniero {i}" for i in range(filas)],
+        "company": ["ACME"] * filas,
+        "workday": ["Tiempo completo"] * filas,
+        "modality": ["Remoto"] * filas,
+        "salary": ["2.500,00"] * filas,
+        "hard_python": [i % 2 == 0 for i in range(filas)],
+        "soft_liderazgo": [True] * filas,
+    })
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'carga.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+def contar(engine, sql):
+    with engine.connect() as conn:
+        return conn.execute(text(sql)).scalar()
+
+def tablas_habilidades(engine):
+    return [t for t in inspect(engine).get_table_names() if t.startswith("habilidades")]
+
+def test_reemplazo_atomico(engine):
+    assert reemplazar_habilidades(dataset("Ingeniería Civil", 25), engine) == 25
+    assert reemplazar_habilidades(dataset("Ingeniería de Sistemas", 7), engine) == 7
+
+    assert contar(engine, "SELECT COUNT(*) FROM habilidades") == 7
+    assert contar(engine, "SELECT SUM(hard_python) FROM habilidades") == 4
+    assert contar(engine, "SELECT COUNT(DISTINCT career) FROM habilidades") == 1
+    assert tablas_habilidades(engine) == ["habilidades"]
+
+def test_error_durante_la_carga_conserva_el_dataset_anterior(engine):
+    reemplazar_habilidades(dataset("Ingeniería Civil", 10), engine)
+
+    with pytest.raises(RuntimeError):
+        with CargadorHabilidades(engine, tamano_lote=3) as cargador:
+            cargador.agregar(dataset("Ingeniería de Minas", 5))
+            raise RuntimeError("fallo a mitad de la carga")
+
+    assert contar(engine, "SELECT COUNT(*) FROM habilidades WHERE career = 'Ingeniería Civil'") == 10
+    assert tablas_habilidades(engine) == ["habilidades"]
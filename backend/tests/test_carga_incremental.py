@@ -0,0 +1,140 @@
+# backend/tests/test_carga_incremental.py
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+import carga_datos
+from database import Base
+from mineria import procesar_datos_computrabajo_por_bloques
+from carga_datos import CargadorHabilidades, CargadorIncremental
+from columnar import EscritorColumnar, MotorColumnar
+from consultas import existe_carrera, frecuencias_sql, salarios_por_puesto
+from tests.datos_prueba import escribir_csv_computrabajo
+
+CARRERAS = ["Ingeniería de Sistemas", "Ingeniería Civil", "Ingeniería", "Medicina"]
+COLUMNAS = ["hash_contenido", "career", "title", "salario_numerico", "habilidades_bits", "hard_python", "soft_liderazgo"]
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'incremental.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+def exportacion(tmp_path, nombre, df):
+    ruta = tmp_path / nombre
+    df.to_csv(ruta, sep=';', index=False)
+    return ruta
+
+def exportaciones(tmp_path):
+    """Día 1 y día 2: el día 2 conserva 250 ofertas del día 1, pierde 50 y trae 80 nuevas"""
+    dia1 = pd.read_csv(escribir_csv_computrabajo(tmp_path / "base.csv", filas=300), sep=';')
+    dia1["Descripción"] = dia1["Descripción"] + [f" (oferta {i})" for i in range(len(dia1))]
+    nuevas = pd.read_csv(escribir_csv_computrabajo(tmp_path / "nuevas.csv", filas=80, semilla=9), sep=';')
+    nuevas["Descripción"] = nuevas["Descripción"] + [f" (nueva {i})" for i in range(len(nuevas))]
+    dia2 = pd.concat([dia1.iloc[50:], nuevas], ignore_index=True)
+    return exportacion(tmp_path, "dia1.csv", dia1), exportacion(tmp_path, "dia2.csv", dia2)
+
+def cargar(engine, csv_path, cargador):
+    with cargador:
+        resumen, *_ = procesar_datos_computrabajo_por_bloques(
+            csv_path, tamano_bloque=64, al_procesar_bloque=cargador.agregar, seguimiento=cargador
+        )
+        cargador.publicar()
+    return resumen
+
+def contenido(engine):
+    with engine.connect() as conn:
+        habilidades = pd.read_sql(text(f"SELECT {', '.join(COLUMNAS)} FROM habilidades"), conn)
+        resumen = pd.read_sql(text("SELECT career, total_ofertas, habilidades FROM resumen_carreras"), conn)
+        descartadas = pd.read_sql(text("SELECT hash_contenido FROM ofertas_descartadas"), conn)
+    return (
+        habilidades.sort_values(COLUMNAS).reset_index(drop=True),
+        resumen.sort_values("career").reset_index(drop=True),
+        sorted(descartadas["hash_contenido"])
+    )
+
+def test_incremental_igual_a_carga_completa(tmp_path, engine):
+    dia1, dia2 = exportaciones(tmp_path)
+    completo = create_engine(f"sqlite:///{tmp_path / 'completo.db'}")
+    Base.metadata.create_all(bind=completo)
+    cargar(completo, dia2, CargadorHabilidades(completo))
+
+    cargar(engine, dia1, CargadorHabilidades(engine))
+    cargador = CargadorIncremental(engine, retirar=True)
+    resumen = cargar(engine, dia2, cargador)
+
+    # Solo se minaron las 80 nuevas; las 250 que ya estaban (aceptadas o descartadas) no
+    assert resumen["sin_cambios"] == cargador.sin_cambios == 250
+    assert resumen["originales"] == 330
+    assert cargador.filas == resumen["finales"] > 0
+    assert cargador.retirados > 0
+
+    esperado = contenido(completo)
+    obtenido = contenido(engine)
+    pd.testing.assert_frame_equal(obtenido[0], esperado[0])
+    pd.testing.assert_frame_equal(obtenido[1], esperado[1])
+    assert obtenido[2] == esperado[2]
+    completo.dispose()
+
+def test_sin_retirar_conserva_las_ausentes(tmp_path, engine):
+    dia1, dia2 = exportaciones(tmp_path)
+    cargar(engine, dia1, CargadorHabilidades(engine))
+    antes = len(contenido(engine)[0])
+
+    cargador = CargadorIncremental(engine)
+    cargar(engine, dia2, cargador)
+    assert cargador.retirados == 0
+    assert len(contenido(engine)[0]) == antes + cargador.filas
+
+def test_archivo_repetido_no_cambia_nada(tmp_path, engine):
+    dia1, _ = exportaciones(tmp_path)
+    cargar(engine, dia1, CargadorHabilidades(engine))
+    antes = contenido(engine)
+
+    cargador = CargadorIncremental(engine, retirar=True)
+    resumen = cargar(engine, dia1, cargador)
+    assert (cargador.filas, cargador.retirados, resumen["sin_cambios"]) == (0, 0, 300)
+    despues = contenido(engine)
+    pd.testing.assert_frame_equal(despues[0], antes[0])
+    pd.testing.assert_frame_equal(despues[1], antes[1])
+    assert despues[2] == antes[2]
+
+def test_instantanea_incremental_sin_releer_la_tabla(tmp_path, engine, monkeypatch):
+    dia1, dia2 = exportaciones(tmp_path)
+    directorio = str(tmp_path / "instantaneas")
+    cargar(engine, dia1, CargadorHabilidades(engine, instantanea=EscritorColumnar(directorio)))
+    filas_dia1 = MotorColumnar(directorio).instantanea().filas
+
+    def sin_releer(*args, **kwargs):
+        raise AssertionError("la instantánea no debe reconstruirse desde la tabla")
+
+    monkeypatch.setattr(carga_datos.pd, "read_sql", sin_releer)
+    cargador = CargadorIncremental(engine, instantanea=EscritorColumnar(directorio), retirar=True)
+    cargar(engine, dia2, cargador)
+    monkeypatch.undo()
+
+    instantanea = MotorColumnar(directorio).instantanea()
+    assert instantanea.filas == filas_dia1 + cargador.filas
+    assert int((~instantanea.vigentes).sum()) == cargador.retirados > 0
+    with sessionmaker(bind=engine)() as db:
+        for carrera in CARRERAS:
+            assert instantanea.frecuencias(carrera) == frecuencias_sql(db, carrera)
+            assert instantanea.salarios_por_puesto(carrera) == salarios_por_puesto(db, carrera)
+            assert instantanea.existe_carrera(carrera) == existe_carrera(db, carrera)
+
+def test_instantanea_desactualizada_se_reconstruye(tmp_path, engine):
+    dia1, dia2 = exportaciones(tmp_path)
+    directorio = str(tmp_path / "instantaneas")
+    cargar(engine, dia1, CargadorHabilidades(engine))  # sin instantánea: no refleja la tabla
+    cargar(engine, dia2, CargadorHabilidades(engine, instantanea=EscritorColumnar(directorio)))
+    cargar(engine, dia1, CargadorHabilidades(engine))
+
+    cargador = CargadorIncremental(engine, instantanea=EscritorColumnar(directorio), retirar=True)
+    cargar(engine, dia2, cargador)
+    instantanea = MotorColumnar(directorio).instantanea()
+    assert instantanea.vigentes is None
+    with sessionmaker(bind=engine)() as db:
+        for carrera in CARRERAS:
+            assert instantanea.frecuencias(carrera) == frecuencias_sql(db, carrera)
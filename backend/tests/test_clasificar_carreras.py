@@ -0,0 +1,65 @@
+# backend/tests/test_clasificar_carreras.py
+
+import os, sys, random
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from mineria import CARRERA_KEYWORDS, KEYWORDS_PRINCIPALES, clasificar_carreras, detectar_carrera_optimizada
+
+def generar_campos(n, semilla=11):
+    random.seed(semilla)
+    palabras_carrera = sorted({kw for kws in CARRERA_KEYWORDS.values() for kw in kws})
+    principales = sorted({kw for kws in KEYWORDS_PRINCIPALES.values() for kw in kws})
+    # Palabras sueltas que forman keywords al unir campos, variantes de mayúsculas y texto sin relación
+    relleno = ['ingeniero', 'Ingeniero', 'ING.', 'ing', 'ingeniería', 'de', 'gestión', 'calidad', 'unidad', 'impacto',
+               'medio', 'ambiente', 'ciencia', 'datos', 'agroindustria', 'impactos', 'obras', 'minas', 'ventas', 'Lima',
+               'ſistemas', 'Civil', 'CULTIVOS', 'network', 'engineer', 'producción.', '(autocad)', 'javascript', 'nan']
+    vocabulario = palabras_carrera * 2 + principales + relleno * 6
+
+    def campo():
+        r = random.random()
+        if r < 0.08:
+            return None
+        if r < 0.12:
+            return float('nan')
+        return ' '.join(random.choice(vocabulario) for _ in range(random.randint(0, 6)))
+
+    return [[campo() for _ in range(n)] for _ in range(4)]
+
+def test_paridad_con_clasificacion_fila_a_fila():
+    titulos, subtitulos, descripciones, requerimientos = generar_campos(6000)
+    esperado = [detectar_carrera_optimizada(*fila) for fila in zip(titulos, subtitulos, descripciones, requerimientos)]
+
+    obtenido = clasificar_carreras(
+        pd.Series(titulos, dtype=object), pd.Series(subtitulos, dtype=object),
+        pd.Series(descripciones, dtype=object), pd.Series(requerimientos, dtype=object)
+    )
+
+    assert obtenido.tolist() == esperado
+    # El corpus recorre todas las ramas: cada carrera y el caso sin clasificar
+    assert set(esperado) == set(CARRERA_KEYWORDS) | {'No clasificado'}
+
+def test_prioridades():
+    casos = [
+        ('analista', 'lima', 'manejo de python', ''),                      # paso 1: keyword principal
+        ('ingeniería civil', 'lima', 'ingeniería de minas', 'unidad minera'),  # paso 1 gana por orden de carrera
+        ('', '', 'gestión de calidad', 'procesos'),                        # paso 2: puntaje 2
+        ('', '', 'impacto ambiental', ''),                                 # paso 1: 'ambiental'
+        ('', '', 'planos', 'informática'),                                 # paso 3: primera carrera con puntaje 1
+        ('ingeniero network', 'engineer', '', ''),                         # paso 4: patrón que cruza campos
+        ('network', 'engineer', '', ''),                                   # sin 'ingeniero' no aplica el paso 4
+        ('ingeniero de', '', '', ''),                                      # no clasificado
+    ]
+    esperado = [detectar_carrera_optimizada(*c) for c in casos]
+    obtenido = clasificar_carreras(*[pd.Series(col, dtype=object) for col in zip(*casos)])
+    assert obtenido.tolist() == esperado
+    assert esperado[-3:] == ['Ingeniería de Sistemas', 'No clasificado', 'No clasificado']
+
+def test_indice_y_vacio():
+    vacio = clasificar_carreras(*[pd.Series([], dtype=object)] * 4)
+    assert vacio.empty
+
+    indice = [10, 3, 7]
+    obtenido = clasificar_carreras(*[pd.Series(['sql', 'obra', 'nada'], index=indice)] * 4)
+    assert obtenido.index.tolist() == indice
+    assert obtenido.tolist() == ['Ingeniería de Sistemas', 'Ingeniería Civil', 'No clasificado']
@@ -0,0 +1,87 @@
+# backend/tests/test_columnar.py
+
+import os
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from mineria import procesar_datos_computrabajo
+from carga_datos import CargadorHabilidades, reemplazar_habilidades
+import bits_habilidades
+from columnar import EscritorColumnar, MotorColumnar
+from consultas import frecuencias_sql, salarios_por_puesto, existe_carrera
+from tests.datos_prueba import escribir_csv_computrabajo
+
+CARRERAS = ["Ingeniería de Sistemas", "Ingeniería Civil", "ingenieria de minas", "Civil", "Ingeniería", "Medicina"]
+
+@pytest.fixture(scope="module")
+def cargado(tmp_path_factory):
+    ruta = tmp_path_factory.mktemp("columnar")
+    engine = create_engine(f"sqlite:///{ruta / 'columnar.db'}")
+    Base.metadata.create_all(bind=engine)
+    df_final = procesar_datos_computrabajo(escribir_csv_computrabajo(ruta / "computrabajo.csv", filas=400))[0]
+
+    directorio = str(ruta / "instantaneas")
+    # Se carga por bloques, como el modo streaming
+    with CargadorHabilidades(engine, instantanea=EscritorColumnar(directorio)) as cargador:
+        for inicio in range(0, len(df_final), 70):
+            cargador.agregar(df_final.iloc[inicio:inicio + 70])
+        cargador.publicar()
+
+    sesion = sessionmaker(bind=engine)()
+    yield sesion, MotorColumnar(directorio), engine, directorio
+    sesion.close()
+    engine.dispose()
+
+@pytest.mark.parametrize("carrera", CARRERAS)
+def test_frecuencias_igual_a_sql(cargado, carrera):
+    db, motor, *_ = cargado
+    assert motor.frecuencias(carrera) == frecuencias_sql(db, carrera)
+
+@pytest.mark.parametrize("carrera", CARRERAS)
+def test_salarios_igual_a_sql(cargado, carrera):
+    db, motor, *_ = cargado
+    assert motor.salarios_por_puesto(carrera) == salarios_por_puesto(db, carrera)
+    assert motor.existe_carrera(carrera) == existe_carrera(db, carrera)
+
+def test_sin_instantanea_devuelve_none(tmp_path):
+    motor = MotorColumnar(str(tmp_path))
+    assert motor.frecuencias("Ingeniería Civil") is None
+    assert motor.salarios_por_puesto("Ingeniería Civil") is None
+
+def test_nueva_carga_cambia_de_version(cargado, tmp_path):
+    db, motor, engine, directorio = cargado
+    version = motor.instantanea().version
+    df_final = procesar_datos_computrabajo(escribir_csv_computrabajo(tmp_path / "otro.csv", filas=50, semilla=5))[0]
+    reemplazar_habilidades(df_final, engine, instantanea=EscritorColumnar(directorio))
+
+    assert motor.instantanea().version != version
+    assert motor.frecuencias("Ingeniería Civil") == frecuencias_sql(db, "Ingeniería Civil")
+    assert not [n for n in os.listdir(directorio) if n.endswith(".tmp")]
+
+def test_instantanea_de_otra_taxonomia_se_ignora(cargado, monkeypatch):
+    db, _, _, directorio = cargado
+    monkeypatch.setattr(bits_habilidades, "COLUMNAS_BITS", bits_habilidades.COLUMNAS_BITS + ["hard_rust"])
+    motor = MotorColumnar(directorio)
+
+    assert motor.instantanea() is None
+    assert motor.frecuencias("Ingeniería Civil") is None
+    assert motor.contar_con_todas("Ingeniería Civil", 1) is None
+
+@pytest.mark.filterwarnings("error::RuntimeWarning")
+def test_reconstruir_con_habilidades_nulas(cargado, tmp_path):
+    db, _, engine, _ = cargado
+    with engine.connect() as conn:
+        tabla = pd.read_sql(text("SELECT * FROM habilidades"), conn)
+    # Filas de antes de que asegurar_esquema agregara la columna (ADD COLUMN sin valor por defecto)
+    tabla["hard_python"] = float("nan")
+    tabla["soft_liderazgo"] = float("nan")
+
+    escritor = EscritorColumnar(str(tmp_path / "instantaneas"))
+    escritor.agregar(tabla)
+    escritor.publicar()
+    columnas, matriz = MotorColumnar(str(tmp_path / "instantaneas")).matriz_carrera("Ingeniería de Sistemas")
+    assert len(matriz) > 0
+    assert not matriz[:, columnas.index("hard_python")].any()
+    assert not matriz[:, columnas.index("soft_liderazgo")].any()
@@ -0,0 +1,91 @@
+# backend/tests/test_consultas.py
+
+import pytest
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from mineria import procesar_datos_computrabajo
+from carga_datos import reemplazar_habilidades
+from models.habilidad import Habilidad
+from consultas import (
+    frecuencias_desde_resumen, frecuencias_sql, condicion_carrera, clave_carrera, carreras_canonicas, salarios_por_puesto
+)
+from tests.datos_prueba import escribir_csv_computrabajo
+
+CARRERAS = ["Ingeniería de Sistemas", "Ingeniería Civil", "ingenieria de minas", "Civil", "Ingeniería", "Medicina"]
+
+def frecuencias_con_pandas(db, carrera):
+    """Ruta original: carga las ofertas completas y suma las columnas en pandas"""
+    registros = db.query(Habilidad).filter(condicion_carrera(db, carrera)).all()
+    if not registros:
+        return 0, {}
+    df = pd.DataFrame([r.__dict__ for r in registros])
+    df.drop(columns=["_sa_instance_state", "id"], inplace=True)
+    columnas = [col for col in df.columns if col.startswith("hard_") or col.startswith("soft_")]
+    return len(df), {col: int(valor) for col, valor in df[columnas].sum().items()}
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    ruta = tmp_path_factory.mktemp("consultas")
+    engine = create_engine(f"sqlite:///{ruta / 'consultas.db'}")
+    Base.metadata.create_all(bind=engine)
+    df_final = procesar_datos_computrabajo(escribir_csv_computrabajo(ruta / "computrabajo.csv", filas=400))[0]
+    reemplazar_habilidades(df_final, engine)
+
+    sesion = sessionmaker(bind=engine)()
+    yield sesion
+    sesion.close()
+    engine.dispose()
+
+@pytest.mark.parametrize("carrera", CARRERAS)
+def test_resumen_por_carrera_igual_a_pandas(db, carrera):
+    assert frecuencias_desde_resumen(db, carrera) == frecuencias_con_pandas(db, carrera)
+
+@pytest.mark.parametrize("carrera", CARRERAS)
+def test_agregacion_sql_igual_a_pandas(db, carrera):
+    assert frecuencias_sql(db, carrera) == frecuencias_con_pandas(db, carrera)
+
+def test_clave_carrera():
+    assert clave_carrera("  Ingeniería   Agrónoma ") == "ingenieria agronoma"
+    assert clave_carrera("INGENIERÍA DE SISTEMAS") == clave_carrera("ingenieria de sistemas")
+
+def test_condicion_carrera_exacta_y_por_subcadena(db):
+    exacta = condicion_carrera(db, "Ingeniería Civil")
+    assert exacta.right.value == "ingenieria civil" and exacta.operator.__name__ == "eq"
+
+    # Sin coincidencia exacta se busca por subcadena sobre la clave, sin importar tildes
+    todas = db.query(Habilidad).filter(condicion_carrera(db, "ingenieria")).count()
+    assert todas == db.query(Habilidad).count()
+
+def test_carreras_canonicas(db):
+    carreras = carreras_canonicas(db)
+    assert [c["clave"] for c in carreras] == [clave_carrera(c["carrera"]) for c in carreras]
+    assert sum(c["total_ofertas"] for c in carreras) == db.query(Habilidad).count()
+
+def salarios_con_pandas(db, carrera):
+    """Ruta original de /estadisticas/salarios"""
+    registros = db.query(Habilidad).filter(condicion_carrera(db, carrera)).all()
+    if not registros:
+        return []
+    df = pd.DataFrame([r.__dict__ for r in registros])
+    df = df[df["salary"].notnull() & (df["salary"] != "No especificado")].copy()
+
+    def limpiar_salario(s):
+        try:
+            s = str(s).strip().lower()
+            s = s.replace("s/", "").replace(".", "").replace(",", ".")
+            return float(s)
+        except ValueError:
+            return None
+
+    df["salario_numerico"] = df["salary"].apply(limpiar_salario)
+    df = df.dropna(subset=["salario_numerico"])
+    df = df[df["salario_numerico"] > 1500]
+    df = df.sort_values(by="salario_numerico", ascending=False).drop_duplicates(subset=["title"])
+    df = df.sort_values(by=["salario_numerico", "title"], ascending=True)
+    return [{"puesto": row["title"], "salario": row["salario_numerico"]} for _, row in df.iterrows()]
+
+@pytest.mark.parametrize("carrera", CARRERAS)
+def test_salarios_sql_igual_a_pandas(db, carrera):
+    assert salarios_por_puesto(db, carrera) == salarios_con_pandas(db, carrera)
@@ -0,0 +1,69 @@
+# backend/tests/test_coocurrencia.py
+
+import itertools
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from mineria import procesar_datos_computrabajo
+from carga_datos import reemplazar_habilidades
+from columnar import EscritorColumnar, MotorColumnar
+from consultas import matriz_habilidades_sql
+from coocurrencia import matriz_coocurrencia, matriz_lift, pares_principales
+from tests.datos_prueba import escribir_csv_computrabajo
+
+def matriz_aleatoria(filas=500, columnas=12, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return (rng.random((filas, columnas)) < rng.random(columnas)).astype(np.uint8)
+
+def test_coocurrencia_igual_a_recorrer_pares():
+    x = matriz_aleatoria()
+    c = matriz_coocurrencia(x)
+    for i, j in itertools.product(range(x.shape[1]), repeat=2):
+        assert c[i, j] == int(np.sum(x[:, i] & x[:, j]))
+
+def test_lift():
+    x = matriz_aleatoria()
+    c = matriz_coocurrencia(x)
+    lift = matriz_lift(c, len(x))
+    p = x.mean(axis=0)
+    assert lift[0, 1] == pytest.approx(np.mean(x[:, 0] & x[:, 1]) / (p[0] * p[1]))
+
+    x[:, 3] = 0
+    assert np.isnan(matriz_lift(matriz_coocurrencia(x), len(x))[3]).all()
+
+def test_pares_principales_igual_a_ordenar_todos():
+    x = matriz_aleatoria(columnas=20, semilla=4)
+    columnas = [f"hard_{i}" for i in range(20)]
+    c = matriz_coocurrencia(x)
+    lift = matriz_lift(c, len(x))
+    todos = sorted(
+        ((columnas[i], columnas[j], int(c[i, j]), float(lift[i, j])) for i, j in itertools.combinations(range(20), 2) if c[i, j]),
+        key=lambda par: (-par[2], -par[3], par[0], par[1])
+    )
+    for top in (1, 7, 50, 1000):
+        assert pares_principales(c, lift, columnas, top) == todos[:top]
+
+def test_pares_principales_con_empates():
+    # Todas las habilidades en todas las ofertas: mismo conteo y lift, decide el nombre
+    x = np.ones((10, 6), dtype=np.uint8)
+    columnas = ["soft_b", "hard_z", "soft_a", "hard_c", "hard_a", "soft_c"]
+    c = matriz_coocurrencia(x)
+    pares = pares_principales(c, matriz_lift(c, len(x)), columnas, 3)
+    assert [(a, b) for a, b, *_ in pares] == [("hard_a", "soft_c"), ("hard_c", "hard_a"), ("hard_c", "soft_c")]
+
+@pytest.mark.parametrize("carrera", ["Ingeniería de Sistemas", "Ingeniería", "Medicina"])
+def test_matriz_sql_igual_a_la_columnar(tmp_path, carrera):
+    engine = create_engine(f"sqlite:///{tmp_path / 'coocurrencia.db'}")
+    Base.metadata.create_all(bind=engine)
+    df_final = procesar_datos_computrabajo(escribir_csv_computrabajo(tmp_path / "computrabajo.csv", filas=300))[0]
+    reemplazar_habilidades(df_final, engine, instantanea=EscritorColumnar(str(tmp_path / "instantaneas")))
+
+    with sessionmaker(bind=engine)() as db:
+        columnas_sql, matriz_sql = matriz_habilidades_sql(db, carrera)
+    columnas, matriz = MotorColumnar(str(tmp_path / "instantaneas")).matriz_carrera(carrera)
+    engine.dispose()
+
+    assert columnas == columnas_sql
+    assert (matriz_coocurrencia(matriz) == matriz_coocurrencia(matriz_sql)).all()
@@ -0,0 +1,76 @@
+# backend/tests/test_database.py
+
+import threading
+import time
+import pytest
+from sqlalchemy import create_engine, text
+import database
+from database import PoolMedido, opciones_pool, url_async
+
+def test_opciones_pool():
+    assert opciones_pool("sqlite://") == {}
+    assert opciones_pool("sqlite:///:memory:") == {}
+    opciones = opciones_pool("postgresql+psycopg2://u:p@localhost/habilis")
+    assert opciones["poolclass"] is PoolMedido
+    assert opciones["pool_size"] == database.DB_POOL_TAMANO
+    assert opciones["pool_pre_ping"] == database.DB_POOL_PRE_PING
+
+def test_url_async():
+    assert url_async("postgresql+psycopg2://u:p@localhost/habilis").drivername == "postgresql+asyncpg"
+    assert url_async("postgresql://u:p@localhost/habilis").drivername == "postgresql+asyncpg"
+    assert url_async("sqlite:////tmp/habilis.db").drivername == "sqlite+aiosqlite"
+
+def test_pool_mide_la_espera_por_conexion(tmp_path, monkeypatch):
+    esperas = []
+    monkeypatch.setattr(database, "_al_esperar_conexion", [lambda segundos, tipo: esperas.append((segundos, tipo))])
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=PoolMedido, pool_size=1, max_overflow=0)
+    ocupada = threading.Event()
+
+    def ocupar():
+        with engine.connect():
+            ocupada.set()
+            time.sleep(0.2)
+
+    hilo = threading.Thread(target=ocupar)
+    hilo.start()
+    ocupada.wait()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    hilo.join()
+    engine.dispose()
+
+    assert [tipo for _, tipo in esperas] == ["sync", "sync"]
+    assert esperas[1][0] >= 0.1
+
+@pytest.mark.asyncio
+async def test_engine_async(tmp_path, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    esperas = []
+    monkeypatch.setattr(database, "_al_esperar_conexion", [lambda segundos, tipo: esperas.append(tipo)])
+    engine = database.crear_engine_async(url_async(f"sqlite:///{tmp_path / 'async.db'}"))
+    try:
+        assert isinstance(engine.pool, database.PoolAsyncMedido)
+        async with engine.connect() as conn:
+            assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+    finally:
+        await engine.dispose()
+    assert esperas == ["async"]
+
+@pytest.mark.asyncio
+async def test_endpoints_de_lectura_con_sesion_async(monkeypatch):
+    pytest.importorskip("aiosqlite")
+    from httpx import AsyncClient, ASGITransport
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    import main
+    esperas = []
+    monkeypatch.setattr(database, "_al_esperar_conexion", [lambda segundos, tipo: esperas.append(tipo)])
+    engine = database.crear_engine_async(url_async(database.DATABASE_URL))
+    monkeypatch.setattr(main, "AsyncSessionLocal", async_sessionmaker(engine, expire_on_commit=False))
+    try:
+        async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as ac:
+            respuesta = await ac.get("/carreras")
+    finally:
+        await engine.dispose()
+    assert respuesta.status_code == 200
+    assert isinstance(respuesta.json()["carreras"], list)
+    assert esperas and set(esperas) == {"async"}
@@ -0,0 +1,46 @@
+# backend/tests/test_detector_habilidades.py
+
+import os, sys, re, random
+import numpy as np
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from mineria import DETECTOR_HABILIDADES, DetectorHabilidades, columnas_habilidades
+
+def detectar_por_patron(textos, columnas):
+    """Implementación anterior: un \\bskill\\b por habilidad y por fila"""
+    patrones = {col: re.compile(rf'\b{re.escape(skill)}\b', re.IGNORECASE) for col, skill in columnas.items()}
+    filas = []
+    for texto in textos:
+        if not isinstance(texto, str):
+            filas.append([False] * len(patrones))
+            continue
+        texto_lower = texto.lower()
+        filas.append([bool(p.search(texto_lower)) for p in patrones.values()])
+    return np.array(filas, dtype=bool).reshape(len(textos), len(patrones))
+
+def generar_textos(n, semilla=42):
+    random.seed(semilla)
+    columnas = columnas_habilidades()
+    vocabulario = list(columnas.values()) + [
+        'experiencia', 'en', 'de', 'manejo', 'conocimiento', 'ingeniero', 'años', 'Lima',
+        'bigdata', 'nosqlx', '.net', 'c#', 'pl/sql', 'data', 'lake', 'big', 'PYTHON',
+        'Python,', '(sql)', 'ſql', 'gıt', 'r&d', 'power', 'bi', 'ci/cd/ct', 'javascript:',
+    ]
+    return [' '.join(random.choice(vocabulario) for _ in range(random.randint(0, 60))) for _ in range(n)]
+
+def test_paridad_con_deteccion_por_patron():
+    textos = generar_textos(3000) + [None, float('nan'), '', 'big data lake', 'github y git', 'r react']
+    columnas = columnas_habilidades()
+
+    esperado = detectar_por_patron(textos, columnas)
+    obtenido = DETECTOR_HABILIDADES.detectar(pd.Series(textos, dtype=object))
+
+    assert obtenido.dtype == bool
+    assert obtenido.shape == (len(textos), len(columnas))
+    assert DETECTOR_HABILIDADES.columnas == list(columnas.keys())
+    np.testing.assert_array_equal(obtenido, esperado)
+
+def test_habilidades_solapadas():
+    detector = DetectorHabilidades({'hard_big_data': 'big data', 'hard_data_lake': 'data lake', 'hard_data': 'data'})
+    matriz = detector.detectar(['big data lake', 'data', 'bigdata lake'])
+    assert matriz.tolist() == [[True, True, True], [False, False, True], [False, False, False]]
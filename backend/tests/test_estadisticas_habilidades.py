@@ -37,3 +37,66 @@ async def test_estadisticas_habilidades_valida():
         assert "frecuencia" in habilidad
         assert isinstance(habilidad["nombre"], str)
         assert isinstance(habilidad["frecuencia"], int)
+
+@pytest.mark.asyncio
+async def test_calculo_no_bloquea_el_event_loop(monkeypatch):
+    import asyncio, time
+    import monitor_recursos
+    # En modo sincrono cada captura del monitor espera 0.1 s: debe ocurrir fuera del event loop
+    monkeypatch.setattr(monitor_recursos, "MONITOR_MODO", "sincrono")
+    transport = ASGITransport(app=app)
+    terminadas = {}
+
+    async def pedir(nombre, url, params=None):
+        await ac.get(url, params=params)
+        terminadas[nombre] = time.perf_counter()
+
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        inicio = time.perf_counter()
+        calculo = asyncio.create_task(pedir("estadisticas", "/estadisticas/habilidades", {"carrera": "Carrera sin ofertas"}))
+        await asyncio.sleep(0.02)
+        await pedir("raiz", "/")
+        await calculo
+
+    assert terminadas["raiz"] < terminadas["estadisticas"]
+    assert terminadas["raiz"] - inicio < 0.15
+
+@pytest.mark.asyncio
+async def test_instantanea_columnar_no_abre_sesion(monkeypatch):
+    import main
+
+    class MotorFalso:
+        def frecuencias(self, carrera):
+            return 2, {"hard_python": 2, "soft_liderazgo": 1}
+
+    async def sin_sesion(consultar):
+        raise AssertionError("no debería consultar la BD")
+
+    monkeypatch.setattr(main, "motor_columnar", MotorFalso())
+    monkeypatch.setattr(main, "_en_sesion", sin_sesion)
+    monkeypatch.setattr(main.registro_metricas, "registrar", lambda registro: None)
+    main.cache_estadisticas.invalidar()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        data = (await ac.get("/estadisticas/habilidades", params={"carrera": "Ingeniería Columnar"})).json()
+    main.cache_estadisticas.invalidar()
+    assert data["total_ofertas"] == 2
+    assert data["habilidades_tecnicas"] == [{"nombre": "Python", "frecuencia": 2}]
+
+@pytest.mark.asyncio
+async def test_acierto_de_cache_responde_la_carrera_solicitada(monkeypatch):
+    import main
+
+    class MotorFalso:
+        def frecuencias(self, carrera):
+            return 2, {"hard_python": 2, "soft_liderazgo": 1}
+
+    monkeypatch.setattr(main, "motor_columnar", MotorFalso())
+    monkeypatch.setattr(main.registro_metricas, "registrar", lambda registro: None)
+    main.cache_estadisticas.invalidar()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        primera = (await ac.get("/estadisticas/habilidades", params={"carrera": "Ingeniería Columnar"})).json()
+        segunda = (await ac.get("/estadisticas/habilidades", params={"carrera": "ingenieria  COLUMNAR"})).json()
+    main.cache_estadisticas.invalidar()
+    assert primera["carrera"] == "Ingeniería Columnar" and "cache" not in primera
+    assert segunda["carrera"] == "ingenieria  COLUMNAR" and segunda["cache"] is True
+    assert segunda["habilidades_tecnicas"] == primera["habilidades_tecnicas"]
@@ -0,0 +1,64 @@
+# backend/tests/test_etapas.py
+
+import pytest
+from etapas import Etapas, trazar_memoria
+from mineria import procesar_datos_computrabajo, procesar_datos_computrabajo_por_bloques
+from tests.datos_prueba import escribir_csv_computrabajo
+
+ETAPAS_PIPELINE = ["lectura", "hash", "salario", "filtro_ingenieria", "habilidades", "carreras",
+                   "limpieza_caracteres", "columnas_finales", "registros_descartados", "vistas_previas"]
+
+@pytest.fixture
+def csv_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    return escribir_csv_computrabajo(tmp_path / "computrabajo.csv", filas=300)
+
+def por_etapa(resumen):
+    return {span["etapa"]: span for span in resumen["etapas"]}
+
+def test_spans_archivo_completo(csv_path):
+    _, resumen, *_ = procesar_datos_computrabajo(csv_path)
+    assert [span["etapa"] for span in resumen["etapas"]] == ETAPAS_PIPELINE
+    etapas = por_etapa(resumen)
+    assert etapas["lectura"]["filas_salida"] == resumen["originales"]
+    assert etapas["carreras"]["filas_salida"] == resumen["finales"]
+    assert etapas["filtro_ingenieria"]["filas_salida"] == etapas["habilidades"]["filas_entrada"]
+    assert all(span["segundos"] >= 0 and span["bytes_asignados"] is None for span in resumen["etapas"])
+
+def test_spans_por_bloques_suman_los_bloques(csv_path):
+    completo = por_etapa(procesar_datos_computrabajo(csv_path)[1])
+    resumen, *_ = procesar_datos_computrabajo_por_bloques(csv_path, tamano_bloque=64)
+    etapas = por_etapa(resumen)
+    assert etapas["salario"]["llamadas"] == 5
+    for etapa in ("salario", "filtro_ingenieria", "habilidades", "carreras"):
+        assert (etapas[etapa]["filas_entrada"], etapas[etapa]["filas_salida"]) == \
+            (completo[etapa]["filas_entrada"], completo[etapa]["filas_salida"])
+
+def test_memoria_con_tracemalloc(csv_path):
+    with trazar_memoria(True):
+        _, resumen, *_ = procesar_datos_computrabajo(csv_path)
+    assert all(span["bytes_asignados"] > 0 for span in resumen["etapas"])
+
+def test_medicion_anidada_conserva_el_pico():
+    etapas = Etapas()
+    with trazar_memoria(True), etapas.medir("afuera"):
+        with etapas.medir("adentro"):
+            grande = bytearray(8 * 1024 * 1024)
+            del grande
+        pequeno = bytearray(1024)
+    afuera, adentro = etapas.spans[1], etapas.spans[0]
+    assert adentro["bytes_asignados"] >= 8 * 1000 * 1000
+    assert afuera["bytes_asignados"] >= adentro["bytes_asignados"]
+
+def test_resumen_agrega_por_etapa():
+    etapas = Etapas()
+    etapas.extender([
+        {"etapa": "a", "segundos": 1.0, "cpu_segundos": 0.5, "filas_entrada": 10, "filas_salida": 8, "bytes_asignados": 100},
+        {"etapa": "b", "segundos": 2.0, "cpu_segundos": 2.0, "filas_entrada": None, "filas_salida": None, "bytes_asignados": None},
+        {"etapa": "a", "segundos": 1.0, "cpu_segundos": 0.5, "filas_entrada": 5, "filas_salida": 5, "bytes_asignados": 300},
+    ])
+    assert etapas.resumen() == [
+        {"etapa": "a", "llamadas": 2, "segundos": 2.0, "cpu_segundos": 1.0, "filas_entrada": 15, "filas_salida": 13, "bytes_asignados": 300},
+        {"etapa": "b", "llamadas": 1, "segundos": 2.0, "cpu_segundos": 2.0, "filas_entrada": None, "filas_salida": None, "bytes_asignados": None},
+    ]
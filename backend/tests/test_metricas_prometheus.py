@@ -0,0 +1,82 @@
+# backend/tests/test_metricas_prometheus.py
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from metricas_prometheus import RegistroPrometheus, MetricasHttp, MiddlewareMetricas, instrumentar_engine
+
+def muestras(texto):
+    """{'nombre{etiquetas}': valor} de las líneas que no son comentarios"""
+    return {linea.rsplit(" ", 1)[0]: float(linea.rsplit(" ", 1)[1])
+            for linea in texto.splitlines() if linea and not linea.startswith("#")}
+
+@pytest.fixture
+def app_medida():
+    registro = RegistroPrometheus()
+    app = FastAPI()
+    app.add_middleware(MiddlewareMetricas, metricas=MetricasHttp(registro))
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    return TestClient(app), registro
+
+def test_histograma_acumula_cubetas():
+    registro = RegistroPrometheus()
+    histograma = registro.histograma("latencia", "Latencia", ("ruta",), cubetas=(0.1, 1.0))
+    for valor in (0.05, 0.1, 0.5, 3.0):
+        histograma.observar(valor, "/a")
+    valores = muestras(registro.exponer())
+    assert valores['latencia_bucket{ruta="/a",le="0.1"}'] == 2
+    assert valores['latencia_bucket{ruta="/a",le="1.0"}'] == 3
+    assert valores['latencia_bucket{ruta="/a",le="+Inf"}'] == 4
+    assert valores['latencia_count{ruta="/a"}'] == 4
+    assert valores['latencia_sum{ruta="/a"}'] == pytest.approx(3.65)
+    assert "# TYPE latencia histogram" in registro.exponer()
+
+def test_middleware_por_plantilla_de_ruta(app_medida):
+    cliente, registro = app_medida
+    for item_id in (1, 2, 3, 0):
+        cliente.get(f"/items/{item_id}")
+    cliente.get("/no-existe")
+
+    valores = muestras(registro.exponer())
+    assert valores['habilis_http_solicitudes_total{ruta="/items/{item_id}",metodo="GET",estado="200"}'] == 3
+    assert valores['habilis_http_solicitudes_total{ruta="/items/{item_id}",metodo="GET",estado="404"}'] == 1
+    assert valores['habilis_http_solicitudes_total{ruta="sin_ruta",metodo="GET",estado="404"}'] == 1
+    assert valores['habilis_http_latencia_segundos_count{ruta="/items/{item_id}",metodo="GET"}'] == 4
+    assert valores['habilis_http_en_curso{ruta="/items/{item_id}",metodo="GET"}'] == 0
+
+def test_etiquetas_escapadas():
+    registro = RegistroPrometheus()
+    registro.contador("eventos_total", "Eventos", ("origen",)).inc('a"b\\c')
+    assert 'eventos_total{origen="a\\"b\\\\c"} 1' in registro.exponer()
+
+def test_tiempo_de_consultas_bd(tmp_path):
+    registro = RegistroPrometheus()
+    engine = create_engine(f"sqlite:///{tmp_path / 'metricas.db'}")
+    instrumentar_engine(engine, registro.histograma("bd_segundos", "Consultas"))
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT * FROM no_existe"))
+    engine.dispose()
+    assert muestras(registro.exponer())["bd_segundos_count"] == 2
+
+def test_endpoint_metrics():
+    from main import app
+    cliente = TestClient(app)
+    cliente.get("/")
+    respuesta = cliente.get("/metrics")
+    assert respuesta.status_code == 200
+    assert respuesta.headers["content-type"].startswith("text/plain; version=0.0.4")
+    valores = muestras(respuesta.text)
+    assert valores['habilis_http_solicitudes_total{ruta="/",metodo="GET",estado="200"}'] >= 1
+    assert "habilis_cache_aciertos_total" in valores
+    assert "# TYPE habilis_bd_consulta_segundos histogram" in respuesta.text
+    assert "# TYPE habilis_bd_espera_conexion_segundos histogram" in respuesta.text
+    assert valores["habilis_bd_conexiones_en_uso"] >= 0
@@ -0,0 +1,108 @@
+# backend/tests/test_mineria_bloques.py
+
+import os, sys, json, time
+import pandas as pd
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from mineria import procesar_datos_computrabajo, procesar_datos_computrabajo_por_bloques, _procesar_bloque
+from tests.datos_prueba import escribir_csv_computrabajo
+
+def leer_json(ruta):
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+def _bloque_lento(df_original):
+    """_procesar_bloque que tarda 0.3 s y anota pid, inicio y fin en PRUEBA_EJECUCIONES_DIR"""
+    inicio = time.time()
+    time.sleep(0.3)
+    resultado = _procesar_bloque(df_original)
+    with open(os.path.join(os.environ["PRUEBA_EJECUCIONES_DIR"], f"{os.getpid()}_{inicio}"), "w") as f:
+        f.write(str(time.time()))
+    return resultado
+
+def sin_etapas(resumen):
+    # Los spans por etapa traen tiempos, que cambian entre corridas
+    return {clave: valor for clave, valor in resumen.items() if clave != "etapas"}
+
+def test_modo_streaming_igual_al_completo(tmp_path):
+    csv_path = escribir_csv_computrabajo(tmp_path / "computrabajo.csv", filas=300)
+
+    df_final, resumen, columnas_detectadas, *_ = procesar_datos_computrabajo(csv_path)
+    no_ingenieria = leer_json("data/registros_no_ingenieria.json")
+    no_clasificados = leer_json("data/registros_no_clasificados.json")
+
+    bloques = []
+    resumen_bloques, columnas_bloques, preview_antes, *_ = procesar_datos_computrabajo_por_bloques(
+        csv_path, tamano_bloque=37, al_procesar_bloque=bloques.append
+    )
+
+    assert len(bloques) > 1
+    pd.testing.assert_frame_equal(pd.concat(bloques), df_final)
+    assert sin_etapas(resumen_bloques) == sin_etapas(resumen)
+    assert columnas_bloques == columnas_detectadas
+    assert leer_json("data/registros_no_ingenieria.json") == no_ingenieria
+    assert leer_json("data/registros_no_clasificados.json") == no_clasificados
+    assert len(preview_antes) <= 50
+
+def test_bloques_en_pool_de_procesos_igual_al_serial(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+    csv_path = escribir_csv_computrabajo(tmp_path / "computrabajo.csv", filas=300)
+
+    serial = []
+    resumen_serial, *_ = procesar_datos_computrabajo_por_bloques(csv_path, tamano_bloque=37, al_procesar_bloque=serial.append)
+
+    paralelo, avances = [], []
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        resumen_pool, *_ = procesar_datos_computrabajo_por_bloques(
+            csv_path, tamano_bloque=37, al_procesar_bloque=paralelo.append, ejecutor=pool,
+            al_avanzar=lambda resumen: avances.append(resumen["originales"])
+        )
+
+    pd.testing.assert_frame_equal(pd.concat(paralelo), pd.concat(serial))
+    assert sin_etapas(resumen_pool) == sin_etapas(resumen_serial)
+    assert avances == sorted(avances) and avances[-1] == 300
+
+def test_fragmentos_en_paralelo_igual_al_serial(tmp_path, monkeypatch):
+    from concurrent.futures import ProcessPoolExecutor
+    import mineria
+    csv_path = escribir_csv_computrabajo(tmp_path / "computrabajo.csv", filas=500, semilla=3)
+
+    serial = procesar_datos_computrabajo(csv_path, trabajadores=1)
+    no_ingenieria = leer_json("data/registros_no_ingenieria.json")
+    no_clasificados = leer_json("data/registros_no_clasificados.json")
+
+    monkeypatch.setattr(mineria, "FILAS_MINIMAS_FRAGMENTO", 10)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        monkeypatch.setattr(mineria, "_pool", pool)
+        paralelo = procesar_datos_computrabajo(csv_path, trabajadores=2)
+
+    pd.testing.assert_frame_equal(paralelo[0], serial[0])
+    assert sin_etapas(paralelo[1]) == sin_etapas(serial[1])
+    assert paralelo[2:] == serial[2:]
+    assert leer_json("data/registros_no_ingenieria.json") == no_ingenieria
+    assert leer_json("data/registros_no_clasificados.json") == no_clasificados
+
+def test_fragmentos_corren_en_procesos_simultaneos(tmp_path, monkeypatch):
+    import mineria
+    csv_path = escribir_csv_computrabajo(tmp_path / "computrabajo.csv", filas=300, semilla=5)
+    ejecuciones = tmp_path / "ejecuciones"
+    ejecuciones.mkdir()
+    monkeypatch.setenv("PRUEBA_EJECUCIONES_DIR", str(ejecuciones))
+    monkeypatch.setattr(mineria, "FILAS_MINIMAS_FRAGMENTO", 10)
+    monkeypatch.setattr(mineria, "_procesar_bloque", _bloque_lento)
+    monkeypatch.setattr(mineria, "_pool", None)
+    try:
+        procesar_datos_computrabajo(csv_path, trabajadores=3)
+        # El pool se dimensiona con los trabajadores pedidos, no con MINERIA_TRABAJADORES
+        assert mineria._pool._max_workers == 3
+    finally:
+        mineria._pool.shutdown()
+
+    pids, inicios, fines = set(), [], []
+    for archivo in ejecuciones.iterdir():
+        pid, inicio = archivo.name.split("_")
+        pids.add(pid)
+        inicios.append(float(inicio))
+        fines.append(float(archivo.read_text()))
+    assert len(pids) == 3
+    # Los tres fragmentos estuvieron en ejecución al mismo tiempo
+    assert max(inicios) < min(fines)
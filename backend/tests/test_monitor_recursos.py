@@ -0,0 +1,37 @@
+# backend/tests/test_monitor_recursos.py
+
+import time
+from monitor_recursos import MonitorRecursos
+
+def medir(modo, capturas=4):
+    monitor = MonitorRecursos(modo=modo)
+    inicio = time.perf_counter()
+    monitor.iniciar_monitoreo()
+    for _ in range(capturas):
+        sum(i * i for i in range(20000))
+        monitor.capturar_metrica()
+    metricas = monitor.finalizar_monitoreo()
+    return metricas, time.perf_counter() - inicio
+
+def test_modo_muestreo_no_agrega_esperas():
+    metricas, duracion = medir("muestreo")
+    sincronas, duracion_sincrona = medir("sincrono")
+
+    assert duracion < 0.1
+    assert duracion_sincrona >= 0.5     # 5 capturas de 0.1 s cada una
+    assert metricas.keys() == sincronas.keys()
+    assert metricas["num_muestras"] == 5
+    assert metricas["ram_max_mb"] >= metricas["ram_promedio_mb"] > 0
+    assert metricas["metricas_detalladas"][0].keys() == sincronas["metricas_detalladas"][0].keys()
+
+def test_modo_muestreo_mide_cpu_del_intervalo():
+    monitor = MonitorRecursos(modo="muestreo")
+    monitor.iniciar_monitoreo()
+    fin = time.perf_counter() + 0.3
+    while time.perf_counter() < fin:
+        pass
+    monitor.capturar_metrica()
+    metricas = monitor.finalizar_monitoreo()
+
+    assert metricas["cpu_promedio_percent"] > 50
+    assert metricas["metricas_detalladas"][-1]["cpu_percent"] > 50
@@ -0,0 +1,81 @@
+# backend/tests/test_registro_metricas.py
+
+import json
+from calcular_energia import calcular_energia_por_consulta
+from registro_metricas import RegistroMetricas
+
+def registro(i):
+    return {
+        "endpoint": "/estadisticas/habilidades",
+        "carrera": f"Carrera {i}",
+        "timestamp": f"2025-06-01T10:{i // 60:02d}:{i % 60:02d}",
+        "tiempo_total_seg": 0.1 + i / 1000,
+        "cpu_promedio_percent": float(i % 100),
+        "ram_promedio_mb": 100.0 + i,
+    }
+
+def test_agregados_y_rotacion(tmp_path):
+    ruta = tmp_path / "metricas_recursos.json"
+    registro_metricas = RegistroMetricas(str(ruta), max_bytes=2000, intervalo=0.01)
+    registros = [registro(i) for i in range(120)]
+    for r in registros:
+        registro_metricas.registrar(r)
+    registro_metricas.vaciar()
+
+    energias = [calcular_energia_por_consulta(r) for r in registros]
+    esperado = {
+        "total_consultas": 120,
+        "cpu_promedio": round(sum(r["cpu_promedio_percent"] for r in registros) / 120, 2),
+        "ram_promedio": round(sum(r["ram_promedio_mb"] for r in registros) / 120, 2),
+        "tiempo_promedio": round(sum(r["tiempo_total_seg"] for r in registros) / 120, 4),
+        "energia_total_wh": round(sum(e["energia_wh"] for e in energias), 4),
+        "co2_total_gramos": round(sum(e["co2_gramos"] for e in energias), 2),
+        "energia_promedio_wh": round(sum(e["energia_wh"] for e in energias) / 120, 6),
+    }
+    assert registro_metricas.estadisticas() == esperado
+    assert len(registro_metricas._rotados()) >= 1
+
+    # Otra instancia (otro worker) lee los mismos agregados
+    assert RegistroMetricas(str(ruta)).estadisticas() == esperado
+
+def test_paginacion_y_ventana(tmp_path):
+    registro_metricas = RegistroMetricas(str(tmp_path / "metricas_recursos.json"), max_bytes=1500, intervalo=0.01)
+    for i in range(50):
+        registro_metricas.registrar(registro(i))
+    registro_metricas.vaciar()
+
+    pagina, hay_mas = registro_metricas.leer(limite=10)
+    assert [r["carrera"] for r in pagina] == [f"Carrera {i}" for i in range(40, 50)]
+    assert hay_mas
+    assert all("energia_wh" in r and "co2_gramos" in r for r in pagina)
+
+    pagina, hay_mas = registro_metricas.leer(limite=10, offset=45)
+    assert [r["carrera"] for r in pagina] == [f"Carrera {i}" for i in range(0, 5)]
+    assert not hay_mas
+
+    pagina, _ = registro_metricas.leer(desde="2025-06-01T10:00:10", hasta="2025-06-01T10:00:14", limite=100)
+    assert [r["carrera"] for r in pagina] == [f"Carrera {i}" for i in range(10, 15)]
+
+def test_reconstruye_agregados_de_historial_anterior(tmp_path):
+    ruta = tmp_path / "metricas_recursos.json"
+    with open(ruta, "w") as f:
+        for i in range(3):
+            f.write(json.dumps({**registro(i), "metricas_detalladas": []}) + "\n")
+
+    estadisticas = RegistroMetricas(str(ruta)).estadisticas()
+    assert estadisticas["total_consultas"] == 3
+    assert estadisticas["energia_total_wh"] > 0
+
+def test_ver_metricas_incluye_archivos_rotados(tmp_path, capsys):
+    from ver_metricas import formatear_metricas
+    ruta = tmp_path / "metricas_recursos.json"
+    registro_metricas = RegistroMetricas(str(ruta), max_bytes=2000, intervalo=0.01)
+    for i in range(120):
+        registro_metricas.registrar(registro(i))
+    registro_metricas.vaciar()
+    assert len(registro_metricas._rotados()) >= 1
+
+    formatear_metricas(str(ruta))
+    salida = capsys.readouterr().out
+    assert "Total consultas registradas: 120" in salida
+    assert "Carrera 119" in salida
@@ -0,0 +1,60 @@
+# backend/tests/test_taxonomia.py
+
+import json
+import pandas as pd
+import pytest
+from bits_habilidades import COLUMNAS_BITS
+from models.habilidad import Habilidad
+from mineria import BUSCADORES, clasificar_carreras, obtener_buscadores
+from taxonomia import TAXONOMIA, TAXONOMIA_RUTA, Taxonomia, cargar_taxonomia
+
+def datos_taxonomia():
+    with open(TAXONOMIA_RUTA, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def test_modelo_y_bits_siguen_la_taxonomia():
+    columnas_modelo = [c.name for c in Habilidad.__table__.columns if c.name.startswith(("hard_", "soft_"))]
+    assert columnas_modelo == list(TAXONOMIA.columnas()) == COLUMNAS_BITS
+    assert COLUMNAS_BITS[:3] == ["hard_python", "hard_java", "hard_sql"]
+    assert COLUMNAS_BITS[-1] == "soft_pensamiento_crítico"
+
+def test_version_depende_del_contenido(tmp_path):
+    assert cargar_taxonomia().version == TAXONOMIA.version
+    datos = datos_taxonomia()
+    datos["hard_skills"].append("rust")
+    ruta = tmp_path / "taxonomia.json"
+    ruta.write_text(json.dumps(datos, ensure_ascii=False), encoding="utf-8")
+    otra = cargar_taxonomia(ruta)
+    assert otra.version != TAXONOMIA.version
+    assert list(otra.columnas())[45] == "hard_rust"
+
+def test_buscadores_se_compilan_una_vez_por_version():
+    assert obtener_buscadores() is BUSCADORES
+    datos = datos_taxonomia()
+    datos["soft_skills"].append("empatía")
+    primera, segunda = obtener_buscadores(Taxonomia(datos)), obtener_buscadores(Taxonomia(datos))
+    assert primera is segunda and primera is not BUSCADORES
+    assert primera.detector.columnas[-1] == "soft_empatía"
+
+@pytest.mark.parametrize("cambio, mensaje", [
+    (lambda d: d["hard_skills"].append("python"), "repetidas"),
+    (lambda d: d["soft_skills"].append("trabajo_en equipo"), "repetidas"),
+    (lambda d: d["hard_skills"].extend(f"skill{i}" for i in range(8)), "máximo"),
+])
+def test_taxonomia_invalida(cambio, mensaje):
+    datos = datos_taxonomia()
+    cambio(datos)
+    with pytest.raises(ValueError, match=mensaje):
+        Taxonomia(datos)
+
+def test_clasificar_con_otra_taxonomia():
+    datos = datos_taxonomia()
+    datos["carreras"] = {"Ingeniería Mecánica": {"keywords": ["ingeniería mecánica", "torno"], "principales": ["mecánica"]},
+                         **datos["carreras"]}
+    buscadores = obtener_buscadores(Taxonomia(datos))
+    campos = [pd.Series(["operario de torno", "mecánica y civil", "ventas"]), pd.Series(["", "", ""]),
+              pd.Series(["torno cnc ingeniería mecánica", "", "nada"]), pd.Series(["", "", ""])]
+
+    assert clasificar_carreras(*campos, buscadores=buscadores).tolist() == \
+        ["Ingeniería Mecánica", "Ingeniería Mecánica", "No clasificado"]
+    assert clasificar_carreras(*campos).tolist() == ["No clasificado", "Ingeniería Civil", "No clasificado"]
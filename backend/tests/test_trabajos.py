@@ -0,0 +1,60 @@
+# backend/tests/test_trabajos.py
+
+import asyncio
+import time
+import pytest
+from httpx import AsyncClient, ASGITransport
+from trabajos import GestorTrabajos
+from tests.datos_prueba import escribir_csv_computrabajo
+
+def esperar(trabajo, intentos=200):
+    for _ in range(intentos):
+        if trabajo.progreso()["estado"] in ("completado", "error"):
+            return trabajo.progreso()
+        time.sleep(0.05)
+    raise AssertionError("El trabajo no terminó")
+
+def test_gestor_ejecuta_en_orden_y_registra_errores():
+    gestor = GestorTrabajos()
+    orden = []
+
+    def tarea(trabajo, n):
+        trabajo.avanzar("contando", n)
+        orden.append(n)
+        return {"n": n}
+
+    def falla(trabajo):
+        raise ValueError("CSV inválido")
+
+    trabajos = [gestor.encolar("prueba", tarea, n) for n in range(5)]
+    fallido = gestor.encolar("prueba", falla)
+
+    assert esperar(fallido)["error"] == "CSV inválido"
+    assert orden == list(range(5))
+    assert [t.resultado for t in trabajos] == [{"n": n} for n in range(5)]
+    assert trabajos[3].progreso()["filas_procesadas"] == 3
+    assert gestor.obtener(fallido.id).progreso()["estado"] == "error"
+
+@pytest.mark.asyncio
+async def test_trabajo_proceso_csv(tmp_path):
+    from main import app
+    csv_path = escribir_csv_computrabajo(tmp_path / "computrabajo.csv", filas=120)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        with open(csv_path, "rb") as f:
+            respuesta = await ac.post("/trabajos/proceso-csv?bloque=50", files={"file": ("computrabajo.csv", f, "text/csv")})
+        assert respuesta.status_code == 202
+        trabajo_id = respuesta.json()["trabajo_id"]
+
+        for _ in range(300):
+            progreso = (await ac.get(f"/trabajos/{trabajo_id}")).json()
+            if progreso["estado"] in ("completado", "error"):
+                break
+            await asyncio.sleep(0.05)
+
+        assert progreso["estado"] == "completado", progreso
+        assert progreso["filas_procesadas"] == 120
+        resultado = (await ac.get(f"/trabajos/{trabajo_id}/resultado")).json()
+        assert resultado["resumen"]["originales"] == 120
+        assert "metricas_procesamiento" in resultado
+        assert (await ac.get("/trabajos/no-existe")).status_code == 404
@@ -0,0 +1,82 @@
+# backend/tests/test_vistas_previas.py
+
+import os, sys, json
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from mineria import procesar_datos_computrabajo, procesar_datos_computrabajo_por_bloques, FILAS_MUESTRA
+from vistas_previas import VistasPrevias, leer_pagina, CONJUNTOS
+from tests.datos_prueba import escribir_csv_computrabajo
+
+def sin_etapas(resumen):
+    return {clave: valor for clave, valor in resumen.items() if clave != "etapas"}
+
+def leer_todo(conjunto, directorio):
+    return leer_pagina(conjunto, 0, 10**6, directorio)["registros"]
+
+def test_vistas_previas_en_disco_igual_a_las_completas(tmp_path):
+    csv_path = escribir_csv_computrabajo(tmp_path / "computrabajo.csv", filas=300)
+    _, resumen, _, *completas = procesar_datos_computrabajo(csv_path)
+    completas = dict(zip(CONJUNTOS, json.loads(json.dumps(completas))))
+
+    directorio = str(tmp_path / "completo")
+    with VistasPrevias(directorio) as vistas:
+        _, resumen_disco, _, *muestras = procesar_datos_computrabajo(csv_path, vistas_previas=vistas)
+
+    assert sin_etapas(resumen_disco) == sin_etapas(resumen)
+    assert sum(resumen["carreras"].values()) == resumen["finales"]
+    for conjunto, muestra in zip(CONJUNTOS, muestras):
+        assert leer_todo(conjunto, directorio) == completas[conjunto]
+        assert vistas.totales[conjunto] == len(completas[conjunto])
+        assert json.loads(json.dumps(muestra)) == completas[conjunto][:FILAS_MUESTRA]
+
+    # El modo streaming escribe los mismos conjuntos bloque a bloque
+    directorio_bloques = str(tmp_path / "bloques")
+    with VistasPrevias(directorio_bloques) as vistas:
+        resumen_bloques, *_ = procesar_datos_computrabajo_por_bloques(csv_path, tamano_bloque=37, vistas_previas=vistas)
+    assert sin_etapas(resumen_bloques) == sin_etapas(resumen)
+    for conjunto in CONJUNTOS:
+        assert leer_todo(conjunto, directorio_bloques) == completas[conjunto]
+
+def test_leer_pagina(tmp_path):
+    csv_path = escribir_csv_computrabajo(tmp_path / "computrabajo.csv", filas=120)
+    directorio = str(tmp_path / "vistas")
+    assert leer_pagina("antes", directorio=directorio) is None
+
+    with VistasPrevias(directorio) as vistas:
+        procesar_datos_computrabajo_por_bloques(csv_path, tamano_bloque=25, vistas_previas=vistas)
+
+    todos = leer_todo("antes", directorio)
+    pagina = leer_pagina("antes", offset=30, limite=20, directorio=directorio)
+    assert pagina["total"] == 120
+    assert pagina["registros"] == todos[30:50]
+    assert leer_pagina("antes", offset=110, limite=20, directorio=directorio)["registros"] == todos[110:]
+    assert leer_pagina("antes", offset=500, limite=20, directorio=directorio)["registros"] == []
+
+def test_carga_fallida_no_reemplaza_las_anteriores(tmp_path):
+    csv_path = escribir_csv_computrabajo(tmp_path / "computrabajo.csv", filas=60)
+    directorio = str(tmp_path / "vistas")
+    with VistasPrevias(directorio) as vistas:
+        procesar_datos_computrabajo_por_bloques(csv_path, tamano_bloque=25, vistas_previas=vistas)
+
+    try:
+        with VistasPrevias(directorio) as vistas:
+            procesar_datos_computrabajo_por_bloques(csv_path, tamano_bloque=25, vistas_previas=vistas)
+            raise RuntimeError("falla a mitad de la carga")
+    except RuntimeError:
+        pass
+
+    assert leer_pagina("antes", directorio=directorio)["total"] == 60
+    assert not [n for n in os.listdir(directorio) if n.endswith(".tmp")]
+
+def test_cargas_simultaneas_no_mezclan_archivos(tmp_path):
+    import pandas as pd
+    directorio = str(tmp_path / "vistas")
+    primera, segunda = VistasPrevias(directorio), VistasPrevias(directorio)
+    vacio = pd.DataFrame()
+    primera.agregar(pd.DataFrame({"titulo": ["a", "b", "c"]}), vacio, vacio, vacio)
+    segunda.agregar(pd.DataFrame({"titulo": ["x"]}), vacio, vacio, vacio)
+    segunda.cerrar()
+    primera.cerrar()
+
+    # Cada carga escribió en sus propios temporales: lo publicado es un par datos/índice coherente
+    assert leer_todo("antes", directorio) == [{"titulo": "a"}, {"titulo": "b"}, {"titulo": "c"}]
+    assert not [n for n in os.listdir(directorio) if n.endswith(".tmp")]
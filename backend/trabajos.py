@@ -0,0 +1,111 @@
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+class Trabajo:
+    """Estado de un trabajo en segundo plano; la función que lo ejecuta informa su avance con avanzar()"""
+
+    def __init__(self, tipo):
+        self.id = uuid.uuid4().hex
+        self.tipo = tipo
+        self.estado = "en_cola"
+        self.etapa = None
+        self.filas_procesadas = 0
+        self.creado = datetime.now().isoformat()
+        self.inicio = None
+        self.fin = None
+        self.error = None
+        self.resultado = None
+        self._lock = threading.Lock()
+
+    def avanzar(self, etapa=None, filas_procesadas=None):
+        with self._lock:
+            if etapa is not None:
+                self.etapa = etapa
+            if filas_procesadas is not None:
+                self.filas_procesadas = int(filas_procesadas)
+
+    def progreso(self):
+        with self._lock:
+            if self.inicio is None:
+                transcurrido = 0.0
+            else:
+                transcurrido = (self.fin or time.perf_counter()) - self.inicio
+            return {
+                "trabajo_id": self.id,
+                "tipo": self.tipo,
+                "estado": self.estado,
+                "etapa": self.etapa,
+                "filas_procesadas": self.filas_procesadas,
+                "segundos_transcurridos": round(transcurrido, 3),
+                "creado": self.creado,
+                "error": self.error,
+            }
+
+class GestorTrabajos:
+    """
+    Cola de trabajos atendida por un hilo orquestador.
+
+    Los trabajos se ejecutan de a uno y en orden de llegada: cada carga
+    reemplaza el dataset completo, así que correrlas en paralelo solo
+    competiría por la BD. El trabajo pesado de CPU lo delega cada función
+    (p. ej. al pool de procesos de minería); el hilo solo coordina, de modo
+    que el event loop y el resto de endpoints siguen respondiendo.
+
+    Se conservan los últimos `max_guardados` trabajos terminados para
+    consultar su progreso y resultado.
+    """
+
+    def __init__(self, max_guardados=100):
+        self.max_guardados = max_guardados
+        self._trabajos = OrderedDict()
+        self._cola = queue.Queue()
+        self._lock = threading.Lock()
+        self._hilo = None
+
+    def encolar(self, tipo, funcion, *args, **kwargs):
+        """Encola funcion(trabajo, *args, **kwargs); devuelve el Trabajo creado"""
+        trabajo = Trabajo(tipo)
+        with self._lock:
+            self._trabajos[trabajo.id] = trabajo
+            self._podar()
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._atender, name="gestor-trabajos", daemon=True)
+                self._hilo.start()
+        self._cola.put((trabajo, funcion, args, kwargs))
+        return trabajo
+
+    def obtener(self, trabajo_id):
+        with self._lock:
+            return self._trabajos.get(trabajo_id)
+
+    def pendientes(self):
+        return self._cola.qsize()
+
+    def _podar(self):
+        terminados = [t for t in self._trabajos.values() if t.estado in ("completado", "error")]
+        for trabajo in terminados[:max(0, len(terminados) - self.max_guardados)]:
+            del self._trabajos[trabajo.id]
+
+    def _atender(self):
+        while True:
+            trabajo, funcion, args, kwargs = self._cola.get()
+            with trabajo._lock:
+                trabajo.estado = "en_proceso"
+                trabajo.inicio = time.perf_counter()
+            try:
+                resultado = funcion(trabajo, *args, **kwargs)
+                estado, error = "completado", None
+            except Exception as e:
+                print("❌ ERROR EN TRABAJO:", traceback.format_exc())
+                resultado, estado, error = None, "error", str(e)
+            with trabajo._lock:
+                trabajo.resultado = resultado
+                trabajo.estado = estado
+                trabajo.error = error
+                trabajo.fin = time.perf_counter()
+            self._cola.task_done()
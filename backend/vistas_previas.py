@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+import uuid
+import numpy as np
+
+# Conjuntos de registros que se guardan por cada CSV procesado
+CONJUNTOS = ("antes", "despues", "no_ingenieria", "no_clasificados")
+# Una publicación a la vez: los pares datos/índice de dos cargas no se mezclan
+_lock_publicar = threading.Lock()
+
+class VistasPrevias:
+    """
+    Escribe las vistas previas de un CSV procesado en disco, bloque a bloque:
+    por cada conjunto un archivo JSON Lines y un índice con el offset en
+    bytes de cada registro (uint64), de modo que cualquier página se lee con
+    un solo seek sin cargar el archivo.
+
+    Los registros tienen la misma forma que las vistas previas que antes
+    devolvía /proceso-csv. Se escriben en archivos temporales propios de
+    cada carga (una carga en /trabajos y otra en /proceso-csv pueden
+    coincidir) y cerrar() los publica, así una carga a medias no reemplaza
+    la anterior.
+    """
+
+    def __init__(self, directorio="data/vistas_previas"):
+        self.directorio = directorio
+        os.makedirs(directorio, exist_ok=True)
+        self.totales = {conjunto: 0 for conjunto in CONJUNTOS}
+        self._sufijo = f".{uuid.uuid4().hex}.tmp"
+        self._datos = {}
+        self._indices = {}
+        self._posiciones = {}
+        for conjunto in CONJUNTOS:
+            self._datos[conjunto] = open(self._temporal(conjunto, "jsonl"), "wb")
+            self._indices[conjunto] = open(self._temporal(conjunto, "idx"), "wb")
+            self._indices[conjunto].write(np.zeros(1, dtype=np.uint64).tobytes())
+            self._posiciones[conjunto] = 0
+
+    def _ruta(self, conjunto, extension):
+        return os.path.join(self.directorio, f"{conjunto}.{extension}")
+
+    def _temporal(self, conjunto, extension):
+        return self._ruta(conjunto, extension) + self._sufijo
+
+    def agregar(self, df_original, df_final, no_ingenieria, no_clasificados):
+        """Agrega un bloque procesado (las mismas transformaciones que las vistas previas originales)"""
+        self._escribir("antes", df_original.fillna('').astype(str))
+        self._escribir("despues", df_final.drop(columns='hash_contenido', errors='ignore').fillna(''))
+        self._escribir("no_ingenieria", no_ingenieria.fillna('').astype(str))
+        self._escribir("no_clasificados", no_clasificados.fillna('').astype(str))
+
+    def _escribir(self, conjunto, df):
+        if df.empty:
+            return
+        contenido = df.to_json(orient="records", lines=True, force_ascii=False, double_precision=15).encode("utf-8")
+        if not contenido.endswith(b"\n"):
+            contenido += b"\n"
+        # Los saltos de línea dentro de los valores van escapados: cada \n cierra un registro
+        finales = np.flatnonzero(np.frombuffer(contenido, dtype=np.uint8) == ord("\n")).astype(np.uint64) + 1
+        self._datos[conjunto].write(contenido)
+        self._indices[conjunto].write((finales + np.uint64(self._posiciones[conjunto])).tobytes())
+        self._posiciones[conjunto] += len(contenido)
+        self.totales[conjunto] += len(finales)
+
+    def cerrar(self):
+        for conjunto in CONJUNTOS:
+            self._datos[conjunto].close()
+            self._indices[conjunto].close()
+        with _lock_publicar:
+            for conjunto in CONJUNTOS:
+                for extension in ("jsonl", "idx"):
+                    os.replace(self._temporal(conjunto, extension), self._ruta(conjunto, extension))
+
+    def descartar(self):
+        for conjunto in CONJUNTOS:
+            self._datos[conjunto].close()
+            self._indices[conjunto].close()
+            for extension in ("jsonl", "idx"):
+                temporal = self._temporal(conjunto, extension)
+                if os.path.exists(temporal):
+                    os.remove(temporal)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.cerrar()
+        else:
+            self.descartar()
+        return False
+
+def leer_pagina(conjunto, offset=0, limite=50, directorio="data/vistas_previas"):
+    """Página [offset, offset + limite) de un conjunto; None si no hay vistas previas guardadas"""
+    ruta_indice = os.path.join(directorio, f"{conjunto}.idx")
+    if not os.path.exists(ruta_indice):
+        return None
+    total = os.path.getsize(ruta_indice) // 8 - 1
+    registros = []
+    if offset < total:
+        cantidad = min(limite, total - offset)
+        posiciones = np.fromfile(ruta_indice, dtype=np.uint64, count=cantidad + 1, offset=offset * 8)
+        with open(os.path.join(directorio, f"{conjunto}.jsonl"), "rb") as f:
+            f.seek(int(posiciones[0]))
+            contenido = f.read(int(posiciones[-1] - posiciones[0]))
+        registros = [json.loads(linea) for linea in contenido.splitlines()]
+    return {"conjunto": conjunto, "total": total, "offset": offset, "limite": limite, "registros": registros}
@@ -1,6 +1,7 @@
 // CONSTANTES COMPARTIDAS - Usa CONFIG de config.js
 export const API_URL = `${CONFIG.API_URL}/estadisticas/habilidades`;
 export const API_SALARIOS = `${CONFIG.API_URL}/estadisticas/salarios`;
+export const API_CARRERAS = `${CONFIG.API_URL}/carreras`;
 
 // FUNCIONES UTILITARIAS
 function escapeHtml(text) {
@@ -114,6 +115,23 @@ export function generarTablaHTML(data) {
 }
 
 // FUNCIONES DE API
+// Llena el selector con las carreras cargadas: el value es la clave canónica que espera
+// el backend y el texto el nombre. Si falla, se mantienen las opciones del HTML
+export async function cargarCarreras(select) {
+  try {
+    const response = await fetch(API_CARRERAS);
+    if (!response.ok) throw new Error("Error al obtener carreras");
+    const { carreras } = await response.json();
+    if (!carreras || carreras.length === 0) return;
+
+    const placeholder = select.options[0] ? select.options[0].outerHTML : '';
+    select.innerHTML = placeholder + carreras.map(c =>
+      `<option value="${escapeHtml(c.clave)}">${escapeHtml(c.carrera)}</option>`).join('');
+  } catch (error) {
+    console.error("Error cargando carreras:", error);
+  }
+}
+
 export async function subirCSV(file) {
   const formData = new FormData();
   formData.append("file", file);
@@ -88,13 +88,17 @@ document.getElementById("inputCsv").addEventListener("change", async function ()
 
       const registros = datos.preview_despues;
       if (registros && registros.length > 0) {
-        const conteoCarreras = {};
-        for (const reg of registros) {
-          const carrera = reg.career || 'Sin clasificar';
-          conteoCarreras[carrera] = (conteoCarreras[carrera] || 0) + 1;
+        // preview_despues es solo una muestra: los conteos por carrera vienen en el resumen
+        let conteoCarreras = datos.resumen.carreras;
+        if (!conteoCarreras) {
+          conteoCarreras = {};
+          for (const reg of registros) {
+            const carrera = reg.career || 'Sin clasificar';
+            conteoCarreras[carrera] = (conteoCarreras[carrera] || 0) + 1;
+          }
         }
 
-        const total = registros.length;
+        const total = Object.values(conteoCarreras).reduce((suma, cantidad) => suma + cantidad, 0);
         const filasHTML = Object.entries(conteoCarreras).map(([carrera, cantidad]) => {
           const porcentaje = ((cantidad / total) * 100).toFixed(1);
           return `<tr>
@@ -125,7 +129,8 @@ document.getElementById("inputCsv").addEventListener("change", async function ()
         const tablaHTML = generarTablaHTML(filas);
         const details = document.createElement("details");
         const summary = document.createElement("summary");
-        summary.textContent = `${carrera} (${filas.length} registros)`;
+        const totalCarrera = datos.resumen.carreras ? datos.resumen.carreras[carrera] : filas.length;
+        summary.textContent = `${carrera} (${totalCarrera} registros)`;
         summary.style.fontWeight = "bold";
         summary.style.margin = "1rem 0";
         details.appendChild(summary);
@@ -1,9 +1,14 @@
 import { registrarTiempoCarga } from './common.js';
-import { API_URL, API_SALARIOS } from './common.js';
+import { API_URL, API_SALARIOS, cargarCarreras } from './common.js';
 // ELEMENTOS DEL DOM
 const selectCarrera = document.getElementById('select-carrera');
 const tituloCarrera = document.getElementById('titulo-carrera');
 
+// Opciones del selector desde /carreras (claves canónicas)
+if (selectCarrera) {
+  cargarCarreras(selectCarrera);
+}
+
 // INICIALIZACIÓN DE GRÁFICOS
 if (document.getElementById('graficoTecnicas')) {
   const graficoTecnicas = new Chart(document.getElementById('graficoTecnicas'), {
@@ -22,7 +27,7 @@ if (document.getElementById('graficoTecnicas')) {
   selectCarrera.addEventListener('change', () => {
     const inicioTiempo = Date.now();
     const carrera = selectCarrera.value;
-    tituloCarrera.textContent = carrera.toUpperCase();
+    tituloCarrera.textContent = selectCarrera.options[selectCarrera.selectedIndex].text.toUpperCase();
 
     // Fetch habilidades
     fetch(`${API_URL}?carrera=${encodeURIComponent(carrera)}`)